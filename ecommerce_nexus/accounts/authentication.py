@@ -0,0 +1,119 @@
+# ecommerce_nexus/accounts/authentication.py
+"""
+JWT authentication without a per-request ``User`` query.
+
+* Validated access tokens are kept in a small in-process LRU keyed on the raw
+  token until they expire, so a client reusing its token skips signature
+  verification and claim checks.
+* The user is rebuilt from a compact principal (id, username, email, is_staff,
+  is_superuser, is_active) stored in the configured cache. The result is a
+  real ``User`` instance loaded through ``from_db`` with only those fields,
+  so it works as a foreign key value and in comparisons; any other field
+  loads lazily on first access.
+
+Principals are dropped by ``accounts.signals`` whenever a user is saved or
+deleted. Writes through ``QuerySet.update()`` bypass the signals and are only
+seen once ``AUTH_PRINCIPAL_CACHE_TIMEOUT`` expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+PRINCIPAL_KEY = "accounts:principal:{}"
+PRINCIPAL_FIELDS = ("username", "email", "is_staff", "is_superuser", "is_active")
+
+
+def principal_timeout():
+    return getattr(settings, "AUTH_PRINCIPAL_CACHE_TIMEOUT", 300)
+
+
+def invalidate_principal(user_id):
+    cache.delete(PRINCIPAL_KEY.format(user_id))
+
+
+class TokenCache:
+    """Bounded, thread-safe LRU of validated tokens; entries die with the token."""
+
+    def __init__(self, size):
+        self.size = size
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw):
+        with self._lock:
+            token = self._tokens.get(raw)
+            if token is None:
+                return None
+            if token["exp"] <= time.time():
+                del self._tokens[raw]
+                return None
+            self._tokens.move_to_end(raw)
+            return token
+
+    def put(self, raw, token):
+        with self._lock:
+            self._tokens[raw] = token
+            self._tokens.move_to_end(raw)
+            while len(self._tokens) > self.size:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+tokens = TokenCache(getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 10_000))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Drop-in for SimpleJWT's ``JWTAuthentication``; same header, tokens and errors."""
+
+    def get_validated_token(self, raw_token):
+        token = tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            tokens.put(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # revocation claims are checked against the stored password hash
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = PRINCIPAL_KEY.format(user_id)
+        principal = cache.get(key)
+        if principal is None:
+            User = get_user_model()
+            row = (
+                User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+                .values("pk", *PRINCIPAL_FIELDS)
+                .first()
+            )
+            if row is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            principal = row
+            cache.set(key, principal, principal_timeout())
+        if not principal["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return _user_from_principal(principal)
+
+
+def _user_from_principal(principal):
+    User = get_user_model()
+    loaded = {User._meta.pk.attname: principal["pk"], **{name: principal[name] for name in PRINCIPAL_FIELDS}}
+    # from_db expects the values in model field order; the other fields are deferred
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in loaded]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [loaded[name] for name in names])
@@ -0,0 +1,47 @@
+# ecommerce_nexus/accounts/backends.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from rest_framework.request import Request
+
+from . import hashing
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` that verifies passwords on the hashing pool and upgrades
+    outdated hashes in place.
+
+    When the pool is full, API logins (a DRF ``Request``) get
+    ``hashing.HashingBusy``, which DRF answers with 503 + Retry-After.
+    Django's own callers, such as the admin login, would turn that exception
+    into a 500, so they are verified on the calling thread as plain
+    ``ModelBackend`` does.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        try:
+            return self._authenticate(request, username, password, **kwargs)
+        except hashing.HashingBusy:
+            if isinstance(request, Request):
+                raise
+            return super().authenticate(request, username=username, password=password, **kwargs)
+
+    def _authenticate(self, request, username, password, **kwargs):
+        User = get_user_model()
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # hash anyway so unknown usernames take as long as wrong passwords
+            hashing.make_password(password)
+            return None
+        ok, rehashed = hashing.verify(password, user.password)
+        if not ok or not self.user_can_authenticate(user):
+            return None
+        if rehashed:
+            user.password = rehashed
+            User._default_manager.filter(pk=user.pk).update(password=rehashed)
+        return user
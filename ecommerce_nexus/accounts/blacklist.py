@@ -0,0 +1,152 @@
+# ecommerce_nexus/accounts/blacklist.py
+"""
+Cache-first refresh token blacklist.
+
+Every blacklisted ``jti`` is also a cache key that expires together with the
+token (``accounts:blacklist:<jti>``), so the check on refresh/logout is one
+cache read. Blacklisting goes through ``cache.add``, which also makes two
+concurrent refreshes of the same token fail for all but one of them.
+
+A cache miss is only trusted when ``TOKEN_BLACKLIST_TRUST_CACHE`` is on (a
+shared cache such as Redis), the cache never evicts keys early (Redis
+``maxmemory-policy noeviction``; any other policy can drop single jti keys
+while the marker survives) *and* the warm marker is present: the marker is
+set by ``warm()`` after loading every unexpired blacklisted jti, so a flushed
+or restarted cache falls back to the ``token_blacklist`` tables until the next
+warm-up. The tables stay the durable record; ``purge_expired`` deletes rows of
+expired tokens in batches so they do not grow without bound.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+KEY = "accounts:blacklist:{}"
+WARM_KEY = "accounts:blacklist:warm"
+BATCH_SIZE = 5000
+POLICY_RECHECK = 60  # seconds the eviction policy lookup is reused
+
+_policy = {"checked": None, "noeviction": False}
+
+
+class TokenBlacklisted(TokenError):
+    pass
+
+
+def trust_cache():
+    return getattr(settings, "TOKEN_BLACKLIST_TRUST_CACHE", False) and cache_keeps_keys()
+
+
+def cache_keeps_keys():
+    """
+    True when the cache is Redis with ``maxmemory-policy noeviction``. Other
+    backends, other policies and a Redis that refuses ``CONFIG GET`` (some
+    managed services) count as evicting, so misses go to the tables.
+    """
+    now = time.monotonic()
+    if _policy["checked"] is None or now - _policy["checked"] > POLICY_RECHECK:
+        _policy["checked"], _policy["noeviction"] = now, _maxmemory_policy() == "noeviction"
+    return _policy["noeviction"]
+
+
+def _maxmemory_policy():
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default").config_get("maxmemory-policy").get("maxmemory-policy")
+    except Exception:
+        # not django-redis, or CONFIG is disabled
+        return None
+
+
+def _ttl(exp):
+    return max(int(exp - timezone.now().timestamp()) + 1, 1)
+
+
+def is_blacklisted(jti):
+    if cache.get(KEY.format(jti)):
+        return True
+    if trust_cache() and cache.get(WARM_KEY):
+        return False
+    expires_at = BlacklistedToken.objects.filter(token__jti=jti).values_list("token__expires_at", flat=True).first()
+    if expires_at is None:
+        return False
+    remember(jti, expires_at)
+    return True
+
+
+def remember(jti, expires_at):
+    cache.set(KEY.format(jti), 1, _ttl(expires_at.timestamp()))
+
+
+class CachedRefreshToken(RefreshToken):
+    """``RefreshToken`` whose blacklist checks and writes go through the cache first."""
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenBlacklisted(_("Token is blacklisted"))
+
+    def blacklist(self):
+        jti, exp = self.payload[api_settings.JTI_CLAIM], self.payload["exp"]
+        if not cache.add(KEY.format(jti), 1, _ttl(exp)):
+            # a concurrent refresh/logout of the same token won
+            raise TokenBlacklisted(_("Token is blacklisted"))
+        try:
+            token, _created = OutstandingToken.objects.get_or_create(jti=jti, defaults=self._outstanding_fields())
+            return BlacklistedToken.objects.get_or_create(token=token)
+        except Exception:
+            cache.delete(KEY.format(jti))
+            raise
+
+    def outstand(self):
+        # a freshly rotated jti cannot exist yet: one INSERT, no user lookup
+        return OutstandingToken.objects.create(jti=self.payload[api_settings.JTI_CLAIM], **self._outstanding_fields())
+
+    def _outstanding_fields(self):
+        return {
+            "user_id": self.payload.get(api_settings.USER_ID_CLAIM),
+            "created_at": self.current_time,
+            "token": str(self),
+            "expires_at": datetime_from_epoch(self.payload["exp"]),
+        }
+
+
+def warm(batch_size=BATCH_SIZE, marker_timeout=None):
+    """Load every unexpired blacklisted jti into the cache, then mark it complete."""
+    now = timezone.now()
+    last_id, loaded = 0, 0
+    while True:
+        rows = list(
+            BlacklistedToken.objects.filter(id__gt=last_id, token__expires_at__gt=now)
+            .order_by("id")
+            .values_list("id", "token__jti", "token__expires_at")[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        # one timeout per batch: long enough for the longest-lived token in it
+        cache.set_many({KEY.format(jti): 1 for _, jti, _ in rows}, _ttl(max(exp for _, _, exp in rows).timestamp()))
+        loaded += len(rows)
+    cache.set(WARM_KEY, 1, marker_timeout or getattr(settings, "TOKEN_BLACKLIST_WARM_TIMEOUT", 2 * 3600))
+    return loaded
+
+
+def purge_expired(batch_size=BATCH_SIZE):
+    """Delete outstanding (and, by cascade, blacklisted) rows of expired tokens."""
+    now, deleted = timezone.now(), 0
+    while True:
+        ids = list(OutstandingToken.objects.filter(expires_at__lte=now).order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
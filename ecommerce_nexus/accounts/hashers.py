@@ -0,0 +1,17 @@
+# ecommerce_nexus/accounts/hashers.py
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with the cost taken from ``PASSWORD_PBKDF2_ITERATIONS``.
+
+    It keeps the ``pbkdf2_sha256`` algorithm name, so existing hashes still
+    verify; hashes with a different iteration count are upgraded on the next
+    successful login (``must_update``).
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", hashers.PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,189 @@
+# ecommerce_nexus/accounts/hashing.py
+"""
+Password hashing on a bounded per-process thread pool.
+
+Registration and login hash with PBKDF2, which is deliberately slow. Running
+it on whichever request thread happens to get the call lets a burst of logins
+occupy every thread and starve cheap catalog reads. Here every hash goes
+through a small pool instead:
+
+* at most ``PASSWORD_HASH_WORKERS`` hashes run at once per process;
+  ``hashlib`` releases the GIL while hashing, so threads are enough;
+* up to ``PASSWORD_HASH_QUEUE`` more wait for a worker. Every running or
+  waiting hash also blocks the request thread that asked for it, so both are
+  capped to leave at least one of the process's ``WEB_THREADS`` free (see
+  ``limits``). Anything beyond that
+  is refused immediately with ``HashingBusy`` (503 + Retry-After) rather
+  than queued behind work the client has probably given up on, as is a hash
+  that has not finished within ``PASSWORD_HASH_TIMEOUT`` seconds;
+* queue wait and hash time are counted in the cache (see ``stats``).
+
+``verify`` also reports when the stored hash uses an outdated hasher or cost
+(e.g. after ``PASSWORD_PBKDF2_ITERATIONS`` changed) and returns a new hash
+computed in the same job, so the caller can upgrade it on a successful login.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+METRIC = "accounts:hashing:{}"
+COUNTERS = ("hashed", "verified", "rehashed", "rejected", "timeouts", "hash_ms", "wait_ms")
+BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500)
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many password operations in progress, try again shortly.")
+    default_code = "hashing_busy"
+
+    def __init__(self, detail=None, code=None, wait=1):
+        super().__init__(detail, code)
+        self.wait = wait  # sent as Retry-After by DRF's exception handler
+
+
+def workers():
+    return getattr(settings, "PASSWORD_HASH_WORKERS", 2)
+
+
+def queue_size():
+    return getattr(settings, "PASSWORD_HASH_QUEUE", 4)
+
+
+def request_threads():
+    return getattr(settings, "WEB_THREADS", 4)
+
+
+def limits():
+    """
+    ``(workers, queue)``: the configured sizes, capped so that running plus
+    waiting hashes stay below the request thread count.
+    """
+    slots = max(request_threads() - 1, 1)
+    running = max(1, min(workers(), slots))
+    return running, max(0, min(queue_size(), slots - running))
+
+
+def wait_timeout():
+    return getattr(settings, "PASSWORD_HASH_TIMEOUT", 10)
+
+
+class HashingPool:
+    def __init__(self, workers, queue):
+        self.config = (os.getpid(), workers, queue)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def run(self, fn, *args):
+        """Run ``fn(*args)`` on the pool and wait for it; ``HashingBusy`` if the pool is full."""
+        if not self._slots.acquire(blocking=False):
+            _incr("rejected")
+            raise HashingBusy()
+        submitted = time.monotonic()
+        try:
+            future = self._executor.submit(_timed, fn, args, submitted)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _future: self._slots.release())
+        try:
+            return future.result(timeout=wait_timeout())
+        except FutureTimeout:
+            # the hash still finishes in the background and frees its slot then
+            _incr("timeouts")
+            raise HashingBusy(wait=wait_timeout())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process's pool, rebuilt after a fork or when its settings change."""
+    global _pool
+    config = (os.getpid(), *limits())
+    with _pool_lock:
+        if _pool is None or _pool.config != config:
+            if _pool is not None and _pool.config[0] == config[0]:
+                _pool.shutdown()
+            _pool = HashingPool(config[1], config[2])
+        return _pool
+
+
+def _timed(fn, args, submitted):
+    started = time.monotonic()
+    try:
+        return fn(*args)
+    finally:
+        took = time.monotonic() - started
+        _incr("wait_ms", int((started - submitted) * 1000))
+        _incr("hash_ms", int(took * 1000))
+        _incr(_bucket(took * 1000))
+
+
+def _bucket(ms):
+    for bound in BUCKETS_MS:
+        if ms <= bound:
+            return f"le_{bound}"
+    return "le_inf"
+
+
+def _incr(name, delta=1):
+    key = METRIC.format(name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def _verify(raw, encoded):
+    outdated = []
+    ok = hashers.check_password(raw, encoded, setter=outdated.append)
+    # Django calls the setter only for a correct password whose hash needs upgrading
+    return ok, hashers.make_password(raw) if outdated else None
+
+
+def make_password(raw):
+    """Hash ``raw`` with the preferred hasher on the pool."""
+    encoded = get_pool().run(hashers.make_password, raw)
+    _incr("hashed")
+    return encoded
+
+
+def verify(raw, encoded):
+    """``(matches, new_hash)``; ``new_hash`` is set when ``encoded`` should be upgraded."""
+    ok, rehashed = get_pool().run(_verify, raw, encoded)
+    _incr("verified")
+    if rehashed:
+        _incr("rehashed")
+    return ok, rehashed
+
+
+def stats():
+    names = [*COUNTERS, *(f"le_{bound}" for bound in BUCKETS_MS), "le_inf"]
+    found = cache.get_many([METRIC.format(name) for name in names])
+    counts = {name: found.get(METRIC.format(name), 0) for name in names}
+    jobs = counts["hashed"] + counts["verified"]
+    return {
+        "hashed": counts["hashed"],
+        "verified": counts["verified"],
+        "rehashed": counts["rehashed"],
+        "rejected": counts["rejected"],
+        "timeouts": counts["timeouts"],
+        "avg_hash_ms": round(counts["hash_ms"] / jobs, 1) if jobs else None,
+        "avg_wait_ms": round(counts["wait_ms"] / jobs, 1) if jobs else None,
+        # jobs per upper bound (ms), not cumulative
+        "hash_ms_histogram": {name[3:]: counts[name] for name in names if name.startswith("le_")},
+    }
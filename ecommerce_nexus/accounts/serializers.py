@@ -2,6 +2,13 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from . import hashing
+from .authentication import CachedJWTAuthentication
+from .blacklist import CachedRefreshToken
 
 User = get_user_model()
 
@@ -30,6 +37,38 @@ class RegisterSerializer(serializers.ModelSerializer):
         User = get_user_model()
         password = validated_data.pop("password")
         user = User(**validated_data)
-        user.set_password(password)
+        # hashed on the bounded pool instead of the request thread
+        user.password = hashing.make_password(password)
         user.save()
         return user
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    SimpleJWT's refresh with the cache-first blacklist and the cached user
+    principal: a reused token is rejected from the cache and a rotation only
+    touches the token tables.
+    """
+
+    token_class = CachedRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if refresh.payload.get(api_settings.USER_ID_CLAIM) is not None:
+            try:
+                user = CachedJWTAuthentication().get_user(refresh)
+            except AuthenticationFailed:
+                user = None
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+        return data
@@ -0,0 +1,26 @@
+# ecommerce_nexus/accounts/signals.py
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from . import blacklist
+from .authentication import invalidate_principal
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_principal(sender, instance, **kwargs):
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    # now, and again after commit so a concurrent request cannot re-cache the old row
+    invalidate_principal(user_id)
+    transaction.on_commit(lambda: invalidate_principal(user_id))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def cache_blacklisted_token(sender, instance, created, **kwargs):
+    # covers blacklisting done outside CachedRefreshToken (admin, SimpleJWT views)
+    if created:
+        blacklist.remember(instance.token.jti, instance.token.expires_at)
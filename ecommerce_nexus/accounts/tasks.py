@@ -0,0 +1,10 @@
+# ecommerce_nexus/accounts/tasks.py
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def purge_expired_tokens():
+    """Drop outstanding/blacklisted rows of expired tokens and re-warm the blacklist cache."""
+    from .blacklist import purge_expired, warm
+
+    return {"purged": purge_expired(), "cached": warm()}
@@ -0,0 +1,72 @@
+# accounts/tests/test_authentication.py
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import authentication
+from accounts.authentication import CachedJWTAuthentication
+from catalog.models import Category, Order, Product
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    cache.clear()
+    authentication.tokens.clear()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="jwt", email="jwt@example.com", password="P@ssw0rd123", is_staff=True)
+
+
+def _authenticate(user):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return CachedJWTAuthentication().authenticate(request)
+
+
+def test_repeat_requests_cost_no_auth_queries(user, django_assert_num_queries):
+    token = str(AccessToken.for_user(user))
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+    with django_assert_num_queries(1):
+        CachedJWTAuthentication().authenticate(request)
+    with django_assert_num_queries(0):
+        principal, validated = CachedJWTAuthentication().authenticate(request)
+
+    assert principal == user
+    assert (principal.pk, principal.username, principal.is_staff) == (user.pk, "jwt", True)
+    assert principal.get_deferred_fields() >= {"password", "date_joined"}
+    assert validated["user_id"] == str(user.pk)
+
+
+def test_user_changes_invalidate_the_principal(user, django_capture_on_commit_callbacks):
+    assert _authenticate(user)[0].is_staff
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_staff = False
+        user.save()
+    assert not _authenticate(user)[0].is_staff
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+    with pytest.raises(AuthenticationFailed):
+        _authenticate(user)
+
+
+def test_principal_can_place_orders(user, monkeypatch):
+    monkeypatch.setattr("catalog.notifications.schedule_flush", lambda: None)
+    product = Product.objects.create(title="Auth", sku="AUTH-1", price=Decimal("1.00"),
+                                     category=Category.objects.create(name="Auth"), stock=5)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    # the cached principal is enough to own rows through a foreign key
+    res = client.post("/api/orders/", {"items": [{"product_id": product.id, "quantity": 1}]}, format="json")
+    assert res.status_code == 201
+    assert Order.objects.get().user_id == user.pk
@@ -0,0 +1,105 @@
+# accounts/tests/test_blacklist.py
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import authentication, blacklist
+from accounts.blacklist import CachedRefreshToken, TokenBlacklisted
+from accounts.tasks import purge_expired_tokens
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clean_caches(monkeypatch):
+    cache.clear()
+    authentication.tokens.clear()
+    monkeypatch.setattr(blacklist, "_policy", {"checked": None, "noeviction": False})
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="bl", email="bl@example.com", password="P@ssw0rd123")
+
+
+def _refresh(client, token):
+    return client.post("/api/auth/refresh/", {"refresh": token}, format="json")
+
+
+def test_rotation_is_cheap_and_rotated_tokens_are_rejected(settings, monkeypatch, user, django_assert_num_queries):
+    settings.TOKEN_BLACKLIST_TRUST_CACHE = True
+    monkeypatch.setattr(blacklist, "_maxmemory_policy", lambda: "noeviction")
+    blacklist.warm()
+    client = APIClient()
+    token = str(RefreshToken.for_user(user))
+
+    # principal lookup, blacklist the old jti (two lookups and an insert inside
+    # a savepoint pair) and a single insert for the new one
+    with django_assert_num_queries(7):
+        res = _refresh(client, token)
+    assert res.status_code == 200
+    assert BlacklistedToken.objects.filter(token__jti=RefreshToken(token, verify=False)["jti"]).exists()
+
+    # the cache answers the reuse of the rotated token
+    with django_assert_num_queries(0):
+        assert _refresh(client, token).status_code == 401
+    assert _refresh(client, res.data["refresh"]).status_code == 200
+
+
+def test_untrusted_miss_falls_back_to_the_tables(user):
+    token = CachedRefreshToken.for_user(user)
+    token.blacklist()
+    cache.clear()
+    # a flushed cache is not taken for "not blacklisted"
+    with pytest.raises(TokenBlacklisted):
+        CachedRefreshToken(str(token))
+    assert cache.get(blacklist.KEY.format(token["jti"]))
+
+
+def test_misses_are_not_trusted_when_the_cache_can_evict(settings, monkeypatch, user):
+    settings.TOKEN_BLACKLIST_TRUST_CACHE = True
+    monkeypatch.setattr(blacklist, "_maxmemory_policy", lambda: "allkeys-lru")
+    token = CachedRefreshToken.for_user(user)
+    token.blacklist()
+    blacklist.warm()
+    # evicted under memory pressure while the warm marker survived
+    cache.delete(blacklist.KEY.format(token["jti"]))
+    with pytest.raises(TokenBlacklisted):
+        CachedRefreshToken(str(token))
+
+
+def test_blacklisting_elsewhere_reaches_the_cache(user):
+    token = RefreshToken.for_user(user)
+    token.blacklist()
+    assert blacklist.is_blacklisted(token["jti"])
+    cache.clear()
+    assert blacklist.warm() == 1
+    assert cache.get(blacklist.KEY.format(token["jti"]))
+
+
+def test_logout_is_idempotent(user):
+    client = APIClient()
+    refresh = CachedRefreshToken.for_user(user)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+    assert client.post("/api/auth/logout/", {"refresh": str(refresh)}, format="json").status_code == 200
+    assert client.post("/api/auth/logout/", {"refresh": str(refresh)}, format="json").status_code == 200
+    assert client.post("/api/auth/logout/", {"refresh": "garbage"}, format="json").status_code == 400
+
+
+def test_expired_rows_are_purged(user):
+    live, expired = RefreshToken.for_user(user), RefreshToken.for_user(user)
+    live.blacklist()
+    expired.blacklist()
+    OutstandingToken.objects.filter(jti=expired["jti"]).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    assert purge_expired_tokens() == {"purged": 1, "cached": 1}
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == [live["jti"]]
+    assert BlacklistedToken.objects.count() == 1
@@ -0,0 +1,146 @@
+# accounts/tests/test_hashing.py
+import threading
+from contextlib import contextmanager
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.test import Client
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from accounts import hashing
+from accounts.throttles import PasswordRateThrottle
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+LOGIN = "/api/auth/login/"
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashes(settings):
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+    cache.clear()
+
+
+def _login(client, password="P@ssw0rd123", username="hash", **extra):
+    return client.post(LOGIN, {"username": username, "password": password}, format="json", **extra)
+
+
+def test_register_and_login_hash_on_the_pool():
+    client = APIClient()
+    res = client.post("/api/auth/register/", {"username": "hash", "email": "hash@example.com",
+                                              "password": "P@ssw0rd123", "password2": "P@ssw0rd123"}, format="json")
+    assert res.status_code == 201
+    assert User.objects.get(username="hash").check_password("P@ssw0rd123")
+    assert _login(client).status_code == 200
+    assert _login(client, password="wrong").status_code == 401
+    # unknown users are hashed too, so they cost the same as a wrong password
+    assert _login(client, username="nobody").status_code == 401
+
+    stats = hashing.stats()
+    assert (stats["hashed"], stats["verified"], stats["rejected"]) == (2, 2, 0)
+    assert sum(stats["hash_ms_histogram"].values()) == 4
+
+
+def test_outdated_hashes_are_upgraded_on_login(settings):
+    user = User.objects.create_user(username="hash", password="P@ssw0rd123")
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1200
+    assert _login(APIClient()).status_code == 200
+
+    user.refresh_from_db()
+    assert identify_hasher(user.password).decode(user.password)["iterations"] == 1200
+    assert hashing.stats()["rehashed"] == 1
+    assert _login(APIClient()).status_code == 200
+    assert hashing.stats()["rehashed"] == 1
+
+
+@contextmanager
+def full_pool(settings):
+    settings.PASSWORD_HASH_WORKERS = 1
+    settings.PASSWORD_HASH_QUEUE = 0
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    holder = threading.Thread(target=hashing.get_pool().run, args=(hold,))
+    holder.start()
+    started.wait(5)
+    try:
+        yield
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_full_pool_sheds_load(settings):
+    User.objects.create_user(username="hash", password="P@ssw0rd123")
+    with full_pool(settings):
+        res = _login(APIClient())
+    assert res.status_code == 503
+    assert res["Retry-After"] == "1"
+    assert hashing.stats()["rejected"] == 1
+    assert _login(APIClient()).status_code == 200
+
+
+def test_pool_leaves_a_request_thread_free(settings):
+    settings.WEB_THREADS = 3
+    settings.PASSWORD_HASH_WORKERS = 4
+    settings.PASSWORD_HASH_QUEUE = 4
+    assert hashing.limits() == (2, 0)
+    User.objects.create_user(username="hash", password="P@ssw0rd123")
+    started, release = threading.Semaphore(0), threading.Event()
+
+    def hold():
+        started.release()
+        release.wait(5)
+
+    # two request threads stuck in hashes: the pool's whole admission bound
+    holders = [threading.Thread(target=hashing.get_pool().run, args=(hold,)) for _ in range(2)]
+    for holder in holders:
+        holder.start()
+    for _ in holders:
+        started.acquire(timeout=5)
+    try:
+        # the third thread is turned away instead of blocking, and reads still run
+        assert _login(APIClient()).status_code == 503
+        assert APIClient().get("/api/products/").status_code == 200
+    finally:
+        release.set()
+        for holder in holders:
+            holder.join()
+
+
+def test_admin_login_with_a_full_pool_checks_on_its_own_thread(settings):
+    User.objects.create_user(username="hash", password="P@ssw0rd123", is_staff=True)
+    with full_pool(settings):
+        res = Client().post("/admin/login/", {"username": "hash", "password": "P@ssw0rd123", "next": "/admin/"})
+    assert res.status_code == 302
+    assert res["Location"] == "/admin/"
+    assert hashing.stats()["rejected"] == 1
+
+
+def test_password_endpoints_are_rate_limited_per_ip(monkeypatch):
+    monkeypatch.setattr(PasswordRateThrottle, "THROTTLE_RATES", {"password": "2/min"})
+    User.objects.create_user(username="hash", password="P@ssw0rd123")
+    client = APIClient()
+    assert [_login(client).status_code for _ in range(3)] == [200, 200, 429]
+    other = APIClient(REMOTE_ADDR="10.0.0.2")
+    assert _login(other).status_code == 200
+
+
+def test_password_limit_ignores_forged_forwarded_for(monkeypatch, settings):
+    monkeypatch.setattr(PasswordRateThrottle, "THROTTLE_RATES", {"password": "2/min"})
+    User.objects.create_user(username="hash", password="P@ssw0rd123")
+    client = APIClient()
+    codes = [_login(client, HTTP_X_FORWARDED_FOR=f"203.0.113.{i}").status_code for i in range(3)]
+    assert codes == [200, 200, 429]
+
+    # behind one proxy, the client is the address that proxy appended
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+    forged = [_login(client, HTTP_X_FORWARDED_FOR=f"203.0.113.{i}, 198.51.100.7").status_code for i in range(3)]
+    assert forged == [200, 200, 429]
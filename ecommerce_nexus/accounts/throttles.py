@@ -0,0 +1,15 @@
+# ecommerce_nexus/accounts/throttles.py
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class PasswordRateThrottle(SimpleRateThrottle):
+    """
+    Per client IP, authenticated or not, for endpoints that hash a password.
+    The IP comes from ``get_ident``, which only trusts ``X-Forwarded-For`` as
+    far as ``REST_FRAMEWORK["NUM_PROXIES"]`` hops.
+    """
+
+    scope = "password"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
@@ -1,13 +1,14 @@
 # ecommerce_nexus/accounts/urls.py
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 
-from .views import RegisterView, LogoutView
+from .views import HashingStatsView, LoginView, RegisterView, LogoutView
 
 urlpatterns = [
     # using friendly URL aliases but delegating to SimpleJWT views
-    path("auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("auth/login/", LoginView.as_view(), name="token_obtain_pair"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("auth/logout/", LogoutView.as_view(), name="token_logout"),
     path("auth/register/", RegisterView.as_view(), name="auth_register"),
+    path("auth/hashing-stats/", HashingStatsView.as_view(), name="auth_hashing_stats"),
 ]
@@ -6,8 +6,12 @@ from django.contrib.auth import get_user_model
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from accounts.permissions import IsAdmin
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from . import hashing
+from .blacklist import CachedRefreshToken, TokenBlacklisted
+from .throttles import PasswordRateThrottle
 
 from .serializers import RegisterSerializer
 
@@ -20,13 +24,23 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [PasswordRateThrottle]
+
+
+class LoginView(TokenObtainPairView):
+    """
+    POST /api/auth/login/  -> SimpleJWT's token pair, rate limited per IP.
+    The password is checked on the hashing pool (accounts.backends).
+    """
+    throttle_classes = [PasswordRateThrottle]
 
 
 class LogoutView(APIView):
     """
     POST /api/auth/logout/
     Expects {"refresh": "<refresh_token>"}
-    Blacklists the refresh token.
+    Blacklists the refresh token. Logging out with an already blacklisted
+    (e.g. rotated) token succeeds: the session is over either way.
     """
     permission_classes = [IsAuthenticated]
 
@@ -36,9 +50,22 @@ class LogoutView(APIView):
             return Response({"detail": "Refresh token is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            token = RefreshToken(refresh_token)
+            token = CachedRefreshToken(refresh_token)
             token.blacklist()
+        except TokenBlacklisted:
+            pass
         except TokenError:
             return Response({"detail": "Invalid or expired token."}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({"detail": "Successfully logged out."}, status=status.HTTP_200_OK)
+
+
+class HashingStatsView(APIView):
+    """
+    GET /api/auth/hashing-stats/
+    Password hashing pool counters and latency (admin only).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(hashing.stats())
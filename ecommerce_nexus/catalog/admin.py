@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Category, Product, ProductImage, Tag, ProductTag, Order, OrderItem, InventoryMovement
+from .audit_models import AuditTrail
+from .models import Category, Product, ProductImage, Tag, ProductTag, Order, OrderItem, InventoryMovement, StockSnapshot
 
 admin.site.register(Category)
 admin.site.register(Product)
@@ -9,3 +10,19 @@ admin.site.register(ProductTag)
 admin.site.register(Order)
 admin.site.register(OrderItem)
 admin.site.register(InventoryMovement)
+admin.site.register(StockSnapshot)
+
+
+@admin.register(AuditTrail)
+class AuditTrailAdmin(admin.ModelAdmin):
+    list_display = ["created_at", "actor", "action", "model_name", "object_pk"]
+    # exact-match search keeps to the composite indexes; no COUNT(*) over the whole table
+    search_fields = ["=object_pk", "=actor", "=model_name"]
+    show_full_result_count = False
+    ordering = ["-created_at"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
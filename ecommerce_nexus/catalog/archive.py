@@ -0,0 +1,133 @@
+# ecommerce_nexus/catalog/archive.py
+"""
+Retention for the append-only history tables.
+
+Rows of ``InventoryMovement`` and ``AuditTrail`` older than their retention
+window are written one calendar month (UTC) at a time to gzip-compressed
+NDJSON under ``<directory>/<table>/<YYYY-MM>.ndjson.gz`` and then removed:
+on PostgreSQL the month's partition is detached and dropped (see
+``catalog.partitions``), elsewhere the rows are deleted in id-ordered batches.
+A month archived twice gets a second gzip member appended to the same file.
+
+Movements are only archived once folded into the stock snapshots
+(``id <= StockSnapshot.movement_id``), so ``ledger.ledger_stock`` stays exact.
+"""
+import os
+import shutil
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import export, partitions
+from .audit_models import AuditTrail
+from .models import InventoryMovement, StockSnapshot
+
+BATCH_SIZE = 5000
+
+# kind -> (model, retention setting, default days)
+KINDS = {
+    "movements": (InventoryMovement, "MOVEMENT_RETENTION_DAYS", 730),
+    "audit": (AuditTrail, "AUDIT_RETENTION_DAYS", 365),
+}
+
+
+def _utc(month):
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+
+
+def retention_cutoff(kind, now=None):
+    """Start of the first month that must be kept for ``kind``."""
+    _, setting, default = KINDS[kind]
+    days = getattr(settings, setting, default)
+    return _utc(partitions.month_start((now or timezone.now()) - timedelta(days=days)))
+
+
+def archive_path(directory, model, month):
+    return os.path.join(directory, model._meta.db_table, f"{month:%Y-%m}.ndjson.gz")
+
+
+def archive(kind, directory=None, before=None, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Archive and remove every complete month of ``kind`` rows created before
+    ``before`` (default: the retention cutoff, rounded down to a month start).
+    Yields ``{"table", "month", "rows", "path", "dropped"}`` per month.
+    """
+    model = KINDS[kind][0]
+    directory = directory or settings.ARCHIVE_DIR
+    before = _utc(partitions.month_start(before)) if before else retention_cutoff(kind)
+    rows = model.objects.all()
+    if model is InventoryMovement:
+        watermark = StockSnapshot.objects.aggregate(top=Max("movement_id"))["top"] or 0
+        rows = rows.filter(id__lte=watermark)
+
+    oldest = rows.filter(created_at__lt=before).aggregate(first=Min("created_at"))["first"]
+    if oldest is None:
+        return
+    month = partitions.month_start(oldest.astimezone(dt_timezone.utc))
+    while _utc(month) < before:
+        upcoming = partitions.next_month(month)
+        in_month = rows.filter(created_at__gte=_utc(month), created_at__lt=_utc(upcoming))
+        count = in_month.count()
+        if count:
+            path = archive_path(directory, model, month)
+            dropped = False
+            if not dry_run:
+                last_id = _write(path, in_month.order_by("id").values().iterator(chunk_size=batch_size))
+                dropped = _remove(model, in_month.filter(id__lte=last_id), month, count, batch_size)
+            yield {"table": model._meta.db_table, "month": f"{month:%Y-%m}", "rows": count,
+                   "path": path, "dropped": dropped}
+        month = upcoming
+
+
+def _write(path, rows):
+    """Stream ``rows`` into ``path`` (appending a gzip member if it exists); returns the last id."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    last = {"id": 0}
+
+    def tracked():
+        for row in rows:
+            last["id"] = row["id"]
+            yield row
+
+    partial = f"{path}.partial"
+    with open(partial, "wb") as out:
+        for chunk in export.gzipped(export.ndjson(tracked())):
+            out.write(chunk)
+        out.flush()
+        os.fsync(out.fileno())
+    if os.path.exists(path):
+        with open(partial, "rb") as src, open(path, "ab") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(partial)
+    else:
+        os.replace(partial, path)
+    return last["id"]
+
+
+def _remove(model, archived, month, count, batch_size):
+    table = model._meta.db_table
+    start, end = _utc(month), _utc(partitions.next_month(month))
+    whole_month = model.objects.filter(created_at__gte=start, created_at__lt=end).count() == count
+    if whole_month and month in partitions.partitions(connection, table):
+        with transaction.atomic():
+            return partitions.drop_partition(connection, table, month)
+    while True:
+        ids = list(archived.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return False
+        with transaction.atomic():
+            _delete(model, ids)
+
+
+def _delete(model, ids):
+    # plain DELETE: the archive file is the record, no per-row audit/delete signals
+    q = connection.ops.quote_name
+    table, pk = q(model._meta.db_table), q(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"DELETE FROM {table} WHERE {pk} = ANY(%s)", [ids])
+        else:
+            cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({', '.join(['%s'] * len(ids))})", ids)
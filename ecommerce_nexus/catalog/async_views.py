@@ -0,0 +1,161 @@
+# ecommerce_nexus/catalog/async_views.py
+"""
+Async read handlers for the public catalog, for running under an ASGI server
+(uvicorn workers) with ``ASYNC_READ_VIEWS`` on.
+
+``wrap`` swaps the callbacks of the product/category list, detail and tree
+routes for async views. Anonymous GETs are answered from the response cache
+(``cache.afetch``) and, on a miss, from Django's async ORM, so a slow client
+or a slow query holds a coroutine rather than a worker thread. The JSON is
+rendered from the same serializers and cache keys as the DRF views, so both
+paths share entries and return the same bodies.
+
+Everything else goes to the original DRF view via ``sync_to_async``:
+writes, authenticated requests (staff see inactive products), format
+suffixes, filtered/searched/ordered/cursor product listings, and 404s.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.urls import URLPattern
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from . import cache as product_cache
+from . import replicas
+from .models import Category, Product
+from .pagination import ProductPagination
+from .serializers import CategorySerializer, ProductRowSerializer, ProductSerializer
+from .views import CategoryViewSet
+
+# product listings served without the DRF filter stack; anything else is delegated
+PLAIN_LIST_PARAMS = {"limit", "offset", "fields"}
+DEFAULT_ORDERING = "-created_at"  # ProductViewSet.ordering
+# what get_object_or_404 turns into a 404 for a malformed or unknown lookup
+NOT_FOUND = (ObjectDoesNotExist, TypeError, ValueError, ValidationError)
+
+
+class Delegate(Exception):
+    """Raised by a handler to let the DRF view answer instead."""
+
+
+def _json(data, cache_status=None):
+    # a DRF Response rendered as APIView would with the JSON renderer
+    response = Response(data, headers={"X-Cache": cache_status} if cache_status else None)
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = JSONRenderer.media_type
+    response.renderer_context = {}
+    return response
+
+
+async def product_list(request):
+    if not set(request.GET) <= PLAIN_LIST_PARAMS:
+        raise Delegate
+    drf_request = Request(request)
+    key = await sync_to_async(product_cache.list_key)(drf_request)
+    data = await product_cache.alookup(key)
+    if data is not None:
+        return _json(data, "HIT")
+
+    rows = ProductRowSerializer(fields=request.GET.get("fields"))
+    queryset = Product.objects.filter(is_active=True).order_by(DEFAULT_ORDERING).values(*rows.columns)
+    # ProductPagination.paginate_queryset in limit/offset mode, with async queries
+    pagination = ProductPagination()
+    pagination.keyset = None
+    pagination.request = drf_request
+    pagination.limit = pagination.get_limit(drf_request)
+    pagination.offset = pagination.get_offset(drf_request)
+    pagination.count = await queryset.acount()
+    page = []
+    if pagination.count and pagination.offset <= pagination.count:
+        page = [row async for row in queryset[pagination.offset:pagination.offset + pagination.limit]]
+    data = pagination.get_paginated_response(rows.many(page)).data
+    await product_cache.astore(key, data)
+    return _json(data, "MISS")
+
+
+async def product_detail(request, public_id):
+    async def compute():
+        try:
+            product = await Product.objects.select_related("category").aget(public_id=public_id, is_active=True)
+        except NOT_FOUND:
+            raise Delegate
+        return ProductSerializer(product).data
+
+    key = await sync_to_async(product_cache.detail_key)(public_id)
+    data, hit = await product_cache.afetch(key, compute)
+    return _json(data, "HIT" if hit else "MISS")
+
+
+async def category_list(request):
+    if request.GET:
+        raise Delegate
+
+    async def compute():
+        return [CategorySerializer(category).data async for category in Category.objects.all()]
+
+    key = await sync_to_async(product_cache.category_list_key)()
+    data, _ = await product_cache.afetch(key, compute)
+    return _json(data)
+
+
+async def category_detail(request, pk):
+    async def compute():
+        try:
+            return CategorySerializer(await Category.objects.aget(pk=pk)).data
+        except NOT_FOUND:
+            raise Delegate
+
+    key = await sync_to_async(product_cache.category_key)(pk)
+    data, _ = await product_cache.afetch(key, compute)
+    return _json(data)
+
+
+async def category_tree(request):
+    async def compute():
+        rows = Category.objects.order_by("path").values("id", "name", "slug", "parent_id")
+        return CategoryViewSet._build_tree([row async for row in rows])
+
+    key = await sync_to_async(product_cache.category_tree_key)()
+    roots, _ = await product_cache.afetch(key, compute)
+    return _json(roots)
+
+
+HANDLERS = {
+    "product-list": product_list,
+    "product-detail": product_detail,
+    "category-list": category_list,
+    "category-detail": category_detail,
+    "category-tree": category_tree,
+}
+
+
+def async_view(handler, view):
+    """An async view running ``handler`` for anonymous GETs and ``view`` otherwise."""
+    delegate = sync_to_async(view)
+
+    async def wrapper(request, *args, **kwargs):
+        if request.method in ("GET", "HEAD") and "format" not in kwargs and "HTTP_AUTHORIZATION" not in request.META:
+            await sync_to_async(replicas.use_replicas)()
+            try:
+                return await handler(request, *args, **kwargs)
+            except Delegate:
+                pass
+        return await delegate(request, *args, **kwargs)
+
+    # keeps cls/actions for the schema generator and DRF's csrf_exempt flag
+    functools.update_wrapper(wrapper, view)
+    return wrapper
+
+
+def wrap(patterns):
+    """Router ``patterns`` with the catalog read routes served by async views."""
+    wrapped = []
+    for pattern in patterns:
+        handler = HANDLERS.get(getattr(pattern, "name", None))
+        if handler is not None:
+            pattern = URLPattern(pattern.pattern, async_view(handler, pattern.callback), pattern.default_args, pattern.name)
+        wrapped.append(pattern)
+    return wrapped
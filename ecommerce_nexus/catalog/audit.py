@@ -0,0 +1,152 @@
+# ecommerce_nexus/catalog/audit.py
+"""
+Buffered audit trail writer.
+
+Tracked instances carry an in-memory snapshot of their field values taken when
+they are loaded (``post_init``), so an update can be diffed without re-reading
+the row. Entries are queued with ``transaction.on_commit`` and written with
+``bulk_create`` after the commit, one batch per ``audit.atomic`` block (or
+handed to a Celery task when ``AUDIT_TRAIL_ASYNC`` is on); a rolled-back
+transaction or savepoint writes nothing.
+"""
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from .audit_models import AuditTrail
+
+BATCH_SIZE = 500
+
+
+def snapshot(instance):
+    """
+    Field values of ``instance`` keyed like ``model_to_dict``, read straight from
+    ``__dict__`` so deferred fields are skipped instead of fetched.
+    """
+    values = instance.__dict__
+    return {
+        f.name: values[f.attname]
+        for f in instance._meta.concrete_fields
+        if f.editable and f.attname in values
+    }
+
+
+def diff(old, new):
+    """``{"field": [old, new]}`` for every field whose value changed."""
+    return {key: [old.get(key), value] for key, value in new.items() if old.get(key) != value}
+
+
+def audit_entry(instance, action, changes=None, actor=None):
+    """
+    Build (but do not save) an AuditTrail row for ``instance``.
+    ``changes`` defaults to the full field dict, as the create/delete signals record.
+    """
+    return AuditTrail(
+        actor=actor or getattr(instance, "_changed_by", None) or None,
+        action=action,
+        model_name=type(instance).__name__,
+        object_pk=str(instance.pk),
+        changes=model_to_dict(instance) if changes is None else changes,
+    )
+
+
+class _Chunk:
+    """Entries of one ``record`` call inside an ``atomic`` batch."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.committed = False
+
+    def confirm(self):
+        self.committed = True
+
+
+class _Batch:
+    def __init__(self):
+        self.chunks = []
+
+    def flush(self):
+        write([entry for chunk in self.chunks if chunk.committed for entry in chunk.entries])
+
+
+_batch = ContextVar("catalog_audit_batch", default=None)
+
+
+@contextmanager
+def atomic(using=None):
+    """
+    ``transaction.atomic`` whose audit entries are written together, with one
+    ``bulk_create`` after it commits.
+
+    Every ``record`` call inside registers its own ``on_commit`` hook, which
+    Django discards if the savepoint around it rolls back; the block's flush
+    hook is registered last, so it runs after them and writes only the
+    entries whose hook survived.
+    """
+    outer = _batch.get()
+    with transaction.atomic(using=using):
+        batch = outer or _Batch()
+        token = _batch.set(batch)
+        try:
+            yield
+        finally:
+            _batch.reset(token)
+        if outer is None and batch.chunks:
+            transaction.on_commit(batch.flush, using=using)
+
+
+def record(entries):
+    """
+    Queue AuditTrail rows for the current transaction: written after it
+    commits, in one batch per ``atomic`` block (see above) or else one per
+    call, and dropped with a savepoint that rolls back. Outside a transaction
+    they are written immediately.
+    """
+    entries = list(entries)
+    if not entries:
+        return entries
+    if not transaction.get_connection().in_atomic_block:
+        write(entries)
+        return entries
+    batch = _batch.get()
+    if batch is None:
+        transaction.on_commit(lambda: write(entries))
+    else:
+        chunk = _Chunk(entries)
+        batch.chunks.append(chunk)
+        transaction.on_commit(chunk.confirm)
+    return entries
+
+
+def write(entries):
+    """Persist AuditTrail rows now, or hand them to Celery when AUDIT_TRAIL_ASYNC is set."""
+    if not entries:
+        return
+    if getattr(settings, "AUDIT_TRAIL_ASYNC", False):
+        from .tasks import write_audit_trail
+
+        write_audit_trail.delay([to_payload(entry) for entry in entries])
+    else:
+        AuditTrail.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+
+
+def to_payload(entry):
+    """JSON-safe dict for an unsaved AuditTrail row (Celery task argument)."""
+    return json.loads(
+        json.dumps(
+            {
+                "actor": entry.actor,
+                "action": entry.action,
+                "model_name": entry.model_name,
+                "object_pk": entry.object_pk,
+                "changes": entry.changes,
+                "created_at": entry.created_at,
+            },
+            cls=DjangoJSONEncoder,
+        )
+    )
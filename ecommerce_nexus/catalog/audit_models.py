@@ -1,4 +1,5 @@
 # ecommerce_nexus/catalog/audit_models.py
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
@@ -8,5 +9,14 @@ class AuditTrail(models.Model):
     action = models.CharField(max_length=100)  # e.g., 'create', 'update', 'delete'
     model_name = models.CharField(max_length=100)
     object_pk = models.CharField(max_length=255, null=True, blank=True)
-    changes = models.JSONField(null=True, blank=True)  # {"field": ["old", "new"], ...}
+    changes = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)  # {"field": ["old", "new"], ...}
     created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # retention / archival scans by month
+            models.Index(fields=["created_at"]),
+            # "every change to order 42", "everything alice did today"
+            models.Index(fields=["model_name", "object_pk", "created_at"]),
+            models.Index(fields=["actor", "created_at"]),
+        ]
@@ -0,0 +1,230 @@
+# ecommerce_nexus/catalog/benchmark.py
+"""
+Replay weighted, mixed read/write traffic against the API and report latency
+percentiles, throughput and SQL query counts per endpoint.
+
+Requests go through Django's test ``Client`` (in-process, with query counts)
+or over HTTP to a running server such as a local gunicorn (latency only).
+Results are plain dicts so they can be stored as a JSON baseline and diffed
+with ``compare``.
+"""
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Category, Product
+from .seeding import SEED_PASSWORD
+
+SAMPLE_SIZE = 1000
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    weight: int
+    build: callable  # (context, rng) -> (path, json body or None)
+    auth: bool = False
+    after: callable = None  # (context, status, body) -> None
+
+
+class Context:
+    """Ids sampled from the database and the credentials the scenarios use."""
+
+    def __init__(self, rng, sample_size=SAMPLE_SIZE, username=None):
+        # random ids from the key range rather than ORDER BY RANDOM() over the whole table
+        bounds = Product.objects.aggregate(lo=Min("id"), hi=Max("id"))
+        candidates = []
+        if bounds["lo"] is not None:
+            span = range(bounds["lo"], bounds["hi"] + 1)
+            candidates = rng.sample(span, min(len(span), sample_size * 2))
+        products = list(
+            Product.objects.filter(pk__in=candidates, is_active=True, stock__gt=0)
+            .values_list("id", "public_id", "title")[:sample_size]
+        )
+        if not products:
+            raise ValueError("No products to benchmark against; seed some first.")
+        self.product_ids = [row[0] for row in products]
+        self.public_ids = [str(row[1]) for row in products]
+        self.words = sorted({row[2].split()[0] for row in products})
+        self.category_ids = list(Category.objects.values_list("id", flat=True)[:sample_size])
+        self.user = self._user(username)
+        self.password = SEED_PASSWORD
+        refresh = RefreshToken.for_user(self.user)
+        self.access = str(refresh.access_token)
+        self.refresh = str(refresh)
+
+    @staticmethod
+    def _user(username):
+        User = get_user_model()
+        user, created = User.objects.get_or_create(
+            username=username or "benchmark", defaults={"email": "benchmark@example.com"}
+        )
+        if created or not user.check_password(SEED_PASSWORD):
+            user.set_password(SEED_PASSWORD)
+            user.save(update_fields=["password"])
+        return user
+
+
+def _store_refresh(context, status, body):
+    if status == 200 and isinstance(body, dict) and body.get("refresh"):
+        context.refresh = body["refresh"]
+
+
+SCENARIOS = [
+    Scenario("products.list", "GET", 20, lambda c, r: ("/api/products/", None)),
+    Scenario("products.list.price", "GET", 8, lambda c, r: (f"/api/products/?ordering=price&offset={r.randint(0, 200)}", None)),
+    Scenario("products.list.cursor", "GET", 6, lambda c, r: ("/api/products/?pagination=cursor&limit=50", None)),
+    Scenario("products.list.category", "GET", 8, lambda c, r: (f"/api/products/?category_tree={r.choice(c.category_ids)}", None)),
+    Scenario("products.search", "GET", 8, lambda c, r: (f"/api/products/?search={r.choice(c.words)}", None)),
+    Scenario("products.suggest", "GET", 8, lambda c, r: (f"/api/products/suggest/?q={r.choice(c.words)[:3]}", None)),
+    Scenario("products.detail", "GET", 20, lambda c, r: (f"/api/products/{r.choice(c.public_ids)}/", None)),
+    Scenario("categories.tree", "GET", 4, lambda c, r: ("/api/categories/tree/", None)),
+    Scenario(
+        "orders.create", "POST", 5,
+        lambda c, r: ("/api/orders/", {"items": [
+            {"product_id": r.choice(c.product_ids), "quantity": 1} for _ in range(r.randint(1, 3))
+        ]}),
+        auth=True,
+    ),
+    Scenario("orders.list", "GET", 5, lambda c, r: ("/api/orders/", None), auth=True),
+    Scenario(
+        "auth.login", "POST", 2,
+        lambda c, r: ("/api/auth/login/", {"username": c.user.username, "password": c.password}),
+    ),
+    Scenario(
+        "auth.refresh", "POST", 2,
+        lambda c, r: ("/api/auth/refresh/", {"refresh": c.refresh}),
+        after=_store_refresh,
+    ),
+]
+
+
+class LocalTransport:
+    """In-process requests through the Django test client; counts SQL queries."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, body, token):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        data = json.dumps(body) if body is not None else None
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if method == "GET":
+                response = self.client.get(path, **headers)
+            else:
+                response = self.client.generic(method, path, data or "", content_type="application/json", **headers)
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, len(queries), _json(response.content)
+
+
+class HttpTransport:
+    """Requests against a running server (e.g. a local gunicorn); no query counts."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, body, token):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        req.add_header("Content-Type", "application/json")
+        if token:
+            req.add_header("Authorization", f"Bearer {token}")
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            status, content = exc.code, exc.read()
+        return status, time.perf_counter() - start, None, _json(content)
+
+
+def _json(content):
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
+
+
+def run(transport, context, scenarios=SCENARIOS, requests=1000, warmup=50, seed=0):
+    """
+    Issue ``requests`` requests picked by scenario weight (after ``warmup``
+    unmeasured ones) and return ``{"endpoints": {...}, "total": {...}}``.
+    """
+    rng = random.Random(seed)
+    weights = [s.weight for s in scenarios]
+    samples = {s.name: [] for s in scenarios}
+    started = None
+    for n in range(warmup + requests):
+        if n == warmup:
+            started = time.perf_counter()
+        scenario = rng.choices(scenarios, weights)[0]
+        path, body = scenario.build(context, rng)
+        token = context.access if scenario.auth else None
+        status, elapsed, queries, payload = transport.request(scenario.method, path, body, token)
+        if scenario.after:
+            scenario.after(context, status, payload)
+        if n >= warmup:
+            samples[scenario.name].append((elapsed, queries, status))
+    wall = time.perf_counter() - (started or time.perf_counter())
+    endpoints = {name: summarize(rows) for name, rows in samples.items() if rows}
+    return {"endpoints": endpoints, "total": {"requests": requests, "seconds": round(wall, 3),
+                                            "throughput": round(requests / wall, 1) if wall else None}}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(rows):
+    """Latency percentiles (ms), throughput and query counts for one endpoint."""
+    latencies = sorted(elapsed * 1000 for elapsed, _, _ in rows)
+    queries = [q for _, q, _ in rows if q is not None]
+    busy = sum(latencies) / 1000
+    return {
+        "requests": len(rows),
+        "errors": sum(1 for _, _, status in rows if status >= 400),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "throughput": round(len(rows) / busy, 1) if busy else None,
+        "queries_avg": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Regressions of ``current`` against ``baseline``: p50/p99 slower by more
+    than ``tolerance`` (a fraction), more queries per request, or new errors.
+    Returns ``[(endpoint, metric, baseline value, current value)]``.
+    """
+    regressions = []
+    for name, now in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            if before[metric] and now[metric] > before[metric] * (1 + tolerance):
+                regressions.append((name, metric, before[metric], now[metric]))
+        if before.get("queries_max") is not None and now.get("queries_max") is not None:
+            if now["queries_max"] > before["queries_max"]:
+                regressions.append((name, "queries_max", before["queries_max"], now["queries_max"]))
+        if now["errors"] > before["errors"]:
+            regressions.append((name, "errors", before["errors"], now["errors"]))
+    return regressions
@@ -0,0 +1,347 @@
+# ecommerce_nexus/catalog/bulk.py
+"""
+Bulk product writes (ERP imports, repricing, stock syncs) without per-row
+queries or signals.
+
+Rows are handled in chunks, each in its own transaction. For each chunk the
+existing products (locked ``FOR UPDATE``), the referenced categories and
+therefore every lookup validation needs are read with one query each. Rows
+are then validated with ``ProductSerializer``'s field rules, and the valid
+ones are written with a single ``INSERT ... ON CONFLICT (sku) DO UPDATE``.
+Stock changes become ``InventoryMovement`` rows and every change
+is audited in one batch, as the per-row signals would have done.
+"""
+import csv
+import io
+import json
+import uuid
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import audit
+from . import cache as product_cache
+from .models import Category, InventoryMovement, Product
+from .serializers import ProductSerializer
+
+CHUNK_SIZE = 1000
+# columns an upsert may change on an existing product
+UPSERT_FIELDS = ["title", "description", "price", "category", "stock", "is_active"]
+
+
+class ProductImportSerializer(ProductSerializer):
+    """
+    ``ProductSerializer``'s rules minus the per-row queries: the category
+    lookup and the SKU uniqueness check are done once per chunk by ``upsert``.
+    """
+
+    category_id = serializers.IntegerField(write_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        extra_kwargs = {**ProductSerializer.Meta.extra_kwargs, "sku": {"validators": []}}
+
+
+class UpsertReport:
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.created = self.updated = self.unchanged = 0
+        self.errors = []
+
+    def fail(self, index, sku, errors):
+        self.errors.append({"row": index, "sku": sku, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "dry_run": self.dry_run,
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+
+def read_rows(stream, fmt):
+    """Rows from an uploaded/opened text stream in ``csv``, ``ndjson`` or ``json``."""
+    if fmt == "csv":
+        return [{key: value for key, value in row.items() if value != ""} for row in csv.DictReader(stream)]
+    if fmt == "ndjson":
+        return [json.loads(line) for line in stream if line.strip()]
+    if fmt == "json":
+        data = json.load(stream)
+        return data.get("rows", []) if isinstance(data, dict) else data
+    raise ValueError(f"Unsupported format {fmt!r}")
+
+
+def read_bytes(content, fmt):
+    return read_rows(io.StringIO(content.decode("utf-8-sig")), fmt)
+
+
+def upsert(rows, *, actor=None, dry_run=False, chunk_size=CHUNK_SIZE):
+    """
+    Create or update products matched on ``sku``. ``rows`` are dicts shaped
+    like the product create payload; for existing SKUs omitted fields keep
+    their current value. Returns an ``UpsertReport`` with per-row errors
+    (``row`` is the 0-based index into ``rows``).
+    """
+    report = UpsertReport(dry_run)
+    seen = {}
+    for start in range(0, len(rows), chunk_size):
+        chunk = list(enumerate(rows[start:start + chunk_size], start))
+        _upsert_chunk(chunk, seen, report, actor, dry_run)
+    return report
+
+
+def _upsert_chunk(chunk, seen, report, actor, dry_run):
+    with transaction.atomic():
+        created, updated = _diff_chunk(chunk, seen, report, lock=not dry_run)
+        if not dry_run and (created or updated):
+            try:
+                _write(created, updated, actor)
+            except DatabaseError as exc:
+                # unchanged rows were not written and stay counted as such
+                for index, sku, *_ in created + updated:
+                    report.fail(index, sku, {"non_field_errors": [f"Chunk not written: {exc}"]})
+                return
+    report.created += len(created)
+    report.updated += len(updated)
+
+
+def _diff_chunk(chunk, seen, report, lock):
+    """
+    Validate ``chunk`` and split the valid rows into ``(created, updated)``,
+    counting unchanged ones in ``report``. With ``lock`` the existing products
+    are read ``FOR UPDATE`` (in id order), so the stock movement booked from
+    ``before`` matches the value the upsert overwrites.
+    """
+    skus = {str(row.get("sku", "")).strip() for _, row in chunk if isinstance(row, dict)}
+    products = Product.objects.filter(sku__in=skus).order_by("id")
+    if lock:
+        products = products.select_for_update()
+    existing = {p["sku"]: p for p in products.values("id", "public_id", "slug", "sku", *_columns())}
+    category_ids = {row.get("category_id") for _, row in chunk if isinstance(row, dict)}
+    known_categories = set(
+        Category.objects.filter(pk__in=[c for c in category_ids if str(c).isdigit()]).values_list("pk", flat=True)
+    )
+
+    valid = []
+    for index, row in chunk:
+        if not isinstance(row, dict):
+            report.fail(index, None, {"non_field_errors": ["Expected an object."]})
+            continue
+        sku = str(row.get("sku", "")).strip()
+        if sku in seen:
+            report.fail(index, sku, {"sku": [f"Duplicate of row {seen[sku]}."]})
+            continue
+        current = existing.get(sku)
+        serializer = ProductImportSerializer(data=row, partial=current is not None)
+        if not serializer.is_valid():
+            report.fail(index, sku or None, serializer.errors)
+            continue
+        data = serializer.validated_data
+        if "category_id" in data and data["category_id"] not in known_categories:
+            report.fail(index, sku, {"category_id": [f'Invalid pk "{data["category_id"]}" - object does not exist.']})
+            continue
+        seen[sku] = index
+        valid.append((index, sku, data, current))
+
+    created, updated = [], []
+    for index, sku, data, current in valid:
+        values = {key: value for key, value in data.items() if key != "sku"}
+        if current is None:
+            created.append((index, sku, values))
+        else:
+            before = {field: current[_column(field)] for field in UPSERT_FIELDS}
+            after = {**before, **{field: values[_column(field)] for field in UPSERT_FIELDS if _column(field) in values}}
+            if after == before:
+                report.unchanged += 1
+            else:
+                updated.append((index, sku, current, before, after))
+    return created, updated
+
+
+def _column(field):
+    return "category_id" if field == "category" else field
+
+
+def _columns():
+    return [_column(field) for field in UPSERT_FIELDS]
+
+
+def _write(created, updated, actor):
+    products = []
+    for _, sku, values in created:
+        title = values["title"]
+        products.append(Product(sku=sku, slug=Product.build_slug(title, sku), public_id=uuid.uuid4(), **values))
+    for _, sku, current, _, after in updated:
+        # slug/public_id are not in update_fields; pass the current ones so no other unique index trips
+        values = {_column(field): value for field, value in after.items()}
+        products.append(Product(sku=sku, slug=current["slug"], public_id=current["public_id"], **values))
+
+    with transaction.atomic():
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=["sku"],
+            update_fields=UPSERT_FIELDS + ["updated_at"],
+        )
+        # the upsert does not return ids on every backend; one read covers the new rows
+        new_ids = dict(Product.objects.filter(sku__in=[sku for _, sku, _ in created]).values_list("sku", "id"))
+        by_sku = {p.sku: p for p in products}
+        for sku, pk in new_ids.items():
+            by_sku[sku].pk = pk
+
+        movements, entries = [], []
+        for _, sku, values in created:
+            product = by_sku[sku]
+            entries.append(audit.audit_entry(product, "create", changes=audit.snapshot(product), actor=actor))
+            if product.stock:
+                movements.append(InventoryMovement(product=product, change=product.stock, reason="restock",
+                                                   reference="bulk-import", note="Initial stock from import"))
+        for _, sku, current, before, after in updated:
+            product = by_sku[sku]
+            product.pk = current["id"]
+            changes = {
+                field: [before[field], after[field]] for field in UPSERT_FIELDS if before[field] != after[field]
+            }
+            entries.append(audit.audit_entry(product, "update", changes=changes, actor=actor))
+            if after["stock"] != before["stock"]:
+                movements.append(InventoryMovement(product=product, change=after["stock"] - before["stock"],
+                                                   reason="adjustment", reference="bulk-import", note="Stock set by import"))
+        movements = InventoryMovement.objects.bulk_create(movements)
+        entries.extend(audit.audit_entry(m, "create", actor=actor) for m in movements)
+        audit.record(entries)
+
+        public_ids = [p.public_id for p in products]
+        transaction.on_commit(lambda: product_cache.invalidate_products(public_ids))
+        transaction.on_commit(product_cache.invalidate_search)
+
+
+# -- price / stock updates ------------------------------------------------
+
+UPDATE_FIELDS = ("price", "stock")
+
+
+def update_price_stock(updates, *, actor=None, chunk_size=CHUNK_SIZE):
+    """
+    Apply ``{"public_id" | "sku", "price"?, "stock"?}`` updates. Each chunk
+    locks its products (in id order), validates with ``ProductSerializer``'s
+    price/stock rules and writes all changed rows with one set-based UPDATE,
+    one ``InventoryMovement`` batch and one audit batch.
+    """
+    report = UpsertReport()
+    rules = ProductSerializer()
+    fields = {name: rules.fields[name] for name in UPDATE_FIELDS}
+    seen, seen_ids = set(), set()
+    for start in range(0, len(updates), chunk_size):
+        chunk = list(enumerate(updates[start:start + chunk_size], start))
+        parsed = []
+        for index, row in chunk:
+            key, errors = _update_key(row)
+            values = {}
+            for name, field in fields.items():
+                if errors or name not in row:
+                    continue
+                try:
+                    value = field.run_validation(row[name])
+                    values[name] = getattr(rules, f"validate_{name}")(value)
+                except serializers.ValidationError as exc:
+                    errors[name] = exc.detail
+            if not errors and not values:
+                errors["non_field_errors"] = ["Nothing to update: send price and/or stock."]
+            if not errors and key in seen:
+                errors["non_field_errors"] = ["Product appears more than once."]
+            if errors:
+                report.fail(index, row.get("sku") if isinstance(row, dict) else None, errors)
+                continue
+            seen.add(key)
+            parsed.append((index, key, values))
+        if parsed:
+            _apply_updates(parsed, report, actor, seen_ids)
+    return report
+
+
+def _update_key(row):
+    if not isinstance(row, dict):
+        return None, {"non_field_errors": ["Expected an object."]}
+    if row.get("public_id"):
+        try:
+            return ("public_id", uuid.UUID(str(row["public_id"]))), {}
+        except ValueError:
+            return None, {"public_id": ["Must be a valid UUID."]}
+    if row.get("sku"):
+        return ("sku", str(row["sku"]).strip()), {}
+    return None, {"non_field_errors": ["Identify the product by public_id or sku."]}
+
+
+def _apply_updates(parsed, report, actor, seen_ids):
+    public_ids = [value for _, (kind, value), _ in parsed if kind == "public_id"]
+    skus = [value for _, (kind, value), _ in parsed if kind == "sku"]
+    with transaction.atomic():
+        rows = (
+            Product.objects.select_for_update()
+            .filter(Q(public_id__in=public_ids) | Q(sku__in=skus))
+            .order_by("id")
+            .values("id", "public_id", "sku", *UPDATE_FIELDS)
+        )
+        current = {}
+        for row in rows:
+            current[("public_id", row["public_id"])] = current[("sku", row["sku"])] = row
+
+        changed, entries, movements = [], [], []
+        for index, key, values in parsed:
+            row = current.get(key)
+            if row is None:
+                report.fail(index, key[1] if key[0] == "sku" else None, {key[0]: ["No product matches."]})
+                continue
+            # the same product named once by public_id and once by sku
+            if row["id"] in seen_ids:
+                report.fail(index, row["sku"], {"non_field_errors": ["Product appears more than once."]})
+                continue
+            seen_ids.add(row["id"])
+            changes = {name: [row[name], value] for name, value in values.items() if row[name] != value}
+            if not changes:
+                report.unchanged += 1
+                continue
+            after = {**{name: row[name] for name in UPDATE_FIELDS}, **values}
+            product = Product(id=row["id"], public_id=row["public_id"], sku=row["sku"], **after)
+            changed.append(product)
+            entries.append(audit.audit_entry(product, "update", changes=changes, actor=actor))
+            if "stock" in changes:
+                movements.append(InventoryMovement(product=product, change=after["stock"] - row["stock"],
+                                                   reason="adjustment", reference="bulk-update", note="Stock sync"))
+        if not changed:
+            return
+        set_price_stock(changed)
+        movements = InventoryMovement.objects.bulk_create(movements)
+        entries.extend(audit.audit_entry(m, "create", actor=actor) for m in movements)
+        audit.record(entries)
+        report.updated += len(changed)
+        public_ids = [p.public_id for p in changed]
+        transaction.on_commit(lambda: product_cache.invalidate_products(public_ids))
+
+
+def set_price_stock(products):
+    """
+    Write ``price``/``stock`` of ``products`` in one statement:
+    ``UPDATE ... FROM (VALUES ...)`` on PostgreSQL, ``bulk_update``'s
+    ``CASE WHEN`` elsewhere.
+    """
+    now = timezone.now()
+    connection = connections[Product.objects.db]
+    if connection.vendor != "postgresql":
+        for product in products:
+            product.updated_at = now
+        return Product.objects.bulk_update(products, ["price", "stock", "updated_at"], batch_size=CHUNK_SIZE)
+    table = connection.ops.quote_name(Product._meta.db_table)
+    values = ", ".join(["(%s::bigint, %s::numeric, %s::integer)"] * len(products))
+    params = [value for p in products for value in (p.pk, p.price, p.stock)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS p SET price = v.price, stock = v.stock, updated_at = %s "
+            f"FROM (VALUES {values}) AS v(id, price, stock) WHERE p.id = v.id",
+            [now, *params],
+        )
+        return cursor.rowcount
@@ -0,0 +1,316 @@
+# ecommerce_nexus/catalog/cache.py
+"""
+Read-through cache for product list/detail responses.
+
+Keys embed generation counters instead of being deleted one by one:
+
+* ``catalog:gen:products``  - bumped on any product write; part of every list key
+* ``catalog:gen:categories`` - bumped on category writes; part of every key,
+  since products embed their category
+* ``catalog:gen:product:<public_id>`` - per-product, part of its detail key
+* ``catalog:gen:search`` - bumped when searchable product text may have changed;
+  the in-process search index rebuilds when it moves
+
+Bumping a counter makes the old keys unreachable (they age out by TTL), so
+updating one product never flushes the other products' detail entries.
+
+Hot single-object entries (product detail, category lookups) go through
+``fetch``: concurrent misses for one key share a single computation, within
+a worker (threads wait on the leader) and across workers (a short
+``cache.add`` lock; the others poll for the result). Entries are also
+refreshed early with a probability that grows as expiry approaches
+("XFetch"), so a popular key is recomputed by one request before it expires
+instead of by all of them after.
+
+``afetch`` is the same for the async read views (``catalog.async_views``):
+the requests of one event loop share a task instead of a thread event.
+"""
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from . import replicas
+
+PRODUCTS_GEN = "catalog:gen:products"
+CATEGORIES_GEN = "catalog:gen:categories"
+PRODUCT_GEN = "catalog:gen:product:{}"
+SEARCH_GEN = "catalog:gen:search"
+HITS = "catalog:cache:hits"
+MISSES = "catalog:cache:misses"
+EARLY_REFRESH_BETA = 1.0  # >1 refreshes earlier, <1 later
+POLL_INTERVAL = 0.02
+
+
+def timeout():
+    return getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+
+
+def fill_timeout():
+    # entries read from a lagging replica right after a write are kept only briefly
+    return replicas.fill_timeout(timeout())
+
+
+def lock_timeout():
+    # how long a worker may hold a fill lock, and how long the others wait for it
+    return getattr(settings, "CATALOG_CACHE_LOCK_TIMEOUT", 5)
+
+
+def _fresh_generation():
+    # time-based so a counter that was evicted never restarts at a value old keys used
+    return time.time_ns()
+
+
+def generations(*keys):
+    """Current value of each counter, initialising missing ones."""
+    found = cache.get_many(keys)
+    missing = {key: _fresh_generation() for key in keys if key not in found}
+    for key, value in missing.items():
+        if not cache.add(key, value, None):
+            value = cache.get(key, value)
+        found[key] = value
+    return [found[key] for key in keys]
+
+
+def bump(*keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_generation(), None)
+
+
+def invalidate_products(public_ids=()):
+    """A product changed: drop its detail entry and every listing."""
+    cache.delete_many([PRODUCT_GEN.format(public_id) for public_id in public_ids])
+    bump(PRODUCTS_GEN)
+    replicas.note_write()
+
+
+def invalidate_categories():
+    bump(CATEGORIES_GEN)
+    replicas.note_write()
+
+
+def invalidate_search():
+    bump(SEARCH_GEN)
+
+
+def list_key(request):
+    """One entry per distinct filter/search/ordering/pagination combination."""
+    params = request.query_params
+    items = sorted((key, value) for key in params for value in params.getlist(key))
+    # pagination links are absolute, so the host is part of the key too
+    digest = hashlib.sha1(repr((request.get_host(), items)).encode("utf-8")).hexdigest()
+    products_gen, categories_gen = generations(PRODUCTS_GEN, CATEGORIES_GEN)
+    return f"catalog:products:list:{products_gen}:{categories_gen}:{digest}"
+
+
+def detail_key(public_id):
+    product_gen, categories_gen = generations(PRODUCT_GEN.format(public_id), CATEGORIES_GEN)
+    return f"catalog:products:detail:{public_id}:{product_gen}:{categories_gen}"
+
+
+def category_tree_key():
+    (categories_gen,) = generations(CATEGORIES_GEN)
+    return f"catalog:categories:tree:{categories_gen}"
+
+
+def suggest_key(prefix, limit):
+    (search_gen,) = generations(SEARCH_GEN)
+    digest = hashlib.sha1(prefix.lower().encode("utf-8")).hexdigest()
+    return f"catalog:suggest:{search_gen}:{limit}:{digest}"
+
+
+def lookup(key):
+    value = cache.get(key)
+    _count(HITS if value is not None else MISSES)
+    return value
+
+
+def store(key, value):
+    cache.set(key, value, fill_timeout())
+
+
+async def alookup(key):
+    value = await cache.aget(key)
+    await _acount(HITS if value is not None else MISSES)
+    return value
+
+
+async def astore(key, value):
+    await cache.aset(key, value, await sync_to_async(fill_timeout)())
+
+
+def category_key(pk):
+    (categories_gen,) = generations(CATEGORIES_GEN)
+    return f"catalog:categories:detail:{pk}:{categories_gen}"
+
+
+def category_list_key():
+    (categories_gen,) = generations(CATEGORIES_GEN)
+    return f"catalog:categories:list:{categories_gen}"
+
+
+def fetch(key, compute):
+    """
+    ``(value, hit)`` for ``key``, calling ``compute()`` at most once per key at
+    a time across threads and workers. Exceptions from ``compute`` (e.g. 404)
+    propagate to every waiter and nothing is cached.
+    """
+    entry = cache.get(key)
+    if entry is not None and not _refresh_early(entry):
+        _count(HITS)
+        return entry["value"], True
+    stale = entry["value"] if entry is not None else None
+    _count(HITS if stale is not None else MISSES)
+    return _single_flight(key, lambda: _fill(key, compute, stale)), stale is not None
+
+
+def _refresh_early(entry):
+    # XFetch: recompute before expiry with probability rising as it nears,
+    # weighted by how long the value took to compute
+    gap = -entry["delta"] * EARLY_REFRESH_BETA * math.log(1.0 - random.random())
+    return time.time() + gap >= entry["expires"]
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def _single_flight(key, compute):
+    """Threads of this worker asking for the same key wait for the first one."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        if flight.done.wait(lock_timeout()):
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return compute()
+    try:
+        flight.value = compute()
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+    return flight.value
+
+
+def _fill(key, compute, stale):
+    """Across workers: one holds ``<key>:lock`` and computes, the rest reuse its result."""
+    lock = f"{key}:lock"
+    locked = cache.add(lock, 1, lock_timeout())
+    if not locked:
+        if stale is not None:
+            # someone is already refreshing; the current value is still valid
+            return stale
+        deadline = time.monotonic() + lock_timeout()
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            found = cache.get_many([key, lock])
+            if key in found:
+                return found[key]["value"]
+            if lock not in found:
+                # the holder failed (e.g. a 404) or stored nothing: don't wait out the lock
+                break
+        # the holder died, gave up or is too slow: compute without the lock
+    try:
+        started = time.monotonic()
+        value = compute()
+        ttl = fill_timeout()
+        entry = {"value": value, "delta": time.monotonic() - started, "expires": time.time() + ttl}
+        cache.set(key, entry, ttl)
+        return value
+    finally:
+        if locked:
+            cache.delete(lock)
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+_async_flights = {}
+
+
+async def afetch(key, compute):
+    """``fetch`` for async views; ``compute`` is a coroutine function."""
+    entry = await cache.aget(key)
+    if entry is not None and not _refresh_early(entry):
+        await _acount(HITS)
+        return entry["value"], True
+    stale = entry["value"] if entry is not None else None
+    await _acount(HITS if stale is not None else MISSES)
+    # flights are per loop: a WSGI server runs each async view in its own loop
+    flight_key = (asyncio.get_running_loop(), key)
+    flight = _async_flights.get(flight_key)
+    if flight is None:
+        flight = _async_flights[flight_key] = asyncio.ensure_future(_afill(key, compute, stale))
+        flight.add_done_callback(lambda _flight: _async_flights.pop(flight_key, None))
+    # a disconnecting client must not cancel the fill the others are waiting on
+    return await asyncio.shield(flight), stale is not None
+
+
+async def _afill(key, compute, stale):
+    lock = f"{key}:lock"
+    locked = await cache.aadd(lock, 1, lock_timeout())
+    if not locked:
+        if stale is not None:
+            return stale
+        deadline = time.monotonic() + lock_timeout()
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            found = await cache.aget_many([key, lock])
+            if key in found:
+                return found[key]["value"]
+            if lock not in found:
+                break
+    try:
+        started = time.monotonic()
+        value = await compute()
+        ttl = await sync_to_async(fill_timeout)()
+        entry = {"value": value, "delta": time.monotonic() - started, "expires": time.time() + ttl}
+        await cache.aset(key, entry, ttl)
+        return value
+    finally:
+        if locked:
+            await cache.adelete(lock)
+
+
+async def _acount(key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, None)
+        await cache.aincr(key)
+
+
+def stats():
+    counts = cache.get_many([HITS, MISSES])
+    hits, misses = counts.get(HITS, 0), counts.get(MISSES, 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None}
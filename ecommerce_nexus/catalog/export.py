@@ -0,0 +1,104 @@
+# ecommerce_nexus/catalog/export.py
+"""
+Streaming encoders for bulk exports.
+
+Each function takes an iterator of rows (dicts) and yields ``bytes`` chunks,
+so a ``StreamingHttpResponse`` can send an arbitrarily large result while
+only one database chunk and one output buffer are held in memory.
+``download`` builds that response for the export endpoints.
+"""
+import csv
+import io
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+FLUSH_BYTES = 64 * 1024  # size of the chunks handed to the WSGI server
+
+
+def flatten(row):
+    """``{"category": {"id": 1}}`` -> ``{"category_id": 1}`` for flat formats."""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update({f"{key}_{sub}": sub_value for sub, sub_value in value.items()})
+        else:
+            flat[key] = value
+    return flat
+
+
+def _buffered(pieces):
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= FLUSH_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def ndjson(rows):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    return _buffered(f"{encoder.encode(row)}\n".encode("utf-8") for row in rows)
+
+
+def csv_rows(rows):
+    """CSV with a header taken from the first row; nested dicts are flattened."""
+
+    def lines():
+        out = io.StringIO()
+        writer = None
+        for row in rows:
+            row = flatten(row)
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+
+    return _buffered(lines())
+
+
+def gzipped(chunks, level=6):
+    """Compress a byte stream incrementally into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+FORMATS = {
+    "ndjson": (ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (csv_rows, "text/csv", "csv"),
+}
+
+
+def download(request, name, records):
+    """
+    Stream ``records(output)`` as ``<name>.<extension>`` in the format picked
+    by ``?output=`` (``ndjson`` by default), gzipped with ``?compress=gzip``.
+    ``records`` is only called once the format is known to be valid; an
+    unknown one gets a 400.
+    """
+    # `format` is reserved by DRF for renderer selection, hence `output`
+    output = request.query_params.get("output", "ndjson")
+    if output not in FORMATS:
+        return Response({"output": f"Choose one of: {', '.join(FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+    encode, content_type, extension = FORMATS[output]
+
+    body, filename = encode(records(output)), f"{name}.{extension}"
+    if request.query_params.get("compress") == "gzip":
+        body, content_type, filename = gzipped(body), "application/gzip", f"{filename}.gz"
+
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
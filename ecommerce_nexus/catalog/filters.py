@@ -1,6 +1,7 @@
 # ecommerce_nexus/catalog/filters.py
 import django_filters
-from .models import Product
+from .audit_models import AuditTrail
+from .models import Category, Product
 
 class ProductFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
@@ -8,7 +9,26 @@ class ProductFilter(django_filters.FilterSet):
     # Accept either numeric PK via `category` or friendly slug via `category_slug`
     category = django_filters.NumberFilter(field_name="category", lookup_expr="exact")
     category_slug = django_filters.CharFilter(field_name="category__slug", lookup_expr="iexact")
+    # products anywhere in the subtree below (and including) a category
+    category_tree = django_filters.NumberFilter(method="filter_category_tree")
 
     class Meta:
         model = Product
-        fields = ["category", "category_slug", "min_price", "max_price", "is_active"]
+        fields = ["category", "category_slug", "category_tree", "min_price", "max_price", "is_active"]
+
+    def filter_category_tree(self, queryset, name, value):
+        path = Category.objects.filter(pk=value).values_list("path", flat=True).first()
+        if path is None:
+            return queryset.none()
+        return queryset.filter(category__path__startswith=path)
+
+
+class AuditTrailFilter(django_filters.FilterSet):
+    # exact matches only, so lookups stay on the (model_name, object_pk, created_at)
+    # and (actor, created_at) indexes
+    since = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="gte")
+    until = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="lt")
+
+    class Meta:
+        model = AuditTrail
+        fields = ["model_name", "object_pk", "actor", "action", "since", "until"]
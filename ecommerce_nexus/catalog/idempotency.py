@@ -1,43 +1,189 @@
 # ecommerce_nexus/catalog/idempotency.py
+"""
+Idempotent POSTs keyed on the ``Idempotency-Key`` header.
+
+Before the view runs the key (scoped to the user and path) is reserved
+atomically: ``cache.add`` - ``SET NX`` on Redis - or, with the ``db`` store,
+an INSERT against the unique ``IdempotencyKey.key``. The finished response
+is kept for ``IDEMPOTENCY_TTL`` seconds and replayed to retries; a duplicate
+that arrives while the first request is still running gets 409 with
+``Retry-After`` straight away instead of holding a worker thread while it
+waits. Server errors release the key so the client can retry.
+
+Reservations expire after ``IDEMPOTENCY_LOCK_TTL`` so a crashed worker
+cannot hold a key forever; database rows past ``expires_at`` are reclaimed
+on reuse and purged by ``catalog.tasks.purge_idempotency_keys``.
+"""
+import hashlib
 import json
+from datetime import timedelta
 from functools import wraps
-from django.http import JsonResponse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
 from .models import IdempotencyKey
 
-def idempotent(key_header="Idempotency-Key"):
+HEADER = "Idempotency-Key"
+PENDING = "pending"
+DONE = "done"
+RESERVE_ATTEMPTS = 3  # tries when the key vanishes between the failed reserve and the read
+RETRY_AFTER = 1  # seconds a duplicate of an in-flight request is told to wait
+
+
+def ttl():
+    return getattr(settings, "IDEMPOTENCY_TTL", 24 * 3600)
+
+
+def lock_ttl():
+    return getattr(settings, "IDEMPOTENCY_LOCK_TTL", 60)
+
+
+def scoped_key(request, key):
+    user = getattr(request, "user", None)
+    owner = user.pk if user is not None and user.is_authenticated else "anon"
+    return hashlib.sha256(f"{owner}:{request.path}:{key}".encode("utf-8")).hexdigest()
+
+
+def fingerprint(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode("utf-8")).hexdigest()
+
+
+class CacheStore:
+    """Records live in the configured cache; Redis makes ``add`` a ``SET NX``."""
+
+    prefix = "idempotency:"
+
+    def reserve(self, key, print_, user=None):
+        """``None`` when the key was reserved, else the existing record."""
+        record = {"state": PENDING, "fingerprint": print_}
+        for _ in range(RESERVE_ATTEMPTS):
+            if cache.add(self.prefix + key, record, lock_ttl()):
+                return None
+            existing = self.get(key)
+            if existing is not None:
+                return existing
+        # the key keeps expiring or being released under us: treat it as in flight
+        return record
+
+    def get(self, key):
+        return cache.get(self.prefix + key)
+
+    def complete(self, key, print_, status_code, body):
+        record = {"state": DONE, "fingerprint": print_, "status": status_code, "body": body}
+        cache.set(self.prefix + key, record, ttl())
+
+    def release(self, key):
+        cache.delete(self.prefix + key)
+
+
+class DatabaseStore:
+    """Records are ``IdempotencyKey`` rows; the unique index does the reserving."""
+
+    def reserve(self, key, print_, user=None):
+        # retries are the common duplicate: answer them with one indexed read
+        record = self.get(key)
+        if record is not None:
+            return record
+        for _ in range(RESERVE_ATTEMPTS):
+            now = timezone.now()
+            try:
+                with transaction.atomic():
+                    IdempotencyKey.objects.create(
+                        key=key, fingerprint=print_, user=user, expires_at=now + timedelta(seconds=lock_ttl())
+                    )
+                return None
+            except IntegrityError:
+                pass
+            record = self.get(key)
+            if record is not None:
+                return record
+            # expired (or released) between the INSERT and the read: reclaim and retry
+            IdempotencyKey.objects.filter(key=key, expires_at__lte=now).delete()
+        return {"state": PENDING, "fingerprint": print_}
+
+    def get(self, key):
+        row = (
+            IdempotencyKey.objects.filter(key=key, expires_at__gt=timezone.now())
+            .values("fingerprint", "response_code", "response_body")
+            .first()
+        )
+        if row is None:
+            return None
+        if row["response_code"] is None:
+            return {"state": PENDING, "fingerprint": row["fingerprint"]}
+        return {"state": DONE, "fingerprint": row["fingerprint"],
+                "status": row["response_code"], "body": row["response_body"]}
+
+    def complete(self, key, print_, status_code, body):
+        IdempotencyKey.objects.filter(key=key).update(
+            response_code=status_code, response_body=body,
+            expires_at=timezone.now() + timedelta(seconds=ttl()),
+        )
+
+    def release(self, key):
+        IdempotencyKey.objects.filter(key=key, response_code__isnull=True).delete()
+
+
+STORES = {"cache": CacheStore, "db": DatabaseStore}
+
+
+def get_store():
+    return STORES[getattr(settings, "IDEMPOTENCY_STORE", "cache")]()
+
+
+def _replay(record):
+    return Response(record["body"], status=record["status"], headers={"Idempotent-Replayed": "true"})
+
+
+def _conflict(detail):
+    return Response({"detail": detail}, status=status.HTTP_409_CONFLICT, headers={"Retry-After": str(RETRY_AFTER)})
+
+
+def idempotent(header=HEADER):
     """
-    Decorator for view functions that ensures idempotent POSTs.
-    Usage: decorate your viewset create() method or API view.
+    Decorator for DRF view methods handling POSTs. Requests without the
+    header run as usual; a reused key with a different body gets 422.
     """
+
     def decorator(func):
         @wraps(func)
         def wrapped(view, request, *args, **kwargs):
-            if request.method != "POST":
+            raw = request.headers.get(header)
+            if request.method != "POST" or not raw:
                 return func(view, request, *args, **kwargs)
-            key = request.headers.get(key_header)
-            user = getattr(request, "user", None)
-            if key:
-                try:
-                    existing = IdempotencyKey.objects.get(key=key)
-                    # replay cached response if available
-                    if existing.response_body is not None and existing.response_code:
-                        return JsonResponse(existing.response_body, status=existing.response_code)
-                except IdempotencyKey.DoesNotExist:
-                    # reserve the key (so concurrent requests fail early)
-                    IdempotencyKey.objects.create(key=key, user=user if user.is_authenticated else None)
-            # call original view
-            response = func(view, request, *args, **kwargs)
-            # store response for future replay (best-effort)
-            if key and hasattr(response, "status_code"):
-                try:
-                    body = response.data if hasattr(response, "data") else None
-                    existing = IdempotencyKey.objects.filter(key=key).first()
-                    if existing:
-                        existing.response_code = response.status_code
-                        existing.response_body = body
-                        existing.save(update_fields=["response_code", "response_body"])
-                except Exception:
-                    pass
+            store = get_store()
+            key, print_ = scoped_key(request, raw), fingerprint(request.data)
+            user = request.user if request.user.is_authenticated else None
+
+            record = store.reserve(key, print_, user)
+            if record is not None:
+                if record["fingerprint"] != print_:
+                    return Response({"detail": f"{header} was already used for a different request."},
+                                    status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                if record["state"] == PENDING:
+                    return _conflict("A request with this key is still being processed.")
+                return _replay(record)
+
+            try:
+                response = func(view, request, *args, **kwargs)
+            except Exception:
+                store.release(key)
+                raise
+            if response.status_code >= 500 or not hasattr(response, "data"):
+                store.release(key)
+            else:
+                # round-trip through DRF's encoder so replays match what the client got
+                body = json.loads(json.dumps(response.data, cls=JSONEncoder))
+                store.complete(key, print_, response.status_code, body)
             return response
+
         return wrapped
+
     return decorator
@@ -0,0 +1,105 @@
+# ecommerce_nexus/catalog/inventory.py
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+
+from . import cache as product_cache
+from .models import InventoryMovement, Product
+
+
+class InsufficientStock(Exception):
+    """
+    Raised by ``reserve_stock`` when one or more products cannot cover the request.
+    ``failures`` lists ``{"product_id", "sku", "requested", "available"}`` per short SKU.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        skus = ", ".join(str(f["sku"]) for f in failures)
+        super().__init__(f"Insufficient stock for {skus}")
+
+
+def decrement_stock(quantities):
+    """
+    Decrement ``Product.stock`` for every ``{product_id: qty}`` pair in one
+    conditional UPDATE::
+
+        UPDATE product SET stock = CASE id WHEN .. THEN stock - qty .. END
+        WHERE (id = .. AND stock >= qty) OR ...
+
+    Returns the number of rows updated; a product whose stock is too low is left
+    untouched, so callers compare the result with ``len(quantities)``.
+    """
+    if not quantities:
+        return 0
+    condition = reduce(or_, (Q(pk=pk, stock__gte=qty) for pk, qty in quantities.items()))
+    new_stock = Case(
+        *(When(pk=pk, then=F("stock") - qty) for pk, qty in quantities.items()),
+        default=F("stock"),
+    )
+    return Product.objects.filter(condition).update(stock=new_stock)
+
+
+def shortfalls(quantities):
+    """Products in ``{product_id: qty}`` whose current stock cannot cover qty."""
+    rows = Product.objects.filter(pk__in=quantities).values_list("pk", "sku", "stock")
+    current = {pk: (sku, stock) for pk, sku, stock in rows}
+    failures = []
+    for pk, qty in quantities.items():
+        sku, stock = current.get(pk, (None, 0))
+        if stock < qty:
+            failures.append({"product_id": pk, "sku": sku, "requested": qty, "available": max(stock, 0)})
+    return failures
+
+
+def reserve_stock(lines, *, user=None, reason="order", reference=None, note=""):
+    """
+    Reserve stock without taking ``SELECT ... FOR UPDATE`` locks up front.
+
+    ``lines`` is an iterable of ``(product, quantity, order_item)`` tuples
+    (``order_item`` may be ``None``). All products are decremented by one
+    conditional UPDATE whose affected-row count decides success; the row locks
+    that UPDATE takes are the only ones held, and only from here to commit.
+
+    On success one ``InventoryMovement`` per line is bulk-inserted (``note`` may
+    use ``{quantity}``) and ``(movements, levels)`` is returned, where ``levels``
+    maps product id to ``(stock_before, stock_after)``. On failure nothing is
+    written and ``InsufficientStock`` reports exactly which SKUs were short.
+    """
+    lines = list(lines)
+    quantities = {}
+    for product, qty, _ in lines:
+        quantities[product.pk] = quantities.get(product.pk, 0) + qty
+
+    with transaction.atomic():
+        with transaction.atomic():
+            updated = decrement_stock(quantities)
+            if updated != len(quantities):
+                # undo the rows that did fit; the savepoint keeps the caller's work
+                transaction.set_rollback(True)
+        if updated != len(quantities):
+            raise InsufficientStock(shortfalls(quantities))
+
+        movements = InventoryMovement.objects.bulk_create(
+            [
+                InventoryMovement(
+                    product=product,
+                    order_item=order_item,
+                    user=user,
+                    change=-qty,
+                    reason=reason,
+                    reference=reference,
+                    note=note.format(quantity=qty),
+                )
+                for product, qty, order_item in lines
+            ]
+        )
+        # our UPDATE holds these rows until commit, so the read-back is exact
+        after = dict(Product.objects.filter(pk__in=quantities).values_list("pk", "stock"))
+        # stock is part of the cached product responses
+        public_ids = {product.public_id for product, _, _ in lines}
+        transaction.on_commit(lambda: product_cache.invalidate_products(public_ids))
+    levels = {pk: (after[pk] + qty, after[pk]) for pk, qty in quantities.items()}
+    return movements, levels
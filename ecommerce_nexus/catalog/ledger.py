@@ -0,0 +1,149 @@
+# ecommerce_nexus/catalog/ledger.py
+"""
+Stock derived from the ``InventoryMovement`` ledger.
+
+``take_snapshots`` periodically folds new movements into one ``StockSnapshot``
+row per product (quantity + the last movement id included), so the ledger
+stock of a product is its snapshot plus the few movements recorded since:
+a bounded index range scan on ``(product, id)`` instead of summing the whole
+history. ``reconcile`` compares that figure with the cached ``Product.stock``
+in id-ordered batches and can repair either side.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import audit
+from . import cache as product_cache
+from .models import InventoryMovement, Product, StockSnapshot
+
+BATCH_SIZE = 5000
+SNAPSHOT_LOCK_ID = 0x63617453  # pg_advisory_xact_lock key of take_snapshots
+
+
+def snapshot_lag():
+    # movements younger than this may still belong to uncommitted transactions
+    # holding lower ids, so they are left for the next run
+    return timedelta(seconds=getattr(settings, "STOCK_SNAPSHOT_LAG", 300))
+
+
+def take_snapshots(lag=None, batch_size=BATCH_SIZE):
+    """
+    Fold every movement between the previous watermark and the newest movement
+    older than ``lag`` into the snapshots. Returns the number of products updated.
+
+    Runs are serialized (overlapping beat ticks, a manual run): the watermark
+    is read only once the lock is held, so a run that waited folds nothing
+    the previous one already did.
+    """
+    cutoff = timezone.now() - (snapshot_lag() if lag is None else lag)
+    with transaction.atomic():
+        _lock_snapshots()
+        previous = StockSnapshot.objects.aggregate(top=Max("movement_id"))["top"] or 0
+        upto = InventoryMovement.objects.filter(id__gt=previous, created_at__lte=cutoff).aggregate(top=Max("id"))["top"]
+        if upto is None:
+            return 0
+
+        deltas = dict(
+            InventoryMovement.objects.filter(id__gt=previous, id__lte=upto)
+            .values("product_id")
+            .annotate(delta=Sum("change"))
+            .order_by()
+            .values_list("product_id", "delta")
+        )
+        product_ids = sorted(deltas)
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            current = dict(StockSnapshot.objects.filter(product_id__in=batch).values_list("product_id", "quantity"))
+            StockSnapshot.objects.bulk_create(
+                [StockSnapshot(product_id=pk, quantity=current.get(pk, 0) + deltas[pk], movement_id=upto) for pk in batch],
+                update_conflicts=True,
+                unique_fields=["product"],
+                update_fields=["quantity", "movement_id", "taken_at"],
+            )
+    return len(product_ids)
+
+
+def _lock_snapshots():
+    """Transaction-scoped lock for ``take_snapshots`` (PostgreSQL; SQLite serializes writers itself)."""
+    connection = transaction.get_connection()
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [SNAPSHOT_LOCK_ID])
+
+
+def ledger_stock(product_ids):
+    """``{product_id: stock}`` per the ledger: snapshot + movements after its watermark."""
+    product_ids = list(product_ids)
+    stock = dict.fromkeys(product_ids, 0)
+    stock.update(StockSnapshot.objects.filter(product_id__in=product_ids).values_list("product_id", "quantity"))
+    # a join would drop products that have no snapshot yet
+    watermark = StockSnapshot.objects.filter(product_id=OuterRef("product_id")).values("movement_id")
+    recent = (
+        InventoryMovement.objects.filter(product_id__in=product_ids)
+        .filter(id__gt=Coalesce(Subquery(watermark), Value(0)))
+        .values("product_id")
+        .annotate(delta=Sum("change"))
+        .order_by()
+        .values_list("product_id", "delta")
+    )
+    for pk, delta in recent:
+        stock[pk] += delta
+    return stock
+
+
+def reconcile(batch_size=BATCH_SIZE, fix=None, actor="reconcile"):
+    """
+    Yield ``{"product_id", "sku", "cached", "ledger", "drift"}`` for every
+    product whose cached stock differs from the ledger, one batch at a time.
+
+    ``fix="cache"`` sets ``Product.stock`` to the ledger figure; ``fix="ledger"``
+    books an ``adjustment`` movement so the ledger matches the cached stock.
+    Fixes re-read the drifted rows under ``SELECT ... FOR UPDATE``.
+    """
+    last_id = 0
+    while True:
+        rows = list(
+            Product.objects.filter(id__gt=last_id).order_by("id").values_list("id", "sku", "stock")[:batch_size]
+        )
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        ledger = ledger_stock(pk for pk, _, _ in rows)
+        drift = [(pk, sku, cached, ledger[pk]) for pk, sku, cached in rows if cached != ledger[pk]]
+        if drift and fix:
+            drift = _fix([pk for pk, _, _, _ in drift], fix, actor)
+        for pk, sku, cached, expected in drift:
+            yield {"product_id": pk, "sku": sku, "cached": cached, "ledger": expected, "drift": cached - expected}
+
+
+def _fix(product_ids, fix, actor):
+    with transaction.atomic():
+        products = list(Product.objects.select_for_update().filter(pk__in=product_ids).order_by("id"))
+        ledger = ledger_stock(product_ids)
+        drift = [(p.pk, p.sku, p.stock, ledger[p.pk]) for p in products if p.stock != ledger[p.pk]]
+        changed = {p.pk: p for p in products}
+        entries = []
+        if fix == "cache":
+            for pk, _, cached, expected in drift:
+                product = changed[pk]
+                product.stock = expected
+                entries.append(audit.audit_entry(product, "update", changes={"stock": [cached, expected]}, actor=actor))
+            Product.objects.bulk_update([changed[pk] for pk, _, _, _ in drift], ["stock"])
+            public_ids = [changed[pk].public_id for pk, _, _, _ in drift]
+            transaction.on_commit(lambda: product_cache.invalidate_products(public_ids))
+        elif fix == "ledger":
+            movements = InventoryMovement.objects.bulk_create(
+                InventoryMovement(product_id=pk, change=cached - expected, reason="adjustment",
+                                  reference="reconcile", note="Ledger aligned with cached stock")
+                for pk, _, cached, expected in drift
+            )
+            entries.extend(audit.audit_entry(m, "create", actor=actor) for m in movements)
+        else:
+            raise ValueError(f"Unknown fix {fix!r}; use 'cache' or 'ledger'")
+        audit.record(entries)
+    return drift
@@ -0,0 +1,49 @@
+# ecommerce_nexus/catalog/management/commands/archive_history.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from catalog import archive, ledger, partitions
+
+
+class Command(BaseCommand):
+    help = "Archive InventoryMovement / AuditTrail months past retention to gzip NDJSON and remove them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=sorted(archive.KINDS), help="Archive a single history table")
+        parser.add_argument("--before", help="Archive months before YYYY-MM instead of the retention cutoff")
+        parser.add_argument("--dir", help="Target directory (default settings.ARCHIVE_DIR)")
+        parser.add_argument("--batch-size", type=int, default=archive.BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+        parser.add_argument("--no-snapshot", action="store_true",
+                            help="Skip folding recent movements into snapshots first")
+
+    def handle(self, *args, **opts):
+        before = None
+        if opts["before"]:
+            try:
+                year, month = opts["before"].split("-")
+                before = date(int(year), int(month), 1)
+            except ValueError:
+                raise CommandError("--before must look like YYYY-MM")
+
+        if not opts["dry_run"]:
+            created = partitions.ensure_partitions(connection, timezone.now().date())
+            if created:
+                self.stdout.write(f"Created {created} partition(s)")
+            if not opts["no_snapshot"]:
+                # movements are archived only up to the snapshot watermark
+                ledger.take_snapshots()
+
+        total = 0
+        for kind in [opts["only"]] if opts["only"] else archive.KINDS:
+            for row in archive.archive(kind, directory=opts["dir"], before=before,
+                                       batch_size=opts["batch_size"], dry_run=opts["dry_run"]):
+                total += row["rows"]
+                how = "partition dropped" if row["dropped"] else "rows deleted"
+                if opts["dry_run"]:
+                    how = "dry run"
+                self.stdout.write(f"{row['table']} {row['month']}: {row['rows']} row(s) -> {row['path']} ({how})")
+        self.stdout.write(self.style.SUCCESS(f"{total} row(s) archived" if total else "Nothing to archive"))
@@ -0,0 +1,104 @@
+# ecommerce_nexus/catalog/management/commands/benchmark.py
+import json
+import random
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from catalog import benchmark, seeding
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+
+class Command(BaseCommand):
+    help = "Replay mixed API traffic and report p50/p99 latency, throughput and query counts per endpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000, help="Measured requests (default 1000)")
+        parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests first (default 50)")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for traffic and seeding")
+        parser.add_argument("--only", default="", help="Comma-separated scenario names to run")
+        parser.add_argument("--url", default="", help="Benchmark a running server (e.g. http://127.0.0.1:8000) instead of the in-process client")
+        parser.add_argument("--seed-products", type=int, default=0, help="Seed this many products before running")
+        parser.add_argument("--seed-orders", type=int, default=0, help="Seed this many historical orders before running")
+        parser.add_argument("--category-depth", type=int, default=4, help="Depth of the seeded category tree")
+        parser.add_argument("--category-fanout", type=int, default=5, help="Children per seeded category")
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+        parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+        parser.add_argument("--compare", action="store_true", help="Diff against the baseline; exit non-zero on regressions")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed latency growth before it counts as a regression (default 0.2 = 20%%)")
+        parser.add_argument("--output", default="", help="Also write the results JSON here")
+
+    def handle(self, *args, **opts):
+        if opts["seed_products"]:
+            self._seed(opts)
+
+        scenarios = benchmark.SCENARIOS
+        if opts["only"]:
+            wanted = {name.strip() for name in opts["only"].split(",")}
+            scenarios = [s for s in scenarios if s.name in wanted]
+            if not scenarios:
+                raise CommandError(f"No scenario matches {opts['only']!r}")
+
+        context = benchmark.Context(random.Random(opts["seed"]))
+        if opts["url"]:
+            transport = benchmark.HttpTransport(opts["url"])
+            results = benchmark.run(transport, context, scenarios, opts["requests"], opts["warmup"], opts["seed"])
+        else:
+            # allows the "testserver" host and swaps in the locmem mail backend
+            try:
+                setup_test_environment()
+                owns_environment = True
+            except RuntimeError:  # already inside a test run
+                owns_environment = False
+            try:
+                transport = benchmark.LocalTransport()
+                results = benchmark.run(transport, context, scenarios, opts["requests"], opts["warmup"], opts["seed"])
+            finally:
+                if owns_environment:
+                    teardown_test_environment()
+
+        self._report(results)
+        if opts["output"]:
+            Path(opts["output"]).write_text(json.dumps(results, indent=2))
+
+        baseline_path = Path(opts["baseline"])
+        if opts["compare"]:
+            if not baseline_path.exists():
+                raise CommandError(f"No baseline at {baseline_path}; run with --save-baseline first")
+            regressions = benchmark.compare(results, json.loads(baseline_path.read_text()), opts["tolerance"])
+            for name, metric, before, now in regressions:
+                self.stdout.write(self.style.ERROR(f"REGRESSION {name} {metric}: {before} -> {now}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {baseline_path}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
+        if opts["save_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+
+    def _seed(self, opts):
+        seeder = seeding.Seeder(seed=opts["seed"], progress=seeding.Progress(self.stdout.write), prefix="BENCH")
+        seeder.run(
+            products=opts["seed_products"],
+            users=max(1, opts["seed_orders"] // 100),
+            orders=opts["seed_orders"],
+            depth=opts["category_depth"],
+            fanout=opts["category_fanout"],
+        )
+        self.stdout.write(f"Seeded {opts['seed_products']} products, {opts['seed_orders']} orders")
+
+    def _report(self, results):
+        header = f"{'endpoint':<26}{'reqs':>6}{'err':>5}{'p50 ms':>9}{'p99 ms':>9}{'req/s':>8}{'q avg':>7}{'q max':>7}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, row in sorted(results["endpoints"].items()):
+            self.stdout.write(
+                f"{name:<26}{row['requests']:>6}{row['errors']:>5}{row['p50_ms']:>9}{row['p99_ms']:>9}"
+                f"{row['throughput'] or '-':>8}{row['queries_avg'] if row['queries_avg'] is not None else '-':>7}"
+                f"{row['queries_max'] if row['queries_max'] is not None else '-':>7}"
+            )
+        total = results["total"]
+        self.stdout.write(f"\n{total['requests']} requests in {total['seconds']}s ({total['throughput']} req/s)")
@@ -0,0 +1,44 @@
+# ecommerce_nexus/catalog/management/commands/import_products.py
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import bulk
+
+
+class Command(BaseCommand):
+    help = "Create or update products from a CSV, NDJSON or JSON file, matched on sku"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import")
+        parser.add_argument("--format", dest="fmt", choices=["csv", "ndjson", "json"],
+                            help="Defaults to the file extension")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and count, write nothing")
+        parser.add_argument("--chunk-size", type=int, default=bulk.CHUNK_SIZE, help="Rows per transaction")
+        parser.add_argument("--errors", default="", help="Write the per-row error report (JSON) to this file")
+        parser.add_argument("--actor", default="import", help="Name recorded in the audit trail")
+
+    def handle(self, *args, path, fmt, **opts):
+        source = Path(path)
+        fmt = fmt or source.suffix.lstrip(".").lower()
+        try:
+            with source.open(encoding="utf-8-sig", newline="") as stream:
+                rows = bulk.read_rows(stream, fmt)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        report = bulk.upsert(rows, actor=opts["actor"], dry_run=opts["dry_run"], chunk_size=opts["chunk_size"])
+        result = report.as_dict()
+        prefix = "[dry run] " if opts["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}{result['created']} created, {result['updated']} updated, "
+            f"{result['unchanged']} unchanged, {result['failed']} failed"
+        )
+        if opts["errors"]:
+            Path(opts["errors"]).write_text(json.dumps(result["errors"], indent=2, default=str))
+        else:
+            for error in result["errors"][:20]:
+                self.stderr.write(f"row {error['row']} ({error['sku']}): {json.dumps(error['errors'], default=str)}")
+        if result["failed"]:
+            self.stderr.write(self.style.WARNING(f"{result['failed']} row(s) rejected"))
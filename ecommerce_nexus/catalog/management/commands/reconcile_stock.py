@@ -0,0 +1,30 @@
+# ecommerce_nexus/catalog/management/commands/reconcile_stock.py
+from django.core.management.base import BaseCommand
+
+from catalog import ledger
+
+
+class Command(BaseCommand):
+    help = "Compare cached Product.stock with the InventoryMovement ledger and report (or fix) drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--snapshot", action="store_true", help="Fold recent movements into snapshots first")
+        parser.add_argument("--fix", choices=["cache", "ledger"],
+                            help="cache: set Product.stock from the ledger; ledger: book adjustment movements")
+        parser.add_argument("--batch-size", type=int, default=ledger.BATCH_SIZE)
+        parser.add_argument("--limit", type=int, default=50, help="Drifted products to list (default 50)")
+
+    def handle(self, *args, **opts):
+        if opts["snapshot"]:
+            self.stdout.write(f"Snapshot updated for {ledger.take_snapshots()} product(s)")
+        count = total = 0
+        for row in ledger.reconcile(batch_size=opts["batch_size"], fix=opts["fix"]):
+            count += 1
+            total += abs(row["drift"])
+            if count <= opts["limit"]:
+                self.stdout.write(f"{row['sku']}: cached {row['cached']}, ledger {row['ledger']} ({row['drift']:+d})")
+        if not count:
+            self.stdout.write(self.style.SUCCESS("No drift"))
+            return
+        action = {"cache": "cached stock reset", "ledger": "adjustments booked"}.get(opts["fix"], "not fixed")
+        self.stdout.write(self.style.WARNING(f"{count} product(s) drifted by {total} unit(s) in total; {action}"))
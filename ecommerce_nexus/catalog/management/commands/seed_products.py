@@ -1,13 +1,31 @@
 # ecommerce_nexus/catalog/management/commands/seed_products.py
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from catalog.models import Category, Product
+from catalog.seeding import BATCH_SIZE, SCALE_PROFILE, Progress, Seeder
 import random
-import uuid
+import time
 
 class Command(BaseCommand):
-    help = "Create sample categories and products"
+    help = "Create sample categories and products (use --scale for high-volume staging/benchmark data)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", type=float, default=0,
+            help=f"Generate SCALE x {SCALE_PROFILE['products']:,} products, {SCALE_PROFILE['orders']:,} orders "
+                 f"and {SCALE_PROFILE['users']:,} users, with categories, tags, images and stock movements",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed produces the same data")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per COPY/INSERT batch")
+        parser.add_argument("--category-depth", type=int, default=4, help="Levels in the generated category tree")
+        parser.add_argument("--category-fanout", type=int, default=5, help="Children per generated category")
+        parser.add_argument("--tags", type=int, default=200, help="Distinct tags to generate")
+        parser.add_argument("--images", type=int, default=1, help="Images per product")
+        parser.add_argument("--prefix", default="SEED", help="SKU/username prefix for generated rows")
+
+    def handle(self, *args, **opts):
+        if opts["scale"]:
+            return self._seed_at_scale(opts)
 
-    def handle(self, *args, **kwargs):
         cat, _ = Category.objects.get_or_create(name="General")
         for i in range(1, 11):
             sku = f"SKU-{i:04d}"
@@ -23,3 +41,30 @@ class Command(BaseCommand):
                 },
             )
         self.stdout.write(self.style.SUCCESS("Seeded categories and products"))
+
+    def _seed_at_scale(self, opts):
+        if opts["scale"] < 0 or opts["batch_size"] < 1:
+            raise CommandError("--scale and --batch-size must be positive")
+        counts = {name: max(1, int(per_unit * opts["scale"])) for name, per_unit in SCALE_PROFILE.items()}
+        seeder = Seeder(
+            seed=opts["seed"],
+            batch_size=opts["batch_size"],
+            progress=Progress(self.stdout.write),
+            prefix=opts["prefix"],
+        )
+        started = time.monotonic()
+        written = seeder.run(
+            products=counts["products"],
+            users=counts["users"],
+            orders=counts["orders"],
+            tags=opts["tags"],
+            images=opts["images"],
+            depth=opts["category_depth"],
+            fanout=opts["category_fanout"],
+        )
+        elapsed = time.monotonic() - started
+        total = sum(written.values())
+        summary = ", ".join(f"{count:,} {name}" for name, count in written.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {summary} in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)"
+        ))
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.26 on 2026-10-17 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0007_audittrail_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="catalog_pro_created_d4030d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["price", "id"], name="catalog_pro_price_01671e_idx"
+            ),
+        ),
+    ]
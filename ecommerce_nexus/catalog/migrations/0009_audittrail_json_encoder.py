@@ -0,0 +1,23 @@
+# Generated by Django 4.2.26 on 2026-10-17 20:46
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0008_product_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="audittrail",
+            name="changes",
+            field=models.JSONField(
+                blank=True,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.26 on 2026-10-17 20:51
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# PostgreSQL only: a trigger keeps search_vector in sync with title/sku/description
+# (including bulk_create and COPY writes) and a GIN index serves @@ queries.
+SEARCH_VECTOR_EXPR = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}sku, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}description, '')), 'B')
+"""
+
+CREATE_SQL = f"""
+CREATE OR REPLACE FUNCTION catalog_product_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_EXPR.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER catalog_product_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, sku, description, search_vector ON catalog_product
+    FOR EACH ROW EXECUTE FUNCTION catalog_product_search_vector_update();
+
+UPDATE catalog_product SET search_vector = {SEARCH_VECTOR_EXPR.format(row="")};
+
+CREATE INDEX catalog_product_search_vector_gin ON catalog_product USING gin (search_vector);
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS catalog_product_search_vector_gin;
+DROP TRIGGER IF EXISTS catalog_product_search_vector_trigger ON catalog_product;
+DROP FUNCTION IF EXISTS catalog_product_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_audittrail_json_encoder"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,38 @@
+# catalog/migrations/0011_product_trigram_indexes.py
+from django.db import migrations
+
+# PostgreSQL only: trigram GIN indexes serve the case-insensitive prefix
+# lookups (UPPER(col::text) LIKE UPPER('abc%')) issued by the suggest endpoint.
+CREATE_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS catalog_product_title_upper_trgm
+    ON catalog_product USING gin ((UPPER(title::text)) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS catalog_product_sku_upper_trgm
+    ON catalog_product USING gin ((UPPER(sku::text)) gin_trgm_ops);
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS catalog_product_title_upper_trgm;
+DROP INDEX IF EXISTS catalog_product_sku_upper_trgm;
+"""
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_product_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.26 on 2026-10-17 20:54
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    Category = apps.get_model("catalog", "Category")
+    parents = dict(Category.objects.values_list("id", "parent_id"))
+    paths = {}
+
+    def path_of(pk, seen=()):
+        if pk not in paths:
+            parent = parents[pk]
+            # a pre-existing cycle is cut at the repeated node
+            prefix = "/" if parent is None or parent in seen else path_of(parent, seen + (pk,))
+            paths[pk] = f"{prefix}{pk}/"
+        return paths[pk]
+
+    rows = []
+    for category in Category.objects.all():
+        category.path = path_of(category.pk)
+        category.depth = category.path.count("/") - 2
+        rows.append(category)
+    Category.objects.bulk_update(rows, ["path", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_product_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(build_paths, reverse_code=migrations.RunPython.noop),
+    ]
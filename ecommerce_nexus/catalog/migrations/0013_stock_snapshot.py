@@ -0,0 +1,38 @@
+# Generated by Django 4.2.26 on 2026-10-17 21:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0012_category_path"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_snapshot",
+                        serialize=False,
+                        to="catalog.product",
+                    ),
+                ),
+                ("quantity", models.IntegerField(default=0)),
+                ("movement_id", models.BigIntegerField(default=0)),
+                ("taken_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="inventorymovement",
+            index=models.Index(
+                fields=["product", "id"], name="catalog_inv_product_fa366e_idx"
+            ),
+        ),
+    ]
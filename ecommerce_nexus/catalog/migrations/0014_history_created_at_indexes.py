@@ -0,0 +1,25 @@
+# Generated by Django 4.2.26 on 2026-10-17 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0013_stock_snapshot"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="audittrail",
+            index=models.Index(
+                fields=["created_at"], name="catalog_aud_created_a55e8e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventorymovement",
+            index=models.Index(
+                fields=["created_at"], name="catalog_inv_created_6f096b_idx"
+            ),
+        ),
+    ]
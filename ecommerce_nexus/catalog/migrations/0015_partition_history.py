@@ -0,0 +1,109 @@
+# catalog/migrations/0015_partition_history.py
+from datetime import date
+
+from django.db import migrations
+from django.utils import timezone
+
+# PostgreSQL only: rebuild the append-only history tables as monthly range
+# partitions on created_at so cold months can be archived and dropped whole.
+# The rows are copied once; on large tables run this in a maintenance window.
+# The SQL is kept here rather than imported from catalog.partitions so later
+# changes to the app code cannot alter what this migration did.
+
+TABLES = ("catalog_inventorymovement", "catalog_audittrail")
+MONTHS_AHEAD = 3
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def _next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _create_partition(cursor, table, month):
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {_quote(f'{table}_p{month:%Y%m}')} PARTITION OF {_quote(table)} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        [month.isoformat(), _next_month(month).isoformat()],
+    )
+
+
+def _is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def _partition_table(cursor, table, today):
+    q = _quote
+    legacy = f"{table}_unpartitioned"
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+        [table, f"{table}_pkey"],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(f"SELECT MIN(created_at) FROM {q(table)}")
+    oldest = cursor.fetchone()[0]
+
+    cursor.execute(f"ALTER TABLE {q(table)} RENAME TO {q(legacy)}")
+    cursor.execute(
+        f"CREATE TABLE {q(table)} (LIKE {q(legacy)} INCLUDING DEFAULTS INCLUDING IDENTITY "
+        f"INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)"
+    )
+    cursor.execute(f"ALTER TABLE {q(table)} ADD PRIMARY KEY (id, created_at)")
+    cursor.execute(f"CREATE TABLE {q(table + '_default')} PARTITION OF {q(table)} DEFAULT")
+    month = _month_start(oldest.date() if oldest else today)
+    while month <= _month_start(today):
+        _create_partition(cursor, table, month)
+        month = _next_month(month)
+    for _ in range(MONTHS_AHEAD):
+        _create_partition(cursor, table, month)
+        month = _next_month(month)
+
+    cursor.execute(f"INSERT INTO {q(table)} SELECT * FROM {q(legacy)}")
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE((SELECT MAX(id) FROM {q(table)}), 0) + 1, false)",
+        [table],
+    )
+    cursor.execute(f"DROP TABLE {q(legacy)}")
+    # definitions were read before the rename, so they already target ``table``
+    for _, definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {q(table)} ADD CONSTRAINT {q(name)} {definition}")
+
+
+def partition_history(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            if not _is_partitioned(cursor, table):
+                _partition_table(cursor, table, timezone.now().date())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0014_history_created_at_indexes"),
+    ]
+
+    operations = [
+        # reversing keeps the partitioned tables: the ORM uses them unchanged
+        migrations.RunPython(partition_history, migrations.RunPython.noop),
+    ]
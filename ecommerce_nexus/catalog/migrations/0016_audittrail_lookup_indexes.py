@@ -0,0 +1,26 @@
+# Generated by Django 4.2.26 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0015_partition_history"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="audittrail",
+            index=models.Index(
+                fields=["model_name", "object_pk", "created_at"],
+                name="catalog_aud_model_n_05c1e5_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="audittrail",
+            index=models.Index(
+                fields=["actor", "created_at"], name="catalog_aud_actor_57d4ae_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.26 on 2026-10-17 21:16
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_orders_confirmed(apps, schema_editor):
+    # orders placed before batching were emailed by the old per-order task
+    Order = apps.get_model("catalog", "Order")
+    Order.objects.filter(confirmation_sent_at__isnull=True).update(confirmation_sent_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0017_idempotency_key_expiry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="confirmation_sent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_orders_confirmed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("confirmation_sent_at__isnull", True)),
+                fields=["id"],
+                name="order_unconfirmed_idx",
+            ),
+        ),
+    ]
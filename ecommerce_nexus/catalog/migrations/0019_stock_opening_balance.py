@@ -0,0 +1,64 @@
+# catalog/migrations/0019_stock_opening_balance.py
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 5000
+
+# Products created before stock edits were booked in the ledger have no (or
+# only part of their) history there. Book the difference between the cached
+# Product.stock and the ledger figure as one opening-balance adjustment per
+# product, so the first reconcile_stock run starts from a balanced ledger.
+
+
+def book_opening_balances(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    InventoryMovement = apps.get_model("catalog", "InventoryMovement")
+    StockSnapshot = apps.get_model("catalog", "StockSnapshot")
+
+    product_ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(product_ids), BATCH_SIZE):
+        batch = product_ids[start:start + BATCH_SIZE]
+        stock = dict(Product.objects.filter(id__in=batch).values_list("id", "stock"))
+        # snapshot + movements after its watermark, as catalog.ledger.ledger_stock
+        ledger = dict(StockSnapshot.objects.filter(product_id__in=batch).values_list("product_id", "quantity"))
+        watermark = StockSnapshot.objects.filter(product_id=OuterRef("product_id")).values("movement_id")
+        recent = (
+            InventoryMovement.objects.filter(product_id__in=batch)
+            .filter(id__gt=Coalesce(Subquery(watermark), Value(0)))
+            .values("product_id")
+            .annotate(delta=Sum("change"))
+            .order_by()
+            .values_list("product_id", "delta")
+        )
+        for pk, delta in recent:
+            ledger[pk] = ledger.get(pk, 0) + delta
+        InventoryMovement.objects.bulk_create(
+            [
+                InventoryMovement(
+                    product_id=pk,
+                    change=stock[pk] - ledger.get(pk, 0),
+                    reason="adjustment",
+                    reference="opening-balance",
+                    note="Opening balance",
+                )
+                for pk in batch
+                if stock[pk] != ledger.get(pk, 0)
+            ]
+        )
+
+
+def remove_opening_balances(apps, schema_editor):
+    InventoryMovement = apps.get_model("catalog", "InventoryMovement")
+    InventoryMovement.objects.filter(reference="opening-balance").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0018_order_confirmation_sent_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(book_opening_balances, remove_opening_balances),
+    ]
@@ -0,0 +1,43 @@
+# catalog/migrations/0020_product_prefix_indexes.py
+from django.db import migrations
+
+# PostgreSQL only: a GIN trigram index cannot serve a one- or two-character
+# prefix, so the suggest endpoint's UPPER(col::text) LIKE 'ABC%' lookups get
+# btree text_pattern_ops indexes, which turn them into index range scans.
+# The title trigram index stays for the fuzzy fallback; nothing matches
+# SKUs fuzzily, so the SKU one goes.
+CREATE_SQL = """
+CREATE INDEX IF NOT EXISTS catalog_product_title_upper_prefix
+    ON catalog_product ((UPPER(title::text)) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS catalog_product_sku_upper_prefix
+    ON catalog_product ((UPPER(sku::text)) text_pattern_ops);
+DROP INDEX IF EXISTS catalog_product_sku_upper_trgm;
+"""
+
+DROP_SQL = """
+CREATE INDEX IF NOT EXISTS catalog_product_sku_upper_trgm
+    ON catalog_product USING gin ((UPPER(sku::text)) gin_trgm_ops);
+DROP INDEX IF EXISTS catalog_product_title_upper_prefix;
+DROP INDEX IF EXISTS catalog_product_sku_upper_prefix;
+"""
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0019_stock_opening_balance"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.26 on 2026-10-17 22:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0020_product_prefix_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="confirmation_claimed_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# catalog/migrations/0022_product_prefix_collation_indexes.py
+from django.db import migrations
+
+# PostgreSQL only: the text_pattern_ops indexes from 0020 bound the suggest
+# prefix lookups but cannot return rows in order, so every match was sorted
+# before LIMIT. Btree indexes on UPPER(col) COLLATE "C" serve the prefix as a
+# range (UPPER(col) COLLATE "C" >= 'LA' AND < 'LB') *and* the ORDER BY on the
+# same expression, so the scan stops after the requested candidates.
+CREATE_SQL = """
+CREATE INDEX IF NOT EXISTS catalog_product_title_upper_c
+    ON catalog_product ((UPPER(title::text)) COLLATE "C");
+CREATE INDEX IF NOT EXISTS catalog_product_sku_upper_c
+    ON catalog_product ((UPPER(sku::text)) COLLATE "C");
+DROP INDEX IF EXISTS catalog_product_title_upper_prefix;
+DROP INDEX IF EXISTS catalog_product_sku_upper_prefix;
+"""
+
+DROP_SQL = """
+CREATE INDEX IF NOT EXISTS catalog_product_title_upper_prefix
+    ON catalog_product ((UPPER(title::text)) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS catalog_product_sku_upper_prefix
+    ON catalog_product ((UPPER(sku::text)) text_pattern_ops);
+DROP INDEX IF EXISTS catalog_product_title_upper_c;
+DROP INDEX IF EXISTS catalog_product_sku_upper_c;
+"""
+
+
+def create_collation_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_collation_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0021_order_confirmation_claimed_until"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_collation_indexes, drop_collation_indexes),
+    ]
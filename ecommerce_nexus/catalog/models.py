@@ -1,5 +1,9 @@
 import uuid
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.utils.text import slugify
 from django.db.models import CheckConstraint, Q
 from django.utils import timezone
@@ -27,14 +31,56 @@ class Category(models.Model):
     name = models.CharField(max_length=200, unique=True)
     slug = models.SlugField(max_length=220, unique=True)
     parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.SET_NULL, related_name="children")
+    # materialized path of ancestor ids including our own, e.g. "/1/5/12/";
+    # a subtree is every row whose path starts with ours
+    path = models.CharField(max_length=255, db_index=True, editable=False, default="")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        return super().save(*args, **kwargs)
-    
+        with transaction.atomic():
+            parent_path = ""
+            if self.parent_id is not None:
+                # read the parent's path from the table, the cached instance may be stale
+                parent_path = Category.objects.filter(pk=self.parent_id).values_list("path", flat=True).get()
+                if self.pk is not None and f"/{self.pk}/" in parent_path:
+                    raise ValidationError({"parent": "A category cannot be moved below itself."})
+            result = super().save(*args, **kwargs)
+            old_path = self.path
+            self.path = f"{parent_path or '/'}{self.pk}/"
+            self.depth = self.path.count("/") - 2
+            if self.path != old_path:
+                Category.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+                if old_path:
+                    self.rebase_subtree(old_path, self.path)
+        return result
+
+    @staticmethod
+    def rebase_subtree(old_path, new_path):
+        """Rewrite the paths of every descendant of ``old_path`` in one UPDATE."""
+        shift = new_path.count("/") - old_path.count("/")
+        return (
+            Category.objects.filter(path__startswith=old_path)
+            .exclude(path=old_path)
+            .update(
+                path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + shift,
+            )
+        )
+
+    def ancestor_ids(self):
+        return [int(pk) for pk in self.path.strip("/").split("/")[:-1] if pk]
+
+    def get_ancestors(self):
+        return Category.objects.filter(pk__in=self.ancestor_ids()).order_by("depth")
+
+    def get_descendants(self, include_self=False):
+        qs = Category.objects.filter(path__startswith=self.path)
+        return qs if include_self else qs.exclude(pk=self.pk)
+
     def __str__(self): 
         return self.name
 
@@ -52,14 +98,20 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # maintained by a database trigger on PostgreSQL (see migration 0010), GIN-indexed
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base = slugify(self.title)[:240]
-            unique = f"{base}-{self.sku}"[:270]
-            self.slug = unique
+            self.slug = self.build_slug(self.title, self.sku)
         return super().save(*args, **kwargs)
 
+    @staticmethod
+    def build_slug(title, sku):
+        # what save() assigns; exposed for bulk_create callers, which bypass save()
+        base = slugify(title)[:240]
+        return f"{base}-{sku}"[:270]
+
     def __str__(self):
         return self.title
 
@@ -71,6 +123,9 @@ class Product(models.Model):
             models.Index(fields=["-created_at"]),
             # Composite index for common listing: category + is_active + price
             models.Index(fields=["category", "is_active", "price"]),
+            # Keyset pagination seeks on (sort key, id)
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["price", "id"]),
         ]
 
 
@@ -111,6 +166,10 @@ class Order(models.Model):
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # null until the confirmation email went out; catalog.notifications drains these
+    confirmation_sent_at = models.DateTimeField(null=True, blank=True)
+    # lease of the flush currently emailing this order; expires if that worker dies
+    confirmation_claimed_until = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
@@ -118,6 +177,7 @@ class Order(models.Model):
             models.Index(fields=["user"]),
             models.Index(fields=["status"]),
             models.Index(fields=["-created_at"]),
+            models.Index(fields=["id"], condition=Q(confirmation_sent_at__isnull=True), name="order_unconfirmed_idx"),
         ]
 
 
@@ -170,20 +230,44 @@ class InventoryMovement(models.Model):
     
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # ledger reads: a product's movements after its snapshot watermark
+            models.Index(fields=["product", "id"]),
+            # retention / archival scans by month
+            models.Index(fields=["created_at"]),
+        ]
         
     def __str__(self): 
         return f"{self.product.sku} {self.change} ({self.reason})"
+
+
+class StockSnapshot(models.Model):
+    """
+    Ledger total per product up to a movement watermark: the authoritative
+    stock is ``quantity`` plus the ``change`` of the product's movements with
+    ``id > movement_id`` (see ``catalog.ledger``).
+    """
+    product = models.OneToOneField(Product, primary_key=True, on_delete=models.CASCADE, related_name="stock_snapshot")
+    quantity = models.IntegerField(default=0)
+    movement_id = models.BigIntegerField(default=0)  # last InventoryMovement.id included in quantity
+    taken_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity} @ {self.movement_id}"
     
 
 class IdempotencyKey(models.Model):
     """
     Store idempotency keys for POST endpoints to avoid duplicate processing.
-    Key should be unique per endpoint + user (or per client if unauthenticated).
+    Key is a digest of user + path + the client's Idempotency-Key header; used
+    by ``catalog.idempotency`` when ``IDEMPOTENCY_STORE = "db"``.
     """
     id = models.BigAutoField(primary_key=True)
     key = models.CharField(max_length=255, unique=True, db_index=True)
+    fingerprint = models.CharField(max_length=64, blank=True)  # digest of the request body
     created_at = models.DateTimeField(auto_now_add=True)
-    response_code = models.IntegerField(null=True, blank=True)
+    expires_at = models.DateTimeField(default=timezone.now, db_index=True)
+    response_code = models.IntegerField(null=True, blank=True)  # null while the first request runs
     response_body = models.JSONField(null=True, blank=True)
-    user = models.ForeignKey('User', null=True, blank=True, on_delete=models.SET_NULL)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
 
@@ -0,0 +1,141 @@
+# ecommerce_nexus/catalog/notifications.py
+"""
+Order confirmation emails, sent in batches.
+
+``Order.confirmation_sent_at IS NULL`` is the queue. Placing an order only
+schedules a flush: at most one ``send_pending_confirmations`` task per
+``ORDER_CONFIRMATION_BATCH_SECONDS`` window, debounced through ``cache.add``.
+The task drains every unconfirmed order in id-ordered batches:
+
+* a batch is claimed in a short transaction (``confirmation_claimed_until``,
+  a lease of ``ORDER_CONFIRMATION_CLAIM_SECONDS``) and committed before any
+  mail goes out, so a slow mail server holds no transaction or row lock
+* orders + users in one join, items + products in one prefetch per batch
+* subject and body rendered from templates compiled once
+* every message sent over a single reused mail connection
+
+A rejected recipient only affects its own order. Orders whose send failed
+are unclaimed and stay queued for the next flush, or for the periodic sweep
+by Celery beat; orders of a worker that died mid-batch wait for the lease.
+"""
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+FLUSH_KEY = "catalog:confirmations:flush"
+BATCH_SIZE = 200
+SUBJECT_TEMPLATE = "catalog/email/order_confirmation_subject.txt"
+BODY_TEMPLATE = "catalog/email/order_confirmation.txt"
+
+
+def batch_window():
+    return getattr(settings, "ORDER_CONFIRMATION_BATCH_SECONDS", 10)
+
+
+def claim_timeout():
+    return timedelta(seconds=getattr(settings, "ORDER_CONFIRMATION_CLAIM_SECONDS", 600))
+
+
+def max_age():
+    # older unsent orders are not worth a "thank you" email any more
+    return timedelta(hours=getattr(settings, "ORDER_CONFIRMATION_MAX_AGE_HOURS", 24))
+
+
+def schedule_flush():
+    """Enqueue one flush per batch window, however many orders are committed in it."""
+    from .tasks import send_pending_confirmations
+
+    window = batch_window()
+    if cache.add(FLUSH_KEY, 1, window):
+        send_pending_confirmations.apply_async(countdown=window)
+
+
+def pending(order_ids=None):
+    now = timezone.now()
+    orders = Order.objects.filter(
+        Q(confirmation_claimed_until__isnull=True) | Q(confirmation_claimed_until__lt=now),
+        confirmation_sent_at__isnull=True, created_at__gte=now - max_age(),
+    )
+    if order_ids is not None:
+        orders = orders.filter(id__in=order_ids)
+    return orders
+
+
+def send_confirmations(order_ids=None, batch_size=BATCH_SIZE):
+    """
+    Email every pending order (or only ``order_ids``). Returns counts of
+    ``sent``, ``skipped`` (no address), ``rejected`` (address refused) and
+    the ids that ``failed`` and stay queued.
+    """
+    # orders committed from here on schedule a new flush
+    cache.delete(FLUSH_KEY)
+    subject_template, body_template = get_template(SUBJECT_TEMPLATE), get_template(BODY_TEMPLATE)
+    items = Prefetch("items", queryset=OrderItem.objects.select_related("product").order_by("id"))
+    result = {"sent": 0, "skipped": 0, "rejected": 0, "failed": []}
+    last_id = 0
+    with get_connection() as connection:
+        while True:
+            claimed = claim(order_ids, last_id, batch_size)
+            if not claimed:
+                return result
+            last_id = claimed[-1]
+            batch = Order.objects.filter(id__in=claimed).order_by("id").select_related("user").prefetch_related(items)
+            done, failed = [], []
+            for order in batch:
+                outcome = _send(order, subject_template, body_template, connection)
+                if outcome == "failed":
+                    failed.append(order.id)
+                else:
+                    result[outcome] += 1
+                    done.append(order.id)
+            Order.objects.filter(id__in=done).update(confirmation_sent_at=timezone.now(), confirmation_claimed_until=None)
+            if failed:
+                Order.objects.filter(id__in=failed).update(confirmation_claimed_until=None)
+                result["failed"].extend(failed)
+
+
+def claim(order_ids, after_id, batch_size):
+    """Lease the next ``batch_size`` pending orders past ``after_id``; returns their ids."""
+    with transaction.atomic():
+        # skip rows another worker is claiming right now (PostgreSQL)
+        ids = list(
+            pending(order_ids).filter(id__gt=after_id).order_by("id")
+            .select_for_update(skip_locked=True).values_list("id", flat=True)[:batch_size]
+        )
+        if ids:
+            Order.objects.filter(id__in=ids).update(confirmation_claimed_until=timezone.now() + claim_timeout())
+    return ids
+
+
+def _send(order, subject_template, body_template, connection):
+    email = order.user.email if order.user else ""
+    if not email:
+        return "skipped"
+    context = {"order": order}
+    message = EmailMessage(
+        subject_template.render(context).strip(), body_template.render(context),
+        settings.DEFAULT_FROM_EMAIL, [email], connection=connection,
+    )
+    try:
+        connection.send_messages([message])
+    except smtplib.SMTPRecipientsRefused:
+        logger.warning("Order %s confirmation refused for %s", order.id, email)
+        return "rejected"
+    except Exception:
+        logger.exception("Order %s confirmation failed; will retry", order.id)
+        # the connection may be dead; the next send_messages reopens it
+        connection.close()
+        return "failed"
+    return "sent"
@@ -0,0 +1,224 @@
+# ecommerce_nexus/catalog/pagination.py
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class StandardResultsSetPagination(LimitOffsetPagination):
+    default_limit = 20
+    max_limit = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination: each page is fetched with
+    ``WHERE (key, id) < (last_key, last_id) ORDER BY key, id LIMIT n``
+    instead of an OFFSET, so page cost stays flat however deep the client goes.
+
+    The sort key comes from ``?ordering=`` (restricted to ``keyset_orderings``),
+    ``id`` is the tiebreaker. COUNT(*) only runs when ``?count=true`` is passed.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    count_query_param = "count"
+    ordering_query_param = "ordering"
+    default_limit = 20
+    max_limit = 100
+    keyset_orderings = ("-created_at", "created_at", "-price", "price")
+    default_ordering = "-created_at"
+    tiebreaker = "id"
+    invalid_cursor_message = "Invalid cursor"
+    ordering_mismatch_message = "Cursor was issued for a different ordering"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(request, view)
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = bool(cursor and cursor["r"])
+
+        self.count = None
+        if self._wants_count(request):
+            self.count = queryset.order_by().count()
+
+        field, descending = self.ordering.lstrip("-"), self.ordering.startswith("-")
+        if reverse:
+            descending = not descending
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}{self.tiebreaker}")
+
+        if cursor:
+            op = "lt" if descending else "gt"
+            # the leading field >= / <= k conjunct bounds the index range scan;
+            # the OR alone is not sargable and would scan from the start
+            queryset = queryset.filter(
+                Q(**{f"{field}__{op}e": cursor["k"]}),
+                Q(**{f"{field}__{op}": cursor["k"]})
+                | Q(**{field: cursor["k"], f"{self.tiebreaker}__{op}": cursor["i"]}),
+            )
+
+        rows = list(queryset[: self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[: self.limit]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else cursor is not None
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict(
+            [
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+            ]
+        )
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer", "description": "Only present with ?count=true"},
+                "results": schema,
+            },
+        }
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param], strict=True, cutoff=self.max_limit
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_ordering(self, request, view):
+        ordering = request.query_params.get(self.ordering_query_param, "").strip()
+        allowed = self.keyset_orderings
+        view_fields = getattr(view, "ordering_fields", None)
+        if view_fields:
+            allowed = [o for o in allowed if o.lstrip("-") in view_fields]
+        return ordering if ordering in allowed else self.default_ordering
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self._link_for(self.last_row, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_row is None:
+            return None
+        return self._link_for(self.first_row, reverse=True)
+
+    # -- cursor encoding -------------------------------------------------
+
+    def encode_cursor(self, row, reverse):
+        field = self.ordering.lstrip("-")
+        payload = {
+            "k": self._encode_value(self._value(row, field)),
+            "i": self._value(row, self.tiebreaker),
+            "r": 1 if reverse else 0,
+            "o": self.ordering,
+        }
+        raw = json.dumps(payload, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        invalid = (TypeError, ValueError, KeyError, binascii.Error, DjangoValidationError)
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            ordering = payload["o"]
+        except invalid:
+            raise NotFound(self.invalid_cursor_message)
+        # the key and direction only mean something under the ordering that produced them
+        if ordering != self.ordering:
+            raise ValidationError({self.cursor_query_param: [self.ordering_mismatch_message]})
+        try:
+            key_field = model._meta.get_field(self.ordering.lstrip("-"))
+            id_field = model._meta.get_field(self.tiebreaker)
+            return {
+                "k": key_field.to_python(payload["k"]),
+                "i": id_field.to_python(payload["i"]),
+                "r": bool(payload.get("r")),
+            }
+        except invalid:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _link_for(self, row, reverse):
+        url = replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(row, reverse))
+        return remove_query_param(url, "offset")
+
+    def _wants_count(self, request):
+        return request.query_params.get(self.count_query_param, "").lower() in ("1", "true", "yes")
+
+    @staticmethod
+    def _encode_value(value):
+        # keep full microsecond precision (DjangoJSONEncoder truncates to ms,
+        # which would make the seek skip rows)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _value(row, name):
+        # rows are model instances, or dicts when the view paginates a .values() queryset
+        return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+class AuditTrailPagination(KeysetPagination):
+    """Keyset-only: the audit table is far too large for OFFSET or COUNT(*) pages."""
+
+    keyset_orderings = ("-created_at", "created_at")
+    max_limit = 500
+
+
+class ProductPagination(StandardResultsSetPagination):
+    """
+    Limit/offset by default (unchanged response shape), keyset pagination when the
+    client opts in with ``?pagination=cursor`` or follows a ``cursor`` link.
+    """
+
+    mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.wants_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def wants_keyset(self, request):
+        params = request.query_params
+        return params.get(self.mode_query_param) == "cursor" or self.keyset_class.cursor_query_param in params
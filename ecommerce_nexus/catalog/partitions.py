@@ -0,0 +1,100 @@
+# ecommerce_nexus/catalog/partitions.py
+"""
+Monthly range partitioning of the append-only history tables on PostgreSQL.
+
+``InventoryMovement`` and ``AuditTrail`` are partitioned by ``created_at``
+(one partition per month plus a DEFAULT partition). Nothing references these
+tables by foreign key, so the primary key can become ``(id, created_at)`` as
+PostgreSQL requires; Django keeps addressing rows by ``id``, which stays unique
+through its identity sequence. Migration 0015 rebuilds the tables; cold months
+are archived and then removed with ``DETACH PARTITION`` + ``DROP TABLE``
+instead of mass DELETEs (see ``catalog.archive``). Other databases keep plain
+tables.
+"""
+from datetime import date
+
+PARTITIONED_TABLES = ("catalog_inventorymovement", "catalog_audittrail")
+MONTHS_AHEAD = 3
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(connection, table):
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions(connection, table):
+    """``{month: partition name}`` of the monthly partitions attached to ``table``."""
+    if not is_partitioned(connection, table):
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f"{table}_p"
+    found = {}
+    for name in names:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            found[date(int(suffix[:4]), int(suffix[4:]), 1)] = name
+    return found
+
+
+def create_partition(cursor, table, month):
+    q = _quote
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {q(partition_name(table, month))} PARTITION OF {q(table)} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        [month.isoformat(), next_month(month).isoformat()],
+    )
+
+
+def ensure_partitions(connection, today, months_ahead=MONTHS_AHEAD):
+    """Create this month's and the next ``months_ahead`` partitions where missing."""
+    created = 0
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, table):
+            continue
+        existing = partitions(connection, table)
+        month = month_start(today)
+        with connection.cursor() as cursor:
+            for _ in range(months_ahead + 1):
+                if month not in existing:
+                    create_partition(cursor, table, month)
+                    created += 1
+                month = next_month(month)
+    return created
+
+
+def drop_partition(connection, table, month):
+    name = partitions(connection, table).get(month)
+    if name is None:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {_quote(table)} DETACH PARTITION {_quote(name)}")
+        cursor.execute(f"DROP TABLE {_quote(name)}")
+    return True
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
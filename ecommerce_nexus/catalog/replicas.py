@@ -0,0 +1,125 @@
+# ecommerce_nexus/catalog/replicas.py
+"""
+Read replica routing.
+
+``ReplicaRouter`` sends reads to one of ``DATABASE_REPLICAS`` only inside a
+replica scope, which ``ReplicaReadMixin`` opens for safe requests on the
+product, category and audit viewsets (and ``catalog.async_views`` for its
+anonymous reads). Everything else, including reads inside a transaction on
+the primary, stays on ``default``, so code written against one database
+keeps its semantics.
+
+Read-your-writes: a successful write through one of these viewsets (e.g.
+placing an order) pins that user to the primary for
+``READ_YOUR_WRITES_SECONDS``, long enough for the replicas to catch up.
+Other readers keep using the replicas. Catalog invalidations
+(``catalog.cache``) only note the time of the write: a response cache entry
+filled from a replica within that window may hold pre-write rows, so it
+expires when the window ends instead of after the full cache timeout.
+The scope is cleared when the request finishes, after any streamed body.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = "catalog:db:pinned:{}"
+WRITTEN_AT_KEY = "catalog:db:written-at"
+
+_scope = ContextVar("catalog_replica_scope", default=False)
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def pin_seconds():
+    return getattr(settings, "READ_YOUR_WRITES_SECONDS", 10)
+
+
+def choose(aliases):
+    return random.choice(aliases)
+
+
+def pin(user):
+    if user is not None and user.is_authenticated and replicas():
+        cache.set(PIN_KEY.format(user.pk), 1, pin_seconds())
+
+
+def is_pinned(user):
+    return user is not None and user.is_authenticated and bool(cache.get(PIN_KEY.format(user.pk)))
+
+
+def note_write():
+    if replicas():
+        cache.set(WRITTEN_AT_KEY, time.time(), pin_seconds())
+
+
+def fill_timeout(timeout):
+    """
+    Cache ``timeout`` for a value read now: if it came from a replica that may
+    not have the last write yet, only until the replicas have caught up.
+    """
+    written_at = cache.get(WRITTEN_AT_KEY) if _scope.get() else None
+    if written_at is None:
+        return timeout
+    return max(1, min(timeout, int(written_at + pin_seconds() - time.time()) + 1))
+
+
+def use_replicas(user=None):
+    """Route this request's reads to the replicas unless ``user`` is pinned."""
+    if replicas() and not is_pinned(user):
+        _scope.set(True)
+
+
+@receiver(request_started)
+@receiver(request_finished)
+def _reset_scope(**kwargs):
+    _scope.set(False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if not aliases or not _scope.get():
+            return None
+        # a read inside a write transaction must see that transaction's rows
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return choose(aliases)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """Safe requests read from a replica; successful writes pin the user to the primary."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            use_replicas(request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin(getattr(request, "user", None))
+        return response
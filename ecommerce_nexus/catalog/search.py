@@ -0,0 +1,243 @@
+# ecommerce_nexus/catalog/search.py
+"""
+Product search backends.
+
+On PostgreSQL ``?search=`` matches the trigger-maintained, GIN-indexed
+``Product.search_vector`` and ranks with ``ts_rank``. Other databases (SQLite
+in development) use an in-process inverted index over title/sku/description
+that is rebuilt lazily whenever the search generation counter moves.
+
+Typeahead (``suggest``) uses btree indexes on ``UPPER(title) COLLATE "C"`` and
+``UPPER(sku) COLLATE "C"`` on PostgreSQL, with a pg_trgm fallback on the
+title, and an in-process sorted prefix index elsewhere.
+"""
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Collate, Upper
+from rest_framework import filters
+
+from . import cache as product_cache
+from .models import Product
+
+SEARCH_CONFIG = "english"
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SUGGEST_CANDIDATES = 5  # candidates read per requested suggestion before ranking
+SUGGEST_FUZZY_MIN_LENGTH = 3  # shorter prefixes share too few trigrams to match fuzzily
+
+# weights per field for the in-memory index (mirrors setweight A/A/B in the trigger)
+FIELD_WEIGHTS = (("title", 1.0), ("sku", 1.0), ("description", 0.4))
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class InvertedIndex:
+    """
+    token -> {product_id: weight} postings plus a sorted token list for prefix
+    lookups. Queries AND their terms, as DRF's SearchFilter does, and each term
+    also matches longer tokens it prefixes ("lam" finds "lamp").
+    """
+
+    max_results = 5000
+    chunk_size = 5000
+
+    def __init__(self):
+        self.generation = None
+        self.postings = {}
+        self.tokens = []
+        self._lock = threading.Lock()
+
+    def ensure_current(self, using="default"):
+        (generation,) = product_cache.generations(product_cache.SEARCH_GEN)
+        if generation == self.generation:
+            return
+        with self._lock:
+            if generation != self.generation:
+                self.build(using)
+                self.generation = generation
+
+    def build(self, using="default"):
+        postings = defaultdict(dict)
+        rows = Product.objects.using(using).values_list("id", *(name for name, _ in FIELD_WEIGHTS))
+        for row in rows.iterator(chunk_size=self.chunk_size):
+            product_id = row[0]
+            for (_, weight), text in zip(FIELD_WEIGHTS, row[1:]):
+                for token in tokenize(text):
+                    doc = postings[token]
+                    doc[product_id] = doc.get(product_id, 0.0) + weight
+        self.postings = dict(postings)
+        self.tokens = sorted(self.postings)
+
+    def _term_scores(self, term):
+        scores = {}
+        start = bisect.bisect_left(self.tokens, term)
+        for token in self.tokens[start:]:
+            if not token.startswith(term):
+                break
+            # exact token matches outrank prefix matches
+            boost = 1.0 if token == term else 0.5
+            for product_id, weight in self.postings[token].items():
+                scores[product_id] = scores.get(product_id, 0.0) + weight * boost
+        return scores
+
+    def search(self, text):
+        """``{product_id: score}`` for the best ``max_results`` matches."""
+        terms = tokenize(text)
+        if not terms:
+            return {}
+        result = None
+        for term in terms:
+            scores = self._term_scores(term)
+            if result is None:
+                result = scores
+            else:
+                result = {pk: result[pk] + score for pk, score in scores.items() if pk in result}
+            if not result:
+                return {}
+        best = sorted(result.items(), key=lambda item: item[1], reverse=True)[: self.max_results]
+        return dict(best)
+
+
+inverted_index = InvertedIndex()
+
+
+class PrefixIndex:
+    """Sorted ``(lowercased key, public_id, title, sku)`` entries for active products."""
+
+    def __init__(self):
+        self.generation = None
+        self.entries = []
+        self.keys = []
+        self._lock = threading.Lock()
+
+    def ensure_current(self, using="default"):
+        (generation,) = product_cache.generations(product_cache.SEARCH_GEN)
+        if generation == self.generation:
+            return
+        with self._lock:
+            if generation != self.generation:
+                self.build(using)
+                self.generation = generation
+
+    def build(self, using="default"):
+        entries = []
+        rows = Product.objects.using(using).filter(is_active=True).values_list("public_id", "title", "sku")
+        for public_id, title, sku in rows.iterator(chunk_size=InvertedIndex.chunk_size):
+            entries.append((title.lower(), str(public_id), title, sku))
+            entries.append((sku.lower(), str(public_id), title, sku))
+        entries.sort()
+        self.entries = entries
+        self.keys = [entry[0] for entry in entries]
+
+    def lookup(self, prefix, limit):
+        """Up to ``limit`` candidate ``(public_id, title, sku)`` rows, in key order."""
+        prefix = prefix.lower()
+        found = {}
+        for key, public_id, title, sku in self.entries[bisect.bisect_left(self.keys, prefix):]:
+            if not key.startswith(prefix) or len(found) == limit:
+                break
+            found.setdefault(public_id, (public_id, title, sku))
+        return list(found.values())
+
+
+prefix_index = PrefixIndex()
+
+
+def _prefix_matches(queryset, column, prefix, count):
+    """
+    The first ``count`` rows whose ``column`` starts with ``prefix`` in the
+    order of its ``UPPER(col) COLLATE "C"`` index: a range scan that stops
+    at LIMIT. In the C collation a prefix is the range [prefix, next prefix).
+    """
+    start = prefix.upper()
+    stop = start[:-1] + chr(ord(start[-1]) + 1)
+    return list(
+        queryset.annotate(prefix_key=Collate(Upper(column), "C"))
+        .filter(prefix_key__gte=start, prefix_key__lt=stop)
+        .order_by("prefix_key")
+        .values_list("public_id", "title", "sku")[:count]
+    )
+
+
+def suggest(prefix, limit=10, using="default"):
+    """
+    Up to ``limit`` active products whose title or SKU starts with ``prefix``,
+    as ``{"public_id", "title", "sku"}`` dicts, shortest titles first.
+
+    Only the first ``limit * SUGGEST_CANDIDATES`` matches in key order are
+    ranked, so a one- or two-letter prefix costs the same on any catalog
+    size. On PostgreSQL they come from the ``COLLATE "C"`` indexes; if fewer
+    than ``limit`` match, titles that are merely similar to a long enough
+    prefix (pg_trgm, GIN-indexed) make up the rest, most similar first.
+    """
+    count = limit * SUGGEST_CANDIDATES
+    if connections[using].vendor != "postgresql":
+        prefix_index.ensure_current(using)
+        return _ranked(prefix_index.lookup(prefix, count), limit)
+
+    active = Product.objects.using(using).filter(is_active=True)
+    candidates = {}
+    for column in ("title", "sku"):
+        for row in _prefix_matches(active, column, prefix, count):
+            candidates.setdefault(row[0], row)
+    rows = _ranked(list(candidates.values()), limit)
+    if len(rows) < limit and len(prefix) >= SUGGEST_FUZZY_MIN_LENGTH:
+        target = Upper(Value(prefix))
+        fuzzy = (
+            active.annotate(upper_title=Upper("title"))
+            .filter(upper_title__trigram_similar=target)
+            .exclude(public_id__in=list(candidates))
+            .order_by(TrigramSimilarity("upper_title", target).desc())
+            .values_list("public_id", "title", "sku")[: limit - len(rows)]
+        )
+        rows += [{"public_id": str(public_id), "title": title, "sku": sku} for public_id, title, sku in fuzzy]
+    return rows
+
+
+def _ranked(rows, limit):
+    rows.sort(key=lambda row: (len(row[1]), row[1].lower()))
+    return [{"public_id": str(public_id), "title": title, "sku": sku} for public_id, title, sku in rows[:limit]]
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by full-text search instead of ``ILIKE '%term%'`` on
+    every column. Matches are annotated with ``search_rank`` (see
+    ``RankedOrderingFilter``).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = " ".join(self.get_search_terms(request))
+        if not text:
+            return queryset
+        if connections[queryset.db].vendor == "postgresql":
+            query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+            return queryset.filter(search_vector=query).annotate(
+                search_rank=SearchRank(F("search_vector"), query)
+            )
+        inverted_index.ensure_current(queryset.db)
+        scores = inverted_index.search(text)
+        return queryset.filter(pk__in=list(scores)).annotate(
+            search_rank=Case(
+                *(When(pk=pk, then=Value(score)) for pk, score in scores.items()),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+
+class RankedOrderingFilter(filters.OrderingFilter):
+    """Order search results by relevance unless the client asked for an ordering."""
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and "search_rank" in queryset.query.annotations:
+            return ["-search_rank", "-id"]
+        return super().get_ordering(request, queryset, view)
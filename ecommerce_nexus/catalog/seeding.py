@@ -0,0 +1,298 @@
+# ecommerce_nexus/catalog/seeding.py
+"""
+Bulk data generation for benchmarks and staging.
+
+``Seeder`` streams rows as plain tuples with everything ``save()`` would
+normally compute (ids, slugs, public ids, category paths, timestamps) and
+writes them in large batches: ``COPY ... FROM STDIN`` on PostgreSQL, a single
+multi-row ``executemany`` elsewhere. Ids are assigned up front, so dependent
+rows (images, tags, order items, movements) never read anything back, and the
+sequences are reset afterwards. A fixed ``seed`` yields the same data set.
+"""
+import io
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import cache as product_cache
+from .models import Category, InventoryMovement, Order, OrderItem, Product, ProductImage, ProductTag, Tag
+
+BATCH_SIZE = 5000
+SEED_PASSWORD = "seed-P@ssw0rd"
+
+# rows generated per unit of ``--scale``
+SCALE_PROFILE = {"products": 10_000, "users": 100, "orders": 1_000}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Progress:
+    """Prints ``label: done/total (rate rows/s)`` at most every ``interval`` seconds."""
+
+    def __init__(self, write=None, interval=1.0):
+        self.write = write
+        self.interval = interval
+
+    def start(self, label, total):
+        self.label, self.total, self.done = label, total, 0
+        self.started = self.reported = time.monotonic()
+
+    def advance(self, count):
+        self.done += count
+        now = time.monotonic()
+        if self.write and (now - self.reported >= self.interval or self.done >= self.total):
+            self.reported = now
+            self.write(f"{self.label}: {self.done:,}/{self.total:,} ({self.rate():,.0f} rows/s)")
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed else 0.0
+
+
+class RowWriter:
+    """Writes tuples for ``fields`` of ``model`` in batches, by COPY where possible."""
+
+    def __init__(self, model, fields, using="default"):
+        self.model = model
+        self.fields = [model._meta.get_field(name) for name in fields]
+        self.connection = connections[using]
+        table = self.connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(self.connection.ops.quote_name(f.column) for f in self.fields)
+        self.copy_sql = f"COPY {table} ({columns}) FROM STDIN"
+        placeholders = ", ".join(["%s"] * len(self.fields))
+        self.insert_sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+    def write(self, rows):
+        with self.connection.cursor() as cursor:
+            # psycopg2 cursors expose copy_expert; COPY's text format needs no driver adaptation
+            if self.connection.vendor == "postgresql" and hasattr(cursor.cursor, "copy_expert"):
+                cursor.cursor.copy_expert(self.copy_sql, io.StringIO("".join(map(_copy_line, rows))))
+            else:
+                cursor.executemany(self.insert_sql, self.prepare(rows))
+        return len(rows)
+
+    def prepare(self, rows):
+        # generated values already have the right Python type; only the columns
+        # whose backend representation differs go through get_db_prep_save
+        adapt = [
+            i for i, field in enumerate(self.fields)
+            if field.get_internal_type() in ("DateTimeField", "DateField", "DecimalField", "UUIDField")
+        ]
+        if not adapt:
+            return rows
+        prepared = []
+        for row in rows:
+            row = list(row)
+            for i in adapt:
+                row[i] = self.fields[i].get_db_prep_save(row[i], self.connection)
+            prepared.append(row)
+        return prepared
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_line(row):
+    return "\t".join(map(_copy_value, row)) + "\n"
+
+
+class Seeder:
+    """
+    Deterministic high-volume generator. Every method writes straight to the
+    database in ``batch_size`` chunks and reports through ``progress``.
+    """
+
+    def __init__(self, seed=0, batch_size=BATCH_SIZE, using="default", progress=None, prefix="SEED"):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.using = using
+        self.progress = progress or Progress()
+        self.prefix = prefix
+        self.now = timezone.now()
+        self.counts = {}
+
+    # -- helpers ---------------------------------------------------------
+
+    def next_id(self, model):
+        return (model.objects.using(self.using).aggregate(top=Max("pk"))["top"] or 0) + 1
+
+    def write(self, writers, rows):
+        """Write one batch per model (in ``writers`` order, parents first) in one transaction."""
+        with transaction.atomic(using=self.using):
+            for name, writer in writers.items():
+                if rows.get(name):
+                    self.counts[name] = self.counts.get(name, 0) + writer.write(rows[name])
+
+    def past(self, days=365):
+        return self.now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def reset_sequences(self):
+        connection = connections[self.using]
+        models = [get_user_model(), Category, Tag, Product, ProductImage, ProductTag, Order, OrderItem, InventoryMovement]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    # -- generators ------------------------------------------------------
+
+    def categories(self, depth, fanout):
+        """A full ``fanout``-ary tree ``depth`` levels deep; returns the leaf ids."""
+        next_id = self.next_id(Category)
+        level, rows = [(None, "/")], []
+        for d in range(depth):
+            children = []
+            for parent_id, parent_path in level:
+                for _ in range(fanout):
+                    # ids are fresh, so names stay unique across runs
+                    name, path = f"{self.prefix.title()} category {next_id}", f"{parent_path}{next_id}/"
+                    rows.append((next_id, name, slugify(name), parent_id, path, d, self.now, self.now))
+                    children.append((next_id, path))
+                    next_id += 1
+            level = children
+        fields = ["id", "name", "slug", "parent", "path", "depth", "created_at", "updated_at"]
+        # parents precede their children in ``rows``, so batches keep FK order
+        writers = {"categories": RowWriter(Category, fields, self.using)}
+        for batch in batched(rows, self.batch_size):
+            self.write(writers, {"categories": batch})
+        return [category_id for category_id, _ in level]
+
+    def tags(self, count):
+        first = self.next_id(Tag)
+        rows = [(pk, f"{self.prefix} tag {pk}", slugify(f"{self.prefix} tag {pk}")) for pk in range(first, first + count)]
+        self.write({"tags": RowWriter(Tag, ["id", "name", "slug"], self.using)}, {"tags": rows})
+        return range(first, first + count)
+
+    def products(self, count, category_ids, tag_ids=(), images=1, tags_per_product=2):
+        """
+        ``count`` products plus, per product, ``images`` images, up to
+        ``tags_per_product`` tags and one restock movement matching its stock.
+        Each batch of products is written together with its dependent rows.
+        Returns the range of product ids written.
+        """
+        first = self.next_id(Product)
+        ids = range(first, first + count)
+        next_image, next_link = self.next_id(ProductImage), self.next_id(ProductTag)
+        next_movement = self.next_id(InventoryMovement)
+        picks = min(tags_per_product, len(tag_ids))
+        writers = {
+            "products": RowWriter(Product, ["id", "public_id", "title", "slug", "sku", "description", "price",
+                                            "category", "stock", "is_active", "created_at", "updated_at"], self.using),
+            "images": RowWriter(ProductImage, ["id", "product", "image", "alt_text", "is_main", "created_at"], self.using),
+            "product tags": RowWriter(ProductTag, ["id", "product", "tag"], self.using),
+            "movements": RowWriter(InventoryMovement, ["id", "product", "order_item", "user", "change", "reason",
+                                                       "reference", "note", "created_at"], self.using),
+        }
+        self.progress.start("products", count)
+        for chunk in batched(ids, self.batch_size):
+            rows = {name: [] for name in writers}
+            for pk in chunk:
+                title = f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)} {pk}"
+                sku = f"{self.prefix}-{pk:08d}"
+                created, stock = self.past(), self.rng.randint(0, 500)
+                rows["products"].append((
+                    pk, uuid.UUID(int=self.rng.getrandbits(128), version=4), title, Product.build_slug(title, sku),
+                    sku, f"{title} for staging and benchmarks.", Decimal(self.rng.randint(100, 100000)) / 100,
+                    self.rng.choice(category_ids), stock, True, created, created,
+                ))
+                for i in range(images):
+                    rows["images"].append((next_image, pk, f"https://picsum.photos/seed/{pk}-{i}/600/600", title, i == 0, created))
+                    next_image += 1
+                for tag in self.rng.sample(tag_ids, picks) if picks else ():
+                    rows["product tags"].append((next_link, pk, tag))
+                    next_link += 1
+                rows["movements"].append((next_movement, pk, None, None, stock, "restock", "seed", "Initial stock", created))
+                next_movement += 1
+            self.write(writers, rows)
+            self.progress.advance(len(chunk))
+        return ids
+
+    def users(self, count):
+        """Users sharing one precomputed password hash (``SEED_PASSWORD``)."""
+        User = get_user_model()
+        password = make_password(SEED_PASSWORD)
+        first = self.next_id(User)
+        name = self.prefix.lower()
+        fields = ["id", "username", "email", "password", "first_name", "last_name", "is_staff", "is_active",
+                  "is_superuser", "last_login", "date_joined"]
+        writers = {"users": RowWriter(User, fields, self.using)}
+        self.progress.start("users", count)
+        for chunk in batched(range(first, first + count), self.batch_size):
+            rows = [(pk, f"{name}{pk}", f"{name}{pk}@example.com", password, "", "", False, True, False, None, self.now)
+                    for pk in chunk]
+            self.write(writers, {"users": rows})
+            self.progress.advance(len(chunk))
+        return range(first, first + count)
+
+    def orders(self, count, user_ids, product_ids, max_items=4):
+        """
+        Historical orders spread over the past year with 1..``max_items`` lines.
+        Stock is not touched; unit prices are whatever they were back then.
+        """
+        first = self.next_id(Order)
+        next_item = self.next_id(OrderItem)
+        writers = {
+            "orders": RowWriter(Order, ["id", "user", "status", "total_amount", "created_at", "updated_at"], self.using),
+            "order items": RowWriter(OrderItem, ["id", "order", "product", "quantity", "unit_price"], self.using),
+        }
+        self.progress.start("orders", count)
+        for chunk in batched(range(first, first + count), self.batch_size):
+            rows = {name: [] for name in writers}
+            for pk in chunk:
+                total = Decimal(0)
+                for _ in range(self.rng.randint(1, max_items)):
+                    qty, price = self.rng.randint(1, 3), Decimal(self.rng.randint(100, 100000)) / 100
+                    rows["order items"].append((next_item, pk, self.rng.choice(product_ids), qty, price))
+                    next_item += 1
+                    total += qty * price
+                created = self.past()
+                rows["orders"].append((pk, self.rng.choice(user_ids), self.rng.choice(ORDER_STATUSES), total, created, created))
+            self.write(writers, rows)
+            self.progress.advance(len(chunk))
+        return range(first, first + count)
+
+    def run(self, products=1000, users=10, orders=100, tags=50, images=1, depth=4, fanout=5):
+        """Seed a complete data set; returns row counts per kind."""
+        leaves = self.categories(depth, fanout)
+        tag_ids = self.tags(tags) if tags else ()
+        product_ids = self.products(products, leaves, tag_ids, images=images)
+        if orders:
+            user_ids = self.users(max(users, 1))
+            self.orders(orders, user_ids, product_ids)
+        elif users:
+            self.users(users)
+        self.reset_sequences()
+        # rows were written behind the ORM's back; drop cached responses and indexes
+        product_cache.invalidate_products()
+        product_cache.invalidate_categories()
+        product_cache.invalidate_search()
+        return self.counts
+
+
+ADJECTIVES = ("Classic", "Compact", "Deluxe", "Eco", "Heavy", "Light", "Modern", "Rustic", "Smart", "Vintage")
+NOUNS = ("Bottle", "Chair", "Desk", "Headphones", "Jacket", "Kettle", "Lamp", "Mug", "Shoes", "Table")
+ORDER_STATUSES = ("pending", "paid", "shipped", "delivered", "cancelled")
@@ -1,14 +1,22 @@
 # ecommerce_nexus/catalog/serializers.py
 from rest_framework import serializers
 from decimal import Decimal
-from django.db import transaction
-from .models import Category, Order, OrderItem, Product, InventoryMovement
+from .models import Category, Order, OrderItem, Product
+from .audit_models import AuditTrail
+from . import audit
+from .inventory import InsufficientStock, reserve_stock
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ["id", "name", "slug"]
+        fields = ["id", "name", "slug", "parent"]
         read_only_fields = ["id", "slug"]
+        extra_kwargs = {"parent": {"write_only": True, "required": False}}
+
+    def validate_parent(self, parent):
+        if parent is not None and self.instance is not None and f"/{self.instance.pk}/" in parent.path:
+            raise serializers.ValidationError("A category cannot be moved below itself.")
+        return parent
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -65,6 +73,56 @@ class ProductSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class ProductRowSerializer:
+    """
+    Read-only fast path for product listings.
+
+    Renders ``.values()`` rows (product columns plus ``category__name`` /
+    ``category__slug``) into exactly what ``ProductSerializer`` would produce,
+    without hydrating model instances or walking the DRF field pipeline per row.
+    Converters are taken once from ``ProductSerializer``'s own fields, so the
+    output stays identical; plain str/int/bool fields are passed through.
+
+    ``fields`` (e.g. from ``?fields=id,title,category``) limits the output keys.
+    """
+
+    passthrough = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+    category_columns = {"id": "category_id", "name": "category__name", "slug": "category__slug"}
+    # always selected: keyset pagination reads these from the row
+    required_columns = ("id", "created_at", "price")
+
+    def __init__(self, fields=None):
+        readable = {name: field for name, field in ProductSerializer().fields.items() if not field.write_only}
+        if fields:
+            wanted = {name.strip() for name in fields.split(",")}
+            readable = {name: field for name, field in readable.items() if name in wanted} or readable
+
+        self.converters = []
+        columns = list(self.required_columns)
+        for name, field in readable.items():
+            if name == "category":
+                columns.extend(self.category_columns.values())
+                self.converters.append((name, None, None))
+                continue
+            convert = None if isinstance(field, self.passthrough) else field.to_representation
+            self.converters.append((name, field.source, convert))
+            columns.append(field.source)
+        self.columns = list(dict.fromkeys(columns))
+
+    def to_representation(self, row):
+        data = {}
+        for name, source, convert in self.converters:
+            if source is None:
+                data[name] = {key: row[column] for key, column in self.category_columns.items()}
+                continue
+            value = row[source]
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
 class OrderItemInputSerializer(serializers.Serializer):
     product_id = serializers.IntegerField()
     quantity = serializers.IntegerField(min_value=1)
@@ -99,6 +157,8 @@ class OrderSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Order must include at least one item.")
         product_ids = [it["product_id"] for it in value]
         products = Product.objects.filter(id__in=product_ids).in_bulk()
+        # reused by create() for prices; stock is re-checked atomically there
+        self._products = products
         for it in value:
             prod = products.get(it["product_id"])
             if prod is None:
@@ -117,53 +177,67 @@ class OrderSerializer(serializers.ModelSerializer):
 
         request_user = request.user
 
-        with transaction.atomic():
-            # create the order (user must be a proper User instance)
-            order = Order.objects.create(user=request_user, status="pending", total_amount=Decimal("0.00"))
-
-            total = Decimal("0.00")
-            # lock product rows to avoid race conditions
-            product_ids = [it["product_id"] for it in items_data]
-            products_qs = Product.objects.select_for_update().filter(id__in=product_ids).in_bulk()
-
-            for it in items_data:
-                prod = products_qs.get(it["product_id"])
-                qty = int(it["quantity"])
-                if prod.stock < qty:
-                    # Defensive check (validate_items should catch this)
-                    raise serializers.ValidationError(f"Insufficient stock for {prod.sku}")
-
-                unit_price = prod.price  # Decimal
-                line_total = (unit_price * qty).quantize(unit_price) if isinstance(unit_price, Decimal) else unit_price * qty
-
-                # create the OrderItem and keep reference
-                order_item = OrderItem.objects.create(
-                    order=order,
-                    product=prod,
-                    quantity=qty,
-                    unit_price=unit_price
-                )
-
-                # create inventory movement linked to the order_item
-                InventoryMovement.objects.create(
-                    product=prod,
-                    order_item=order_item,
+        # prices/existence were read (without locks) in validate_items
+        products = getattr(self, "_products", None)
+        if products is None:
+            products = Product.objects.filter(id__in=[it["product_id"] for it in items_data]).in_bulk()
+
+        total = sum(
+            (products[it["product_id"]].price * int(it["quantity"]) for it in items_data),
+            Decimal("0.00"),
+        )
+
+        # one audit INSERT for the order, its items and movements after commit
+        with audit.atomic():
+            # create the order (user must be a proper User instance) with its final total
+            order = Order(user=request_user, status="pending", total_amount=total)
+            order._changed_by = request_user.username
+            order.save()
+
+            # one INSERT for all items
+            order_items = OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order=order,
+                        product=products[it["product_id"]],
+                        quantity=int(it["quantity"]),
+                        unit_price=products[it["product_id"]].price,
+                    )
+                    for it in items_data
+                ]
+            )
+
+            # conditional UPDATE ... WHERE stock >= qty instead of SELECT ... FOR UPDATE;
+            # product rows are only locked from here to commit
+            try:
+                movements, levels = reserve_stock(
+                    [(item.product, item.quantity, item) for item in order_items],
                     user=request_user,
-                    change=-qty,
                     reason="order",
                     reference=str(order.id),
-                    note=f"Order {order.id} created, reserved {qty}"
+                    note=f"Order {order.id} created, reserved {{quantity}}",
                 )
-
-                # decrement cached stock
-                prod.stock = prod.stock - qty
-                prod.save(update_fields=["stock"])
-
-                total += (unit_price * qty)
-
-            # finalize order total
-            order.total_amount = total
-            order.save(update_fields=["total_amount"])
+            except InsufficientStock as exc:
+                raise serializers.ValidationError({"insufficient_stock": exc.failures})
+
+            # bulk_create/update bypass the audit signals, so write those rows in one batch
+            actor = request_user.username
+            audit.record(
+                [audit.audit_entry(obj, "create", actor=actor) for obj in (*order_items, *movements)]
+                + [
+                    audit.audit_entry(products[product_id], "update", changes={"stock": list(level)}, actor=actor)
+                    for product_id, level in levels.items()
+                ]
+            )
+
+            # the response reads order.items and item.product; serve them from memory
+            order._prefetched_objects_cache = {"items": order_items}
             return order
         
-        
\ No newline at end of file
+        
+
+class AuditTrailSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuditTrail
+        fields = ["id", "created_at", "actor", "action", "model_name", "object_pk", "changes"]
+        read_only_fields = fields
@@ -1,68 +1,95 @@
 # ecommerce_nexus/catalog/signals.py
-from django.db.models.signals import post_save, pre_save, post_delete
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, pre_save
 from django.dispatch import receiver
-from django.forms.models import model_to_dict
-from .audit_models import AuditTrail
-from .models import Order, Product, OrderItem, InventoryMovement
-from .tasks import send_order_confirmation
-from django.db.models.signals import post_save
+from . import audit
+from . import cache as product_cache
+from . import notifications
+from .models import Category, Order, Product, OrderItem, InventoryMovement
 
 TRACKED = (Order, Product, OrderItem, InventoryMovement)
 
-@receiver(pre_save)
-def capture_changes(sender, instance, **kwargs):
-    if sender not in TRACKED:
-        return
-    if instance.pk:
-        try:
-            old = sender.objects.get(pk=instance.pk)
-            old_data = model_to_dict(old)
-            new_data = model_to_dict(instance)
-            changes = {}
-            for key in new_data.keys():
-                if old_data.get(key) != new_data.get(key):
-                    changes[key] = [old_data.get(key), new_data.get(key)]
-            if changes:
-                AuditTrail.objects.create(
-                    actor=getattr(instance, "_changed_by", None) or None,
-                    action="update",
-                    model_name=sender.__name__,
-                    object_pk=str(instance.pk),
-                    changes=changes
-                )
-        except sender.DoesNotExist:
-            # new object (will be handled in post_save)
-            pass
-
-@receiver(post_save)
-def book_create(sender, instance, created, **kwargs):
-    if sender not in TRACKED:
-        return
+
+def take_snapshot(sender, instance, **kwargs):
+    # remember loaded values so updates can be diffed without re-reading the row
+    instance._audit_snapshot = audit.snapshot(instance)
+
+
+def capture_changes(sender, instance, created, update_fields=None, **kwargs):
+    current = audit.snapshot(instance)
+    if update_fields is not None:
+        # only the saved fields reached the row; the rest keep their loaded values
+        saved = {instance._meta.get_field(name).name for name in update_fields}
+        current = {**getattr(instance, "_audit_snapshot", {}), **{k: v for k, v in current.items() if k in saved}}
     if created:
-        AuditTrail.objects.create(
-            actor=getattr(instance, "_changed_by", None) or None,
-            action="create",
-            model_name=sender.__name__,
-            object_pk=str(instance.pk),
-            changes=model_to_dict(instance)
-        )
+        audit.record([audit.audit_entry(instance, "create", changes=current)])
+    else:
+        changes = audit.diff(getattr(instance, "_audit_snapshot", {}), current)
+        if changes:
+            audit.record([audit.audit_entry(instance, "update", changes=changes)])
+    instance._audit_snapshot = current
+
 
-@receiver(post_delete)
 def book_delete(sender, instance, **kwargs):
-    if sender not in TRACKED:
+    audit.record([audit.audit_entry(instance, "delete", changes=audit.snapshot(instance))])
+
+
+# connect per tracked model instead of filtering every model's signals at runtime
+for model in TRACKED:
+    post_init.connect(take_snapshot, sender=model, dispatch_uid=f"audit_snapshot_{model.__name__}")
+    post_save.connect(capture_changes, sender=model, dispatch_uid=f"audit_save_{model.__name__}")
+    post_delete.connect(book_delete, sender=model, dispatch_uid=f"audit_delete_{model.__name__}")
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    # after commit, so a concurrent reader cannot re-cache the pre-commit row
+    transaction.on_commit(lambda: product_cache.invalidate_products([instance.public_id]))
+    transaction.on_commit(product_cache.invalidate_search)
+
+
+@receiver(pre_save, sender=Product)
+def measure_stock_change(sender, instance, raw=False, **kwargs):
+    # the load-time snapshot still holds the previous stock here
+    update_fields = kwargs.get("update_fields")
+    if raw or "stock" not in instance.__dict__ or (update_fields is not None and "stock" not in update_fields):
+        instance._stock_delta = 0
         return
-    AuditTrail.objects.create(
-        actor=getattr(instance, "_changed_by", None) or None,
-        action="delete",
-        model_name=sender.__name__,
-        object_pk=str(instance.pk),
-        changes=model_to_dict(instance)
-    )
+    before = 0 if instance._state.adding else getattr(instance, "_audit_snapshot", {}).get("stock", instance.stock)
+    instance._stock_delta = instance.stock - before
+
+
+@receiver(post_save, sender=Product)
+def book_stock_change(sender, instance, created, raw=False, **kwargs):
+    # keep the InventoryMovement ledger complete when stock is edited directly
+    # (API/admin); reservations and bulk writes book their own movements
+    delta, instance._stock_delta = getattr(instance, "_stock_delta", 0), 0
+    if delta and not raw:
+        InventoryMovement.objects.create(
+            product=instance,
+            change=delta,
+            reason="restock" if created else "adjustment",
+            reference="direct-edit",
+            note="Stock set on the product",
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    transaction.on_commit(product_cache.invalidate_categories)
+
+
+@receiver(post_delete, sender=Category)
+def rebase_orphaned_subtree(sender, instance, **kwargs):
+    # children were detached by on_delete=SET_NULL and are roots now
+    if instance.path:
+        Category.rebase_subtree(instance.path, "/")
 
 
 @receiver(post_save, sender=Order)
 def order_created_handler(sender, instance, created, **kwargs):
     if created:
-        # enqueue background job to send email
-        send_order_confirmation.delay(instance.id)
-
+        # the email goes out with the next batch; flushes are debounced per window
+        transaction.on_commit(notifications.schedule_flush)
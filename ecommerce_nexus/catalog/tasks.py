@@ -1,27 +1,84 @@
 # ecommerce_nexus/catalog/tasks.py
+import logging
+
 from celery import shared_task
-from django.core.mail import send_mail
-from django.conf import settings
-from .models import Order
-
-
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def send_order_confirmation(self, order_id):
-    try:
-        order = Order.objects.get(id=order_id)
-        subject = f"Order Confirmation #{order.id}"
-        body = f"Thank you for your order. Total: {order.total_amount}\nItems:\n"
-        for item in order.items.all():
-            body += f"- {item.product.title} x{item.quantity} @ {item.unit_price}\n"
-        # use configured EMAIL_BACKEND. For dev you can use console backend.
-        send_mail(
-            subject,
-            body,
-            settings.DEFAULT_FROM_EMAIL,
-            [order.user.email] if order.user and order.user.email else [],
-            fail_silently=False,
-        )
-        return {"status": "sent", "order": order_id}
-    except Exception as exc:
-        raise self.retry(exc=exc)
+from .audit_models import AuditTrail
+
+logger = logging.getLogger(__name__)
+
+
+# ignore_result: there is no result backend outside Redis deployments
+@shared_task(ignore_result=True)
+def send_pending_confirmations():
+    """Drain unconfirmed orders in batches over one mail connection (see catalog.notifications)."""
+    from .notifications import send_confirmations
+
+    result = send_confirmations()
+    if result["failed"]:
+        logger.warning("%d order confirmation(s) failed and stay queued", len(result["failed"]))
+    return result
+
+
+@shared_task(ignore_result=True)
+def send_order_confirmation(order_id):
+    """Single-order entry point, kept for messages queued before batching."""
+    from .notifications import send_confirmations
+
+    return send_confirmations([order_id])
+
+
+@shared_task
+def write_audit_trail(rows):
+    """Insert a batch of audit rows queued by catalog.audit.write()."""
+    AuditTrail.objects.bulk_create([AuditTrail(**row) for row in rows], batch_size=500)
+    return len(rows)
+
+
+@shared_task
+def purge_idempotency_keys():
+    """Delete IdempotencyKey rows whose replay window has passed."""
+    from django.utils import timezone
+
+    from .models import IdempotencyKey
+
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+@shared_task
+def take_stock_snapshots():
+    """Fold recent InventoryMovements into the per-product StockSnapshots."""
+    from .ledger import take_snapshots
+
+    return take_snapshots()
+
+
+@shared_task
+def reconcile_stock():
+    """Report products whose cached stock drifted from the ledger (no fixes)."""
+    from .ledger import reconcile
+
+    drift = list(reconcile())
+    for row in drift[:50]:
+        logger.warning("Stock drift %(sku)s: cached %(cached)s, ledger %(ledger)s", row)
+    return len(drift)
+
+
+@shared_task
+def archive_history():
+    """Roll history partitions forward, then archive movements and audit rows past retention."""
+    from django.db import connection
+    from django.utils import timezone
+
+    from . import archive, partitions
+    from .ledger import take_snapshots
 
+    partitions.ensure_partitions(connection, timezone.now().date())
+    # archival stops at the snapshot watermark, so fold recent movements first
+    take_snapshots()
+    archived = 0
+    for kind in archive.KINDS:
+        for month in archive.archive(kind):
+            logger.info("Archived %(rows)s %(table)s row(s) for %(month)s to %(path)s", month)
+            archived += month["rows"]
+    return archived
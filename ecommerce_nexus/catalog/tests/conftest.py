@@ -0,0 +1,11 @@
+# catalog/tests/conftest.py
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # product responses are cached; DB rollbacks between tests do not reset the cache
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,68 @@
+# catalog/tests/test_archive.py
+import gzip
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from decimal import Decimal
+from django.core.management import call_command
+
+from catalog import archive, ledger
+from catalog.audit_models import AuditTrail
+from catalog.models import Category, InventoryMovement, Product
+
+pytestmark = pytest.mark.django_db
+
+OLD = datetime(2024, 3, 15, 12, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def product():
+    return Product.objects.create(
+        title="Archive", sku="ARC-1", price=Decimal("1.00"), category=Category.objects.create(name="Archive"), stock=10
+    )
+
+
+def _read(path):
+    with gzip.open(path, "rt") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_old_audit_months_are_archived_and_deleted(tmp_path):
+    AuditTrail.objects.all().delete()
+    old = [AuditTrail.objects.create(action="update", model_name="Product", object_pk=str(n), created_at=OLD)
+           for n in range(3)]
+    AuditTrail.objects.create(action="update", model_name="Product", object_pk="x", created_at=OLD + timedelta(days=31))
+    recent = AuditTrail.objects.create(action="update", model_name="Product", object_pk="new")
+
+    months = list(archive.archive("audit", directory=str(tmp_path), before=date(2024, 5, 1), batch_size=2))
+    assert [(m["month"], m["rows"]) for m in months] == [("2024-03", 3), ("2024-04", 1)]
+    assert [row["object_pk"] for row in _read(months[0]["path"])] == [a.object_pk for a in old]
+    assert list(AuditTrail.objects.values_list("pk", flat=True)) == [recent.pk]
+
+    # archiving the same month again appends a second gzip member
+    AuditTrail.objects.create(action="delete", model_name="Product", object_pk="late", created_at=OLD)
+    list(archive.archive("audit", directory=str(tmp_path), before=date(2024, 4, 1)))
+    assert [row["object_pk"] for row in _read(months[0]["path"])] == ["0", "1", "2", "late"]
+
+
+def test_movements_stop_at_the_snapshot_watermark(product, tmp_path):
+    ledger.take_snapshots(lag=timedelta(0))
+    InventoryMovement.objects.create(product=product, change=-2, reason="order")
+    InventoryMovement.objects.update(created_at=OLD)
+
+    call_command("archive_history", "--only", "movements", "--before", "2024-04",
+                 "--dir", str(tmp_path), "--no-snapshot")
+    # the restock was folded into the snapshot; the order movement was not
+    assert list(InventoryMovement.objects.values_list("change", flat=True)) == [-2]
+    assert ledger.ledger_stock([product.pk]) == {product.pk: 8}
+    [row] = _read(archive.archive_path(str(tmp_path), InventoryMovement, date(2024, 3, 1)))
+    assert (row["product_id"], row["change"], row["reason"]) == (product.pk, 10, "restock")
+
+
+def test_dry_run_keeps_rows(tmp_path, capsys):
+    AuditTrail.objects.create(action="create", model_name="Order", object_pk="1", created_at=OLD)
+    call_command("archive_history", "--only", "audit", "--before", "2024-04", "--dir", str(tmp_path), "--dry-run")
+    assert "1 row(s) archived" in capsys.readouterr().out
+    assert AuditTrail.objects.count() == 1
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,131 @@
+# catalog/tests/test_async_views.py
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+from asgiref.sync import async_to_sync
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from catalog import async_views
+from catalog import cache as product_cache
+from catalog.models import Category, Product
+from catalog.urls import router
+
+pytestmark = pytest.mark.django_db
+
+VIEWS = {pattern.name: pattern.callback for pattern in async_views.wrap(router.urls) if pattern.name in async_views.HANDLERS}
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def catalog():
+    root = Category.objects.create(name="Async")
+    child = Category.objects.create(name="Child", parent=root)
+    products = [Product.objects.create(title=f"Async {i}", sku=f"ASYNC-{i}", price=Decimal("3.50"), category=child, stock=4)
+                for i in range(3)]
+    Product.objects.create(title="Hidden", sku="ASYNC-H", price=Decimal("1.00"), category=root, is_active=False)
+    return products
+
+
+def _call(name, path, headers=None, **kwargs):
+    request = RequestFactory().get(path, **(headers or {}))
+    return async_to_sync(VIEWS[name])(request, **kwargs).render()
+
+
+def _sync(path):
+    cache.clear()
+    return APIClient().get(path).json()
+
+
+@pytest.mark.parametrize("name, path, kwargs", [
+    ("product-list", "/api/products/?limit=2&offset=1", {}),
+    ("product-list", "/api/products/?fields=id,title,category", {}),
+    ("category-list", "/api/categories/", {}),
+    ("category-tree", "/api/categories/tree/", {}),
+])
+def test_async_reads_match_the_drf_views(catalog, name, path, kwargs, django_assert_num_queries):
+    response = _call(name, path, **kwargs)
+    assert response.status_code == 200
+    body = json.loads(response.content)
+    with django_assert_num_queries(0):
+        assert json.loads(_call(name, path, **kwargs).content) == body
+    assert body == _sync(path)
+
+
+def test_product_and_category_detail(catalog):
+    product = catalog[0]
+    first = _call("product-detail", f"/api/products/{product.public_id}/", public_id=str(product.public_id))
+    again = _call("product-detail", f"/api/products/{product.public_id}/", public_id=str(product.public_id))
+    assert (first["X-Cache"], again["X-Cache"]) == ("MISS", "HIT")
+    assert json.loads(first.content) == _sync(f"/api/products/{product.public_id}/")
+
+    category = product.category
+    assert json.loads(_call("category-detail", f"/api/categories/{category.pk}/", pk=str(category.pk)).content) == \
+        _sync(f"/api/categories/{category.pk}/")
+
+
+def test_everything_else_goes_to_the_drf_view(catalog):
+    hidden = Product.objects.get(is_active=False)
+    missing = uuid.uuid4()
+    assert _call("product-detail", f"/api/products/{missing}/", public_id=str(missing)).status_code == 404
+    assert _call("product-detail", f"/api/products/{hidden.public_id}/", public_id=str(hidden.public_id)).status_code == 404
+    # staff requests carry a token and see inactive products
+    staff = get_user_model().objects.create_user(username="async", password="x", is_staff=True)
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(staff)}"}
+    res = _call("product-detail", f"/api/products/{hidden.public_id}/", headers, public_id=str(hidden.public_id))
+    assert res.status_code == 200
+    # filtered listings run through the DRF filter backends
+    res = _call("product-list", "/api/products/?search=Async 1")
+    assert [row["title"] for row in res.data["results"]] == ["Async 1"]
+
+
+def test_concurrent_misses_share_one_query(django_assert_num_queries):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": 1}
+
+    async def burst():
+        return await asyncio.gather(*(product_cache.afetch("k", compute) for _ in range(5)))
+
+    results = async_to_sync(burst)()
+    assert len(calls) == 1
+    assert [value for value, _ in results] == [{"id": 1}] * 5
+
+
+
+SETTINGS_PROBE = """
+from django.core.exceptions import ImproperlyConfigured
+try:
+    from ecommerce_nexus import settings
+except ImproperlyConfigured:
+    print("ImproperlyConfigured")
+else:
+    print(settings.DATABASES["default"]["CONN_MAX_AGE"])
+"""
+
+
+@pytest.mark.parametrize("conn_max_age, outcome", [(None, "0"), ("0", "0"), ("600", "ImproperlyConfigured")])
+def test_async_mode_keeps_connections_closed(conn_max_age, outcome):
+    # settings are evaluated once per process, so load them fresh in a child
+    environ = {key: value for key, value in os.environ.items() if key != "DB_CONN_MAX_AGE"}
+    environ["ASYNC_READ_VIEWS"] = "1"
+    if conn_max_age is not None:
+        environ["DB_CONN_MAX_AGE"] = conn_max_age
+    result = subprocess.run([sys.executable, "-c", SETTINGS_PROBE], env=environ, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == outcome
@@ -0,0 +1,109 @@
+# catalog/tests/test_audit.py
+import pytest
+from decimal import Decimal
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from catalog import audit
+from catalog.audit_models import AuditTrail
+from catalog.models import Category, Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def product(django_capture_on_commit_callbacks):
+    cat = Category.objects.create(name="Audited")
+    with django_capture_on_commit_callbacks(execute=True):
+        return Product.objects.create(title="Lamp", sku="AUD-1", price=Decimal("9.99"), category=cat, stock=3)
+
+
+def test_create_is_recorded_on_commit(product):
+    entry = AuditTrail.objects.get(action="create", model_name="Product")
+    assert entry.object_pk == str(product.pk)
+    assert entry.changes["price"] == "9.99"
+
+
+def test_update_is_diffed_without_reloading_the_row(product, django_capture_on_commit_callbacks, django_assert_num_queries):
+    loaded = Product.objects.get(pk=product.pk)
+    loaded.price = Decimal("8.50")
+    loaded._changed_by = "clerk"
+    with django_capture_on_commit_callbacks(execute=True):
+        # the UPDATE only: no SELECT of the old row, no INSERT until commit
+        with django_assert_num_queries(1):
+            loaded.save()
+    entry = AuditTrail.objects.get(action="update")
+    assert entry.actor == "clerk"
+    assert entry.changes == {"price": ["9.99", "8.50"]}
+
+
+def _audit_inserts(queries):
+    return [q for q in queries if q["sql"].startswith('INSERT INTO "catalog_audittrail"')]
+
+
+def test_saves_in_one_block_are_written_in_one_batch(product, django_capture_on_commit_callbacks):
+    with CaptureQueriesContext(connection) as ctx:
+        with django_capture_on_commit_callbacks(execute=True):
+            with audit.atomic():
+                for stock in (4, 5, 6):
+                    product.stock = stock
+                    product.save()
+    assert len(_audit_inserts(ctx.captured_queries)) == 1
+    assert AuditTrail.objects.filter(action="update", model_name="Product").count() == 3
+
+
+def test_unchanged_save_and_rolled_back_work_are_not_recorded(product, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        product.save()
+        try:
+            with transaction.atomic():
+                product.stock = 0
+                product.save()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+    assert not AuditTrail.objects.filter(action="update").exists()
+
+
+@pytest.mark.parametrize("block", [transaction.atomic, audit.atomic])
+def test_rolled_back_savepoint_drops_only_its_entries(block, product, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with block():
+            product.stock = 4
+            product.save()
+            try:
+                with transaction.atomic():
+                    product.stock = 0
+                    product.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            # instances are not rolled back with the savepoint; reload
+            reloaded = Product.objects.get(pk=product.pk)
+            reloaded.title = "Desk lamp"
+            reloaded.save()
+    changes = list(AuditTrail.objects.filter(action="update").order_by("id").values_list("changes", flat=True))
+    assert changes == [{"stock": [3, 4]}, {"title": ["Lamp", "Desk lamp"]}]
+
+
+def test_django_drops_on_commit_hooks_of_rolled_back_savepoints(django_capture_on_commit_callbacks):
+    # the public behaviour record() relies on instead of reading the hook list
+    ran = []
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            transaction.on_commit(lambda: ran.append("outer"))
+            try:
+                with transaction.atomic():
+                    transaction.on_commit(lambda: ran.append("inner"))
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            transaction.on_commit(lambda: ran.append("last"))
+    assert ran == ["outer", "last"]
+
+
+def test_delete_is_recorded(product, django_capture_on_commit_callbacks):
+    pk = product.pk
+    with django_capture_on_commit_callbacks(execute=True):
+        product.delete()
+    assert AuditTrail.objects.get(action="delete", model_name="Product").object_pk == str(pk)
@@ -0,0 +1,50 @@
+# catalog/tests/test_benchmark.py
+import json
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from catalog import benchmark
+from catalog.models import Category, Order, Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_confirmation_email(monkeypatch):
+    monkeypatch.setattr("catalog.notifications.schedule_flush", lambda: None)
+
+
+def test_benchmark_seeds_runs_and_diffs_against_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    call_command(
+        "benchmark", "--seed-products=60", "--seed-orders=10", "--category-depth=2", "--category-fanout=3",
+        "--requests=80", "--warmup=5", f"--baseline={baseline}", "--save-baseline",
+    )
+    assert Product.objects.count() == 60 and Order.objects.count() >= 10
+    leaf = Category.objects.filter(depth=1).first()
+    assert leaf.path == f"/{leaf.parent_id}/{leaf.pk}/"
+
+    results = json.loads(baseline.read_text())
+    assert results["total"]["requests"] == 80
+    detail = results["endpoints"]["products.detail"]
+    assert detail["errors"] == 0 and detail["p50_ms"] <= detail["p99_ms"] and detail["queries_max"] >= 1
+    assert all(row["errors"] == 0 for row in results["endpoints"].values())
+
+    call_command("benchmark", "--requests=20", "--warmup=0", f"--baseline={baseline}", "--compare", "--tolerance=100")
+
+
+def test_compare_flags_slower_and_chattier_endpoints():
+    row = {"p50_ms": 10, "p99_ms": 20, "queries_max": 2, "errors": 0}
+    baseline = {"endpoints": {"products.list": row}}
+    current = {"endpoints": {"products.list": {**row, "p99_ms": 30, "queries_max": 3}}}
+    assert benchmark.compare(current, baseline) == [
+        ("products.list", "p99_ms", 20, 30),
+        ("products.list", "queries_max", 2, 3),
+    ]
+
+
+def test_compare_requires_a_baseline(tmp_path):
+    Product.objects.create(title="x", sku="x", price=1, category=Category.objects.create(name="x"), stock=1)
+    with pytest.raises(CommandError):
+        call_command("benchmark", "--requests=1", "--warmup=0", f"--baseline={tmp_path / 'none.json'}", "--compare")
@@ -0,0 +1,77 @@
+# catalog/tests/test_bulk_update.py
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from catalog.audit_models import AuditTrail
+from catalog.models import Category, InventoryMovement, Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def staff_client():
+    staff = get_user_model().objects.create_user(username="pricing", password="x", is_staff=True)
+    client = APIClient()
+    client.force_authenticate(staff)
+    return client
+
+
+@pytest.fixture
+def products():
+    cat = Category.objects.create(name="Repriced")
+    Product.objects.bulk_create(
+        Product(title=f"R{i}", slug=f"r-{i}", sku=f"REP-{i}", price=Decimal("10.00"), category=cat, stock=5)
+        for i in range(3)
+    )
+    return list(Product.objects.order_by("sku"))
+
+
+def test_bulk_update_writes_changes_movements_and_audit(
+    staff_client, products, django_assert_max_num_queries, django_capture_on_commit_callbacks
+):
+    first, second, third = products
+    updates = [
+        {"public_id": str(first.public_id), "price": "12.50"},
+        {"sku": second.sku, "stock": 2},
+        {"sku": third.sku, "price": "10.00"},  # unchanged
+        {"sku": "REP-404", "stock": 1},
+        {"sku": first.sku, "price": "-3"},
+    ]
+    # lock/read, one UPDATE, movements, audit rows (+ savepoints)
+    with django_assert_max_num_queries(8), django_capture_on_commit_callbacks(execute=True):
+        res = staff_client.post("/api/products/bulk-update/", updates, format="json")
+    assert (res.data["updated"], res.data["unchanged"], res.data["failed"]) == (2, 1, 2)
+    assert sorted(e["row"] for e in res.data["errors"]) == [3, 4]
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.price, first.stock, second.price, second.stock) == (Decimal("12.50"), 5, Decimal("10.00"), 2)
+    movement = InventoryMovement.objects.get()
+    assert (movement.product_id, movement.change, movement.reason) == (second.pk, -3, "adjustment")
+    audit = AuditTrail.objects.get(model_name="Product", object_pk=str(first.pk))
+    assert audit.actor == "pricing" and audit.changes == {"price": ["10.00", "12.50"]}
+
+
+def test_bulk_update_invalidates_cached_detail(staff_client, products, django_capture_on_commit_callbacks):
+    url = f"/api/products/{products[0].public_id}/"
+    anonymous = APIClient()
+    anonymous.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        staff_client.post("/api/products/bulk-update/", [{"sku": products[0].sku, "stock": 9}], format="json")
+    res = anonymous.get(url)
+    assert res["X-Cache"] == "MISS" and res.data["stock"] == 9
+
+
+def test_same_product_by_public_id_and_sku_is_applied_once(staff_client, products):
+    first = products[0]
+    updates = [{"public_id": str(first.public_id), "stock": 7}, {"sku": first.sku, "stock": 1}]
+    res = staff_client.post("/api/products/bulk-update/", updates, format="json")
+    assert (res.data["updated"], res.data["failed"]) == (1, 1)
+    assert res.data["errors"][0]["row"] == 1
+
+    first.refresh_from_db()
+    # the ledger still adds up to the stored stock
+    assert first.stock == 7
+    assert [m.change for m in InventoryMovement.objects.filter(product=first)] == [2]
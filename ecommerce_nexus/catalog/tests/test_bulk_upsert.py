@@ -0,0 +1,104 @@
+# catalog/tests/test_bulk_upsert.py
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from rest_framework.test import APIClient
+
+from catalog import bulk
+from catalog.audit_models import AuditTrail
+from catalog.models import Category, InventoryMovement, Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def staff_client():
+    staff = get_user_model().objects.create_user(username="erp", password="x", is_staff=True)
+    client = APIClient()
+    client.force_authenticate(staff)
+    return client
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name="Imported")
+
+
+@pytest.fixture
+def existing(category):
+    Product.objects.bulk_create([
+        Product(title="Old", slug="old", sku="ERP-1", price=Decimal("5.00"), category=category, stock=4),
+    ])
+    return Product.objects.get(sku="ERP-1")
+
+
+def test_upsert_creates_updates_and_reports_bad_rows(staff_client, category, existing, django_capture_on_commit_callbacks):
+    rows = [
+        {"sku": "ERP-1", "price": "6.50", "stock": 10},  # partial update of an existing SKU
+        {"sku": "ERP-2", "title": "New", "price": "2.00", "category_id": category.pk, "stock": 3},
+        {"sku": "ERP-3", "title": "Bad", "price": "-1", "category_id": category.pk},
+        {"sku": "ERP-4", "title": "Nowhere", "price": "1.00", "category_id": 999999},
+        {"sku": "ERP-2", "title": "Again", "price": "2.00", "category_id": category.pk},
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        res = staff_client.post("/api/products/bulk-upsert/", rows, format="json")
+    assert res.status_code == 200
+    assert (res.data["created"], res.data["updated"], res.data["failed"]) == (1, 1, 3)
+    assert {e["row"]: list(e["errors"]) for e in res.data["errors"]} == {2: ["price"], 3: ["category_id"], 4: ["sku"]}
+
+    existing.refresh_from_db()
+    assert (existing.title, existing.price, existing.stock, existing.slug) == ("Old", Decimal("6.50"), 10, "old")
+    new = Product.objects.get(sku="ERP-2")
+    assert new.slug == Product.build_slug("New", "ERP-2") and new.stock == 3
+
+    assert InventoryMovement.objects.get(product=existing).change == 6
+    assert InventoryMovement.objects.get(product=new).reason == "restock"
+    update = AuditTrail.objects.get(model_name="Product", object_pk=str(existing.pk))
+    assert update.actor == "erp" and update.changes == {"price": ["5.00", "6.50"], "stock": [4, 10]}
+
+
+def test_failed_chunk_reports_only_the_rows_it_would_have_written(monkeypatch, category, existing):
+    def broken(*args, **kwargs):
+        raise DatabaseError("deadlock detected")
+
+    monkeypatch.setattr(bulk, "_write", broken)
+    report = bulk.upsert([
+        {"sku": "ERP-1", "price": "5.00"},  # same as stored
+        {"sku": "ERP-2", "title": "New", "price": "2.00", "category_id": category.pk},
+        {"sku": "ERP-3", "title": "Other", "price": "1.00", "category_id": category.pk},
+    ])
+    result = report.as_dict()
+    assert (result["created"], result["updated"], result["unchanged"], result["failed"]) == (0, 0, 1, 2)
+    assert [e["row"] for e in result["errors"]] == [1, 2]
+
+
+def test_dry_run_writes_nothing(staff_client, category, existing):
+    res = staff_client.post(
+        "/api/products/bulk-upsert/?dry_run=true",
+        [{"sku": "ERP-1", "price": "5.00"}, {"sku": "ERP-9", "title": "x", "price": "1", "category_id": category.pk}],
+        format="json",
+    )
+    assert (res.data["dry_run"], res.data["created"], res.data["unchanged"]) == (True, 1, 1)
+    assert not Product.objects.filter(sku="ERP-9").exists()
+
+
+def test_import_command_reads_csv(tmp_path, category):
+    path = tmp_path / "erp.csv"
+    path.write_text(f"sku,title,price,category_id,stock\nCSV-1,Chair,12.00,{category.pk},2\nCSV-2,Desk,0,{category.pk},\n")
+    errors = tmp_path / "errors.json"
+    call_command("import_products", str(path), f"--errors={errors}")
+    assert list(Product.objects.filter(sku__startswith="CSV").values_list("sku", flat=True)) == ["CSV-1"]
+    assert "price" in errors.read_text()
+
+
+def test_upsert_accepts_a_file_upload(staff_client, category):
+    upload = SimpleUploadedFile("erp.ndjson", f'{{"sku": "F-1", "title": "Lamp", "price": "9", "category_id": {category.pk}}}\n'.encode())
+    res = staff_client.post("/api/products/bulk-upsert/", {"file": upload}, format="multipart")
+    assert res.data["created"] == 1 and Product.objects.filter(sku="F-1").exists()
+
+
+def test_upsert_is_staff_only(category):
+    assert APIClient().post("/api/products/bulk-upsert/", [], format="json").status_code == 401
@@ -0,0 +1,73 @@
+# catalog/tests/test_cache.py
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def products(django_capture_on_commit_callbacks):
+    cat = Category.objects.create(name="Cached")
+    with django_capture_on_commit_callbacks(execute=True):
+        return [
+            Product.objects.create(title=f"Mug {i}", sku=f"CACHE-{i}", price=Decimal("4.00"), category=cat, stock=3)
+            for i in range(2)
+        ]
+
+
+def test_list_and_detail_are_served_from_cache(products, django_assert_num_queries):
+    client = APIClient()
+    url = f"/api/products/{products[0].public_id}/"
+    assert client.get("/api/products/?ordering=price")["X-Cache"] == "MISS"
+    assert client.get(url)["X-Cache"] == "MISS"
+    with django_assert_num_queries(0):
+        listing = client.get("/api/products/?ordering=price")
+        detail = client.get(url)
+    assert listing["X-Cache"] == detail["X-Cache"] == "HIT"
+    assert listing.data["count"] == 2
+    # different query parameters are a different entry
+    assert client.get("/api/products/?ordering=-price")["X-Cache"] == "MISS"
+
+
+def test_product_update_invalidates_only_its_own_detail(products, django_capture_on_commit_callbacks):
+    client = APIClient()
+    first, second = products
+    for p in products:
+        client.get(f"/api/products/{p.public_id}/")
+    client.get("/api/products/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.title = "Renamed"
+        first.save()
+
+    refreshed = client.get(f"/api/products/{first.public_id}/")
+    assert refreshed["X-Cache"] == "MISS"
+    assert refreshed.data["title"] == "Renamed"
+    assert client.get(f"/api/products/{second.public_id}/")["X-Cache"] == "HIT"
+    assert client.get("/api/products/")["X-Cache"] == "MISS"
+
+
+def test_category_rename_invalidates_embedded_category(products, django_capture_on_commit_callbacks):
+    client = APIClient()
+    url = f"/api/products/{products[0].public_id}/"
+    client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        cat = products[0].category
+        cat.name = "Renamed category"
+        cat.save()
+    assert client.get(url).data["category"]["name"] == "Renamed category"
+
+
+def test_cache_stats_are_staff_only(products):
+    client = APIClient()
+    client.get("/api/products/")
+    client.get("/api/products/")
+    assert client.get("/api/products/cache-stats/").status_code == 401
+    staff = get_user_model().objects.create_user(username="ops", password="x", is_staff=True)
+    client.force_authenticate(staff)
+    stats = client.get("/api/products/cache-stats/").data
+    assert stats["hits"] == 1 and stats["misses"] == 1
@@ -0,0 +1,66 @@
+# catalog/tests/test_category_tree.py
+import pytest
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def tree():
+    root = Category.objects.create(name="Home")
+    kitchen = Category.objects.create(name="Kitchen", parent=root)
+    cups = Category.objects.create(name="Cups", parent=kitchen)
+    garden = Category.objects.create(name="Garden")
+    return root, kitchen, cups, garden
+
+
+def test_paths_follow_moves_and_deletes(tree):
+    root, kitchen, cups, garden = tree
+    assert cups.path == f"/{root.pk}/{kitchen.pk}/{cups.pk}/" and cups.depth == 2
+    assert cups.ancestor_ids() == [root.pk, kitchen.pk]
+
+    kitchen.parent = garden
+    kitchen.save()
+    cups.refresh_from_db()
+    assert cups.path == f"/{garden.pk}/{kitchen.pk}/{cups.pk}/"
+    assert list(garden.get_descendants()) == list(Category.objects.filter(pk__in=[kitchen.pk, cups.pk]))
+
+    with pytest.raises(ValidationError):
+        garden.parent = cups
+        garden.save()
+
+    Category.objects.get(pk=garden.pk).delete()
+    cups.refresh_from_db()
+    assert cups.path == f"/{kitchen.pk}/{cups.pk}/" and cups.depth == 1
+
+
+def test_category_tree_filter_includes_subcategories(tree):
+    root, kitchen, cups, garden = tree
+    Product.objects.bulk_create(
+        Product(title=t, slug=t, sku=t, price=Decimal("1.00"), category=c)
+        for t, c in [("a", root), ("b", cups), ("c", garden)]
+    )
+    res = APIClient().get(f"/api/products/?category_tree={kitchen.pk}")
+    assert [p["title"] for p in res.data["results"]] == ["b"]
+    res = APIClient().get(f"/api/products/?category_tree={root.pk}")
+    assert sorted(p["title"] for p in res.data["results"]) == ["a", "b"]
+
+
+def test_tree_endpoint_is_one_query_then_cached(tree, django_assert_num_queries, django_capture_on_commit_callbacks):
+    root, kitchen, cups, garden = tree
+    client = APIClient()
+    with django_assert_num_queries(1):
+        data = client.get("/api/categories/tree/").data
+    assert [n["name"] for n in data] == ["Garden", "Home"]
+    assert data[1]["children"][0]["children"][0]["id"] == cups.pk
+    with django_assert_num_queries(0):
+        client.get("/api/categories/tree/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.create(name="Bowls", parent=kitchen)
+    kitchen_node = client.get("/api/categories/tree/").data[1]["children"][0]
+    assert [n["name"] for n in kitchen_node["children"]] == ["Bowls", "Cups"]
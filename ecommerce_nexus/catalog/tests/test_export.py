@@ -0,0 +1,56 @@
+# catalog/tests/test_export.py
+import csv
+import gzip
+import io
+import json
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+from catalog.serializers import ProductSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def staff_client():
+    staff = get_user_model().objects.create_user(username="ops", password="x", is_staff=True)
+    client = APIClient()
+    client.force_authenticate(staff)
+    return client
+
+
+@pytest.fixture
+def products():
+    cat = Category.objects.create(name="Export")
+    Product.objects.bulk_create(
+        Product(title=f"E{i}", slug=f"e-{i}", sku=f"EXP-{i}", price=Decimal("3.10") + i, category=cat, stock=i)
+        for i in range(5)
+    )
+    return list(Product.objects.select_related("category").order_by("-created_at", "-id"))
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_ndjson_export_matches_the_api_representation(staff_client, products):
+    res = staff_client.get("/api/products/export/")
+    assert res.status_code == 200 and res["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in _body(res).splitlines()]
+    # same order as the list endpoint (-created_at)
+    assert lines == json.loads(json.dumps(ProductSerializer(products, many=True).data))
+
+
+def test_gzipped_csv_export_with_filters(staff_client, products):
+    res = staff_client.get("/api/products/export/?output=csv&compress=gzip&min_price=5&fields=sku,price,category")
+    assert res["Content-Disposition"] == 'attachment; filename="products.csv.gz"'
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(_body(res)).decode())))
+    assert sorted(r["sku"] for r in rows) == ["EXP-2", "EXP-3", "EXP-4"]
+    assert list(rows[0]) == ["sku", "price", "category_id", "category_name", "category_slug"]
+
+
+def test_export_is_staff_only(products):
+    assert APIClient().get("/api/products/export/").status_code == 401
@@ -0,0 +1,100 @@
+# catalog/tests/test_idempotency.py
+from datetime import timedelta
+
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from catalog import idempotency
+from catalog.models import Category, IdempotencyKey, Order, Product
+from catalog.tasks import purge_idempotency_keys
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_confirmation_email(monkeypatch):
+    monkeypatch.setattr("catalog.notifications.schedule_flush", lambda: None)
+
+
+@pytest.fixture(params=["cache", "db"])
+def store(request, settings):
+    settings.IDEMPOTENCY_STORE = request.param
+    cache.clear()
+    return request.param
+
+
+@pytest.fixture
+def buyer():
+    return get_user_model().objects.create_user(username="idem", password="x")
+
+
+@pytest.fixture
+def client(buyer):
+    api_client = APIClient()
+    api_client.force_authenticate(buyer)
+    return api_client
+
+
+@pytest.fixture
+def product():
+    return Product.objects.create(
+        title="Idem", sku="IDEM-1", price=Decimal("4.00"), category=Category.objects.create(name="Idem"), stock=10
+    )
+
+
+def _order(client, product, key, quantity=1):
+    return client.post("/api/orders/", {"items": [{"product_id": product.id, "quantity": quantity}]},
+                       format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+
+def test_retry_replays_the_first_response(store, client, product, django_assert_max_num_queries):
+    first = _order(client, product, "k-1")
+    assert first.status_code == 201
+    with django_assert_max_num_queries(0 if store == "cache" else 1):
+        retry = _order(client, product, "k-1")
+    assert retry.status_code == 201
+    assert retry["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert Order.objects.count() == 1
+    assert _order(client, product, "k-2").status_code == 201
+    assert Order.objects.count() == 2
+
+
+def test_reused_key_with_another_body_is_rejected(store, client, product):
+    _order(client, product, "k-1")
+    assert _order(client, product, "k-1", quantity=2).status_code == 422
+
+
+def test_in_flight_duplicate_gets_409(store, client, buyer, product, rf):
+    request = rf.post("/api/orders/")
+    request.user = buyer
+    key = idempotency.scoped_key(request, "k-1")
+    body = {"items": [{"product_id": product.id, "quantity": 1}]}
+    assert idempotency.get_store().reserve(key, idempotency.fingerprint(body), buyer) is None
+
+    res = _order(client, product, "k-1")
+    assert res.status_code == 409
+    assert res["Retry-After"] == "1"
+    assert Order.objects.count() == 0
+
+
+def test_reserve_gives_up_on_a_key_that_keeps_vanishing(monkeypatch):
+    monkeypatch.setattr(cache, "add", lambda *args, **kwargs: False)
+    record = idempotency.CacheStore().reserve("gone", "print")
+    assert record == {"state": idempotency.PENDING, "fingerprint": "print"}
+
+
+def test_expired_keys_are_reclaimed_and_purged(settings, client, product):
+    settings.IDEMPOTENCY_STORE = "db"
+    _order(client, product, "k-1")
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert _order(client, product, "k-1").status_code == 201
+    assert Order.objects.count() == 2
+
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert purge_idempotency_keys() == 1
+    assert not IdempotencyKey.objects.exists()
@@ -0,0 +1,109 @@
+# catalog/tests/test_ledger.py
+import importlib
+from datetime import timedelta
+
+import pytest
+from decimal import Decimal
+from django.apps import apps
+from django.core.management import call_command
+
+from catalog import ledger
+from catalog.models import Category, InventoryMovement, Product, StockSnapshot
+
+pytestmark = pytest.mark.django_db
+
+NO_LAG = timedelta(0)
+
+
+@pytest.fixture
+def product():
+    return Product.objects.create(
+        title="Ledger", sku="LED-1", price=Decimal("1.00"), category=Category.objects.create(name="Ledger"), stock=10
+    )
+
+
+def test_direct_stock_edits_are_booked(product):
+    product.stock = 7
+    product.save()
+    assert list(InventoryMovement.objects.order_by("id").values_list("reason", "change")) == [
+        ("restock", 10), ("adjustment", -3),
+    ]
+    product.title = "Renamed"
+    product.save()
+    assert InventoryMovement.objects.count() == 2
+
+
+def test_saves_that_leave_stock_out_are_not_booked(product):
+    # stock changed in memory (e.g. a stale instance) but the save writes only the title
+    product.stock = 3
+    product.title = "Renamed"
+    product.save(update_fields=["title"])
+    assert list(InventoryMovement.objects.values_list("change", flat=True)) == [10]
+    product.save(update_fields=["stock"])
+    assert list(InventoryMovement.objects.order_by("id").values_list("change", flat=True)) == [10, -7]
+
+
+def test_opening_balance_migration_balances_the_ledger(product):
+    migration = importlib.import_module("catalog.migrations.0019_stock_opening_balance")
+    other = Product.objects.create(title="Other", sku="LED-2", price=Decimal("1.00"), category=product.category)
+    # rows written before stock edits were booked
+    Product.objects.filter(pk=product.pk).update(stock=25)
+    Product.objects.filter(pk=other.pk).update(stock=4)
+    ledger.take_snapshots(lag=NO_LAG)
+
+    migration.book_opening_balances(apps, None)
+    assert dict(
+        InventoryMovement.objects.filter(reference="opening-balance").values_list("product_id", "change")
+    ) == {product.pk: 15, other.pk: 4}
+    assert list(ledger.reconcile()) == []
+    # products already in balance get nothing
+    migration.book_opening_balances(apps, None)
+    assert InventoryMovement.objects.filter(reference="opening-balance").count() == 2
+
+
+def test_snapshot_plus_recent_movements(product, django_assert_num_queries):
+    assert ledger.take_snapshots(lag=NO_LAG) == 1
+    snapshot = StockSnapshot.objects.get(product=product)
+    assert snapshot.quantity == 10
+    InventoryMovement.objects.create(product=product, change=-4, reason="order")
+    Product.objects.filter(pk=product.pk).update(stock=6)
+
+    with django_assert_num_queries(2):
+        assert ledger.ledger_stock([product.pk]) == {product.pk: 6}
+    # a second run only folds what is new since the watermark
+    assert ledger.take_snapshots(lag=NO_LAG) == 1
+    assert ledger.take_snapshots(lag=NO_LAG) == 0
+    assert StockSnapshot.objects.get(product=product).quantity == 6
+
+
+def test_overlapping_snapshot_runs_fold_movements_once(product, monkeypatch):
+    InventoryMovement.objects.create(product=product, change=-4, reason="order")
+    Product.objects.filter(pk=product.pk).update(stock=6)
+    lock = ledger._lock_snapshots
+    overlapped = []
+
+    def contended():
+        # another run took the lock first and commits its snapshots while we wait
+        monkeypatch.setattr(ledger, "_lock_snapshots", lock)
+        overlapped.append(ledger.take_snapshots(lag=NO_LAG))
+        lock()
+
+    monkeypatch.setattr(ledger, "_lock_snapshots", contended)
+    assert ledger.take_snapshots(lag=NO_LAG) == 0
+    assert overlapped == [1]
+    assert StockSnapshot.objects.get(product=product).quantity == 6
+    assert list(ledger.reconcile()) == []
+
+
+def test_reconcile_reports_and_fixes_drift(product, capsys):
+    Product.objects.filter(pk=product.pk).update(stock=15)  # bypasses the ledger
+    assert [row["drift"] for row in ledger.reconcile()] == [5]
+
+    call_command("reconcile_stock", "--snapshot", "--fix=ledger")
+    assert "1 product(s) drifted by 5" in capsys.readouterr().out
+    assert list(ledger.reconcile()) == []
+
+    Product.objects.filter(pk=product.pk).update(stock=1)
+    call_command("reconcile_stock", "--fix=cache")
+    product.refresh_from_db()
+    assert product.stock == 15
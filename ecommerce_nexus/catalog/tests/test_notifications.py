@@ -0,0 +1,113 @@
+# catalog/tests/test_notifications.py
+import smtplib
+from datetime import timedelta
+
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.utils import timezone
+
+from catalog import notifications
+from catalog.models import Category, Order, OrderItem, Product
+from catalog.tasks import send_order_confirmation, send_pending_confirmations
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+
+
+def _orders(n, products=3):
+    cat = Category.objects.create(name="Mail")
+    items = [Product.objects.create(title=f"Mail {i}", sku=f"MAIL-{i}", price=Decimal("2.00"), category=cat, stock=50)
+             for i in range(products)]
+    orders = []
+    for i in range(n):
+        user = get_user_model().objects.create_user(username=f"m{i}", email=f"m{i}@example.com", password="x")
+        order = Order.objects.create(user=user, total_amount=Decimal("6.00"))
+        OrderItem.objects.bulk_create(OrderItem(order=order, product=p, quantity=1, unit_price=p.price) for p in items)
+        orders.append(order)
+    return orders
+
+
+def test_batch_is_rendered_with_constant_queries(django_assert_num_queries):
+    orders = _orders(5)
+    mail.outbox.clear()
+    # claim (select + lease) inside a savepoint pair, orders + users, items +
+    # products, mark sent, and the empty last claim; independent of orders and lines
+    with django_assert_num_queries(10):
+        result = send_pending_confirmations()
+    assert result == {"sent": 5, "skipped": 0, "rejected": 0, "failed": []}
+    assert [m.to for m in mail.outbox] == [[f"m{i}@example.com"] for i in range(5)]
+    assert mail.outbox[0].subject == f"Order Confirmation #{orders[0].id}"
+    assert "- Mail 2 x1 @ 2.00" in mail.outbox[0].body
+    assert not Order.objects.filter(confirmation_sent_at__isnull=True).exists()
+    # already sent orders are not emailed again
+    assert send_order_confirmation(orders[0].id)["sent"] == 0
+
+
+def test_failures_are_per_recipient(monkeypatch):
+    orders = _orders(3, products=1)
+    mail.outbox.clear()
+
+    sent = []
+
+    def flaky_send(self, messages):
+        to = messages[0].to[0]
+        if to == "m1@example.com":
+            raise smtplib.SMTPRecipientsRefused({to: (550, b"no such user")})
+        if to == "m2@example.com":
+            raise smtplib.SMTPServerDisconnected("gone")
+        sent.extend(messages)
+        return 1
+
+    monkeypatch.setattr(EmailBackend, "send_messages", flaky_send)
+    result = notifications.send_confirmations()
+    assert result == {"sent": 1, "skipped": 0, "rejected": 1, "failed": [orders[2].id]}
+    assert [m.to for m in sent] == [["m0@example.com"]]
+    # only the transient failure stays queued
+    assert list(Order.objects.filter(confirmation_sent_at__isnull=True).values_list("id", flat=True)) == [orders[2].id]
+
+
+def test_flushes_are_debounced_and_stale_orders_dropped(monkeypatch, django_capture_on_commit_callbacks):
+    queued = []
+    monkeypatch.setattr(send_pending_confirmations, "apply_async", lambda **kw: queued.append(kw))
+    with django_capture_on_commit_callbacks(execute=True):
+        _orders(3, products=1)
+    assert queued == [{"countdown": notifications.batch_window()}]
+
+    Order.objects.update(created_at=timezone.now() - timedelta(days=2))
+    assert notifications.send_confirmations()["sent"] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_mail_goes_out_outside_any_transaction(monkeypatch):
+    # orders commit for real here, which would enqueue a flush
+    monkeypatch.setattr(notifications, "schedule_flush", lambda: None)
+    _orders(2, products=1)
+    in_transaction = []
+
+    def send(self, messages):
+        in_transaction.append(connection.in_atomic_block)
+        return len(messages)
+
+    monkeypatch.setattr(EmailBackend, "send_messages", send)
+    assert notifications.send_confirmations()["sent"] == 2
+    assert in_transaction == [False, False]
+
+
+def test_claimed_orders_wait_for_their_lease():
+    orders = _orders(2, products=1)
+    Order.objects.filter(id=orders[0].id).update(confirmation_claimed_until=timezone.now() + timedelta(minutes=5))
+    mail.outbox.clear()
+    assert notifications.send_confirmations()["sent"] == 1
+    # the worker holding the lease died: the order is picked up once it expires
+    Order.objects.filter(id=orders[0].id).update(confirmation_claimed_until=timezone.now() - timedelta(seconds=1))
+    assert notifications.send_confirmations()["sent"] == 1
+    assert [m.to for m in mail.outbox] == [["m1@example.com"], ["m0@example.com"]]
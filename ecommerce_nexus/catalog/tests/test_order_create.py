@@ -0,0 +1,105 @@
+# catalog/tests/test_order_create.py
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from catalog.audit_models import AuditTrail
+from catalog.inventory import InsufficientStock, reserve_stock
+from catalog.models import Category, InventoryMovement, Order, Product
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_confirmation_email(monkeypatch):
+    # the confirmation task is covered separately; keep Celery out of these tests
+    monkeypatch.setattr("catalog.notifications.schedule_flush", lambda: None)
+
+
+@pytest.fixture
+def buyer():
+    return User.objects.create_user(username="buyer", email="buyer@example.com", password="P@ssw0rd123")
+
+
+@pytest.fixture
+def client(buyer):
+    api_client = APIClient()
+    api_client.force_authenticate(buyer)
+    return api_client
+
+
+def _make_products(n, stock=10):
+    cat = Category.objects.create(name=f"Cart {n}")
+    Product.objects.bulk_create(
+        Product(title=f"P{i}", slug=f"p-cart-{n}-{i}", sku=f"CART-{n}-{i}", price=Decimal("2.50"), category=cat, stock=stock)
+        for i in range(n)
+    )
+    return list(Product.objects.filter(category=cat).order_by("id"))
+
+
+def test_order_decrements_stock_and_writes_ledger(client, django_capture_on_commit_callbacks):
+    a, b = _make_products(2)
+    with django_capture_on_commit_callbacks(execute=True):
+        res = client.post(
+            "/api/orders/",
+            {"items": [{"product_id": a.id, "quantity": 2}, {"product_id": b.id, "quantity": 1}, {"product_id": a.id, "quantity": 1}]},
+            format="json",
+        )
+    assert res.status_code == 201, res.data
+    order = Order.objects.get(id=res.data["id"])
+    assert order.total_amount == Decimal("10.00")
+    assert order.items.count() == 3
+    a.refresh_from_db()
+    b.refresh_from_db()
+    assert (a.stock, b.stock) == (7, 9)
+    assert sorted(InventoryMovement.objects.filter(reference=str(order.id)).values_list("change", flat=True)) == [-2, -1, -1]
+    assert AuditTrail.objects.filter(model_name="Product", action="update").count() == 2
+
+
+def test_order_query_count_does_not_grow_with_cart_size(client, django_assert_max_num_queries):
+    small = _make_products(2)
+    large = _make_products(40)
+
+    def place(products):
+        return client.post(
+            "/api/orders/", {"items": [{"product_id": p.id, "quantity": 1} for p in products]}, format="json"
+        )
+
+    with django_assert_max_num_queries(40) as small_ctx:
+        assert place(small).status_code == 201
+    with django_assert_max_num_queries(len(small_ctx.captured_queries)) as large_ctx:
+        assert place(large).status_code == 201
+    assert len(large_ctx.captured_queries) == len(small_ctx.captured_queries)
+
+
+def test_order_rejects_insufficient_stock(client):
+    (p,) = _make_products(1, stock=1)
+    res = client.post("/api/orders/", {"items": [{"product_id": p.id, "quantity": 2}]}, format="json")
+    assert res.status_code == 400
+    p.refresh_from_db()
+    assert p.stock == 1
+    assert not Order.objects.exists()
+
+
+
+def test_reserve_stock_reports_every_short_sku_without_partial_writes():
+    a, b, c = _make_products(3, stock=2)
+    Product.objects.filter(pk__in=[a.pk, c.pk]).update(stock=0)
+    with pytest.raises(InsufficientStock) as excinfo:
+        reserve_stock([(a, 1, None), (b, 1, None), (c, 1, None)])
+    failures = excinfo.value.failures
+    assert sorted(f["sku"] for f in failures) == sorted([a.sku, c.sku])
+    assert all(f["available"] == 0 and f["requested"] == 1 for f in failures)
+    b.refresh_from_db()
+    assert b.stock == 2
+    assert not InventoryMovement.objects.exists()
+
+
+def test_reserve_stock_writes_movements_and_returns_levels():
+    (p,) = _make_products(1, stock=5)
+    movements, levels = reserve_stock([(p, 2, None), (p, 1, None)], reason="reservation", reference="cart-1")
+    assert [m.change for m in movements] == [-2, -1]
+    assert levels == {p.pk: (5, 2)}
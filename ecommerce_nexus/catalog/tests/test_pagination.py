@@ -0,0 +1,92 @@
+# catalog/tests/test_pagination.py
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def products():
+    cat = Category.objects.create(name="Paging")
+    Product.objects.bulk_create(
+        Product(
+            title=f"Item {i}", slug=f"item-pg-{i:03d}", sku=f"PG-{i:03d}",
+            price=Decimal(10 + i % 4), category=cat, stock=5,
+        )
+        for i in range(7)
+    )
+    return list(Product.objects.all())
+
+
+def _walk(client, url):
+    seen, pages = [], 0
+    while url:
+        res = client.get(url)
+        assert res.status_code == 200
+        assert "count" not in res.data
+        seen.extend(p["id"] for p in res.data["results"])
+        url = res.data["next"]
+        pages += 1
+    return seen, pages
+
+
+def test_cursor_mode_walks_every_product_once(products):
+    client = APIClient()
+    seen, pages = _walk(client, "/api/products/?pagination=cursor&limit=3")
+    expected = [p.id for p in sorted(products, key=lambda p: (p.created_at, p.id), reverse=True)]
+    assert seen == expected
+    assert pages == 3
+
+
+def test_cursor_mode_price_ordering_uses_id_tiebreaker(products):
+    client = APIClient()
+    seen, _ = _walk(client, "/api/products/?pagination=cursor&ordering=price&limit=2")
+    expected = [p.id for p in sorted(products, key=lambda p: (p.price, p.id))]
+    assert seen == expected
+
+
+def test_cursor_seek_has_an_index_bound(products):
+    client = APIClient()
+    first = client.get("/api/products/?pagination=cursor&ordering=price&limit=2")
+    with CaptureQueriesContext(connection) as queries:
+        client.get(first.data["next"])
+    page_sql = next(q["sql"] for q in queries.captured_queries if "LIMIT" in q["sql"])
+    # price >= k AND (price > k OR (price = k AND id > i)), not the bare OR
+    assert '"catalog_product"."price" >= ' in page_sql
+
+
+def test_cursor_mode_previous_link_and_optional_count(products):
+    client = APIClient()
+    first = client.get("/api/products/?pagination=cursor&limit=3&count=true")
+    assert first.data["count"] == 7
+    assert first.data["previous"] is None
+    second = client.get(first.data["next"])
+    back = client.get(second.data["previous"])
+    assert [p["id"] for p in back.data["results"]] == [p["id"] for p in first.data["results"]]
+
+
+def test_invalid_cursor_is_404(products):
+    res = APIClient().get("/api/products/?cursor=not-a-cursor")
+    assert res.status_code == 404
+
+
+
+def test_cursor_from_another_ordering_is_400(products):
+    client = APIClient()
+    first = client.get("/api/products/?pagination=cursor&ordering=price&limit=2")
+    res = client.get(first.data["next"].replace("ordering=price", "ordering=-created_at"))
+    assert res.status_code == 400
+    assert "cursor" in res.data
+    # descending on the same field is a different ordering too
+    res = client.get(first.data["next"].replace("ordering=price", "ordering=-price"))
+    assert res.status_code == 400
+
+def test_offset_mode_is_unchanged(products):
+    res = APIClient().get("/api/products/?limit=3&offset=3")
+    assert res.data["count"] == 7
+    assert len(res.data["results"]) == 3
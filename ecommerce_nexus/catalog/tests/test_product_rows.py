@@ -0,0 +1,45 @@
+# catalog/tests/test_product_rows.py
+import json
+import pytest
+from decimal import Decimal
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+from catalog.serializers import ProductRowSerializer, ProductSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def products():
+    parent = Category.objects.create(name="Rows")
+    Product.objects.bulk_create(
+        Product(
+            title=f"Row {i}", slug=f"row-{i}", sku=f"ROW-{i}", description="" if i else "desc",
+            price=Decimal("1.5") * (i + 1), category=parent, stock=i, is_active=bool(i % 2),
+        )
+        for i in range(4)
+    )
+    return list(Product.objects.select_related("category"))
+
+
+def test_rows_render_exactly_like_product_serializer(products):
+    rows = ProductRowSerializer()
+    values = Product.objects.values(*rows.columns)
+    assert json.dumps(rows.many(values)) == json.dumps(ProductSerializer(products, many=True).data)
+
+
+def test_list_endpoint_output_is_unchanged(products):
+    res = APIClient().get("/api/products/?ordering=price")
+    expected = ProductSerializer(sorted((p for p in products if p.is_active), key=lambda p: p.price), many=True).data
+    assert json.dumps(res.data["results"]) == json.dumps(expected)
+
+
+def test_sparse_fieldsets(products):
+    client = APIClient()
+    res = client.get("/api/products/?fields=title,category")
+    assert all(list(row) == ["title", "category"] for row in res.data["results"])
+    # keyset pagination still works when the sort key is not requested
+    page = client.get("/api/products/?pagination=cursor&limit=1&fields=title")
+    assert list(page.data["results"][0]) == ["title"]
+    assert client.get(page.data["next"]).data["results"][0]["title"] != page.data["results"][0]["title"]
@@ -0,0 +1,97 @@
+# catalog/tests/test_replicas.py
+import time
+
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import cache as product_cache
+from catalog import replicas
+from catalog.models import Category, Product
+from catalog.replicas import ReplicaRouter
+
+# outside a test transaction: reads inside an atomic block stay on the primary
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr("catalog.notifications.schedule_flush", lambda: None)
+
+
+@pytest.fixture
+def replica_reads(settings, monkeypatch):
+    # the test database stands in for the replica; record every routed read
+    settings.DATABASE_REPLICAS = ["default"]
+    routed = []
+    monkeypatch.setattr(replicas, "choose", lambda aliases: routed.append(aliases[0]) or aliases[0])
+    return routed
+
+
+def test_router_only_routes_inside_a_replica_scope(settings):
+    settings.DATABASE_REPLICAS = ["replica_0"]
+    router = ReplicaRouter()
+    assert router.db_for_read(Product) is None
+    replicas.use_replicas()
+    try:
+        assert router.db_for_read(Product) == "replica_0"
+        with transaction.atomic():
+            assert router.db_for_read(Product) == "default"
+    finally:
+        replicas._reset_scope()
+    assert router.db_for_write(Product) == "default"
+    assert router.allow_migrate("replica_0", "catalog") is False
+
+
+def test_reads_go_to_replicas_until_the_user_writes(replica_reads):
+    product = Product.objects.create(title="Rep", sku="REP-1", price=Decimal("5.00"),
+                                     category=Category.objects.create(name="Rep"), stock=5)
+    buyer = get_user_model().objects.create_user(username="rep", password="x")
+    anonymous, client = APIClient(), APIClient()
+    # a real bearer token: with ASYNC_READ_VIEWS the header is what routes a read to DRF
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(buyer).access_token}")
+
+    assert anonymous.get("/api/products/").status_code == 200
+    assert replica_reads
+    assert not replicas._scope.get()
+
+    assert client.post("/api/orders/", {"items": [{"product_id": product.id, "quantity": 1}]},
+                       format="json").status_code == 201
+    replica_reads.clear()
+    # the buyer reads from the primary for the read-your-writes window...
+    assert client.get(f"/api/products/{product.public_id}/?fields=stock").status_code == 200
+    assert replica_reads == []
+    cache.delete(replicas.PIN_KEY.format(buyer.pk))
+    assert client.get("/api/categories/").status_code == 200
+    assert replica_reads
+
+
+def test_replica_fills_after_a_write_expire_with_the_lag_window(replica_reads, settings):
+    settings.READ_YOUR_WRITES_SECONDS = 3
+    product = Product.objects.create(title="Lag", sku="LAG-1", price=Decimal("5.00"),
+                                     category=Category.objects.create(name="Lag"), stock=5)
+    # other readers stay on the replicas right after the write...
+    assert APIClient().get(f"/api/products/{product.public_id}/").status_code == 200
+    assert replica_reads
+    # ...but what they cached may predate it, so it is only kept for the window
+    entry = cache.get(product_cache.detail_key(str(product.public_id)))
+    assert entry["expires"] - time.time() <= 4
+
+    cache.delete(replicas.WRITTEN_AT_KEY)
+    cache.delete(product_cache.detail_key(str(product.public_id)))
+    APIClient().get(f"/api/products/{product.public_id}/")
+    entry = cache.get(product_cache.detail_key(str(product.public_id)))
+    assert entry["expires"] - time.time() > 4
+
+
+def test_audit_reads_use_replicas(replica_reads):
+    staff = get_user_model().objects.create_user(username="rep-staff", password="x", is_staff=True)
+    client = APIClient()
+    client.force_authenticate(staff)
+    assert client.get("/api/audit/").status_code == 200
+    assert replica_reads
@@ -0,0 +1,66 @@
+# catalog/tests/test_search.py
+import pytest
+from decimal import Decimal
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+from catalog.search import InvertedIndex
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(django_capture_on_commit_callbacks):
+    cat = Category.objects.create(name="Search")
+    rows = [
+        ("Desk lamp", "LAMP-1", "Warm light for reading"),
+        ("Floor lamp", "LAMP-2", "Tall brass lamp"),
+        ("Reading chair", "CHAIR-1", "Pairs well with a lamp"),
+        ("Kettle", "KET-1", "Boils water"),
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        return {
+            sku: Product.objects.create(title=title, sku=sku, description=desc, price=Decimal("5.00"), category=cat)
+            for title, sku, desc in rows
+        }
+
+
+def _titles(res):
+    return [p["title"] for p in res.data["results"]]
+
+
+def test_search_ranks_title_matches_above_description_matches(catalog):
+    res = APIClient().get("/api/products/?search=lamp")
+    titles = _titles(res)
+    assert set(titles) == {"Desk lamp", "Floor lamp", "Reading chair"}
+    assert titles[-1] == "Reading chair"
+    # "Floor lamp" mentions lamp in title and description
+    assert titles[0] == "Floor lamp"
+
+
+def test_search_terms_are_anded_and_match_prefixes(catalog):
+    assert set(_titles(APIClient().get("/api/products/?search=read lam"))) == {"Desk lamp", "Reading chair"}
+    assert _titles(APIClient().get("/api/products/?search=ket-1")) == ["Kettle"]
+
+
+def test_explicit_ordering_overrides_rank(catalog):
+    res = APIClient().get("/api/products/?search=lamp&ordering=created_at")
+    assert _titles(res) == ["Desk lamp", "Floor lamp", "Reading chair"]
+
+
+def test_index_rebuilds_after_product_change(catalog, django_capture_on_commit_callbacks):
+    client = APIClient()
+    assert _titles(client.get("/api/products/?search=teapot")) == []
+    with django_capture_on_commit_callbacks(execute=True):
+        kettle = catalog["KET-1"]
+        kettle.title = "Teapot"
+        kettle.save()
+    assert _titles(client.get("/api/products/?search=teapot")) == ["Teapot"]
+
+
+def test_inverted_index_scores():
+    index = InvertedIndex()
+    index.postings = {"lamp": {1: 1.0, 2: 0.4}, "lamps": {3: 1.0}}
+    index.tokens = sorted(index.postings)
+    assert index.search("lamp") == {1: 1.0, 3: 0.5, 2: 0.4}
+    assert index.search("") == {}
@@ -0,0 +1,43 @@
+# catalog/tests/test_seeding.py
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from catalog.models import Category, InventoryMovement, Order, OrderItem, Product, ProductImage, ProductTag
+from catalog.seeding import SEED_PASSWORD, Seeder
+
+pytestmark = pytest.mark.django_db
+
+
+def test_scaled_seed_writes_consistent_rows():
+    call_command("seed_products", "--scale=0.01", "--seed=7", "--batch-size=40", "--category-depth=2",
+                 "--category-fanout=3", "--tags=5")
+    assert Product.objects.count() == 100
+    assert Category.objects.count() == 12
+    assert ProductImage.objects.count() == 100 and ProductTag.objects.count() == 200
+    assert Order.objects.count() == 10 and OrderItem.objects.filter(order__isnull=False).exists()
+
+    product = Product.objects.select_related("category").first()
+    assert product.slug == Product.build_slug(product.title, product.sku)
+    assert product.category.depth == 1 and product.category.path.endswith(f"/{product.category_id}/")
+    assert InventoryMovement.objects.get(product=product, reason="restock").change == product.stock
+    user = get_user_model().objects.filter(username__startswith="seed").first()
+    assert user.check_password(SEED_PASSWORD)
+
+    # sequences were moved past the explicit ids
+    assert Product.objects.create(title="after", sku="AFTER", price=1, category=product.category).pk > product.pk
+
+
+def test_same_seed_same_data():
+    def titles():
+        Seeder(seed=3, prefix="A").run(products=20, orders=0, users=0, tags=0, depth=1, fanout=2)
+        return list(Product.objects.order_by("id").values_list("title", "price", "stock"))
+
+    first = titles()
+    Product.objects.all().delete()
+    assert [row[1:] for row in titles()] == [row[1:] for row in first]
+
+
+def test_without_scale_keeps_the_small_sample():
+    call_command("seed_products")
+    assert Product.objects.filter(sku__startswith="SKU-").count() == 10
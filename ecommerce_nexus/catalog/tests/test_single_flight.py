@@ -0,0 +1,126 @@
+# catalog/tests/test_single_flight.py
+import asyncio
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from catalog import cache as product_cache
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+
+
+def _counting(value, delay=0.0):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(delay)
+        return value
+
+    return compute, calls
+
+
+def test_concurrent_misses_share_one_computation():
+    compute, calls = _counting({"id": 1}, delay=0.1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(product_cache.fetch("k", compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert [value for value, _ in results] == [{"id": 1}] * 8
+    assert product_cache.fetch("k", compute) == ({"id": 1}, True)
+
+
+def test_waits_for_the_worker_holding_the_lock():
+    cache.add("k:lock", 1, 5)
+    compute, calls = _counting("mine")
+
+    def other_worker():
+        time.sleep(0.05)
+        cache.set("k", {"value": "theirs", "delta": 0.01, "expires": time.time() + 60}, 60)
+
+    threading.Thread(target=other_worker).start()
+    assert product_cache.fetch("k", compute) == ("theirs", False)
+    assert not calls
+
+
+def test_stops_waiting_when_the_lock_holder_gives_up():
+    cache.add("k:lock", 1, 5)
+    compute, calls = _counting("mine")
+
+    def failing_worker():
+        # e.g. the product was missing: the lock goes, no value is stored
+        time.sleep(0.05)
+        cache.delete("k:lock")
+
+    threading.Thread(target=failing_worker).start()
+    started = time.monotonic()
+    assert product_cache.fetch("k", compute) == ("mine", False)
+    assert time.monotonic() - started < 1
+    assert calls == [1]
+
+
+def test_async_fill_stops_waiting_when_the_lock_holder_gives_up():
+    cache.add("k:lock", 1, 5)
+
+    async def compute():
+        return "mine"
+
+    async def read_while_the_holder_gives_up():
+        async def give_up():
+            await asyncio.sleep(0.05)
+            await cache.adelete("k:lock")
+
+        holder = asyncio.ensure_future(give_up())
+        result = await product_cache.afetch("k", compute)
+        await holder
+        return result
+
+    started = time.monotonic()
+    assert asyncio.run(read_while_the_holder_gives_up()) == ("mine", False)
+    assert time.monotonic() - started < 1
+
+
+def test_early_refresh_near_expiry(monkeypatch):
+    monkeypatch.setattr(product_cache.random, "random", lambda: 0.999)
+    cache.set("k", {"value": "old", "delta": 1.0, "expires": time.time() + 2}, 60)
+    compute, calls = _counting("new")
+
+    # another worker is already refreshing: keep serving the current value
+    cache.add("k:lock", 1, 5)
+    assert product_cache.fetch("k", compute) == ("old", True)
+    assert not calls
+
+    cache.delete("k:lock")
+    assert product_cache.fetch("k", compute) == ("new", True)
+    assert len(calls) == 1
+    assert cache.get("k")["value"] == "new"
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    def compute():
+        time.sleep(0.05)
+        raise LookupError("gone")
+
+    errors = []
+
+    def call():
+        try:
+            product_cache.fetch("k", compute)
+        except LookupError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert cache.get("k") is None and cache.get("k:lock") is None
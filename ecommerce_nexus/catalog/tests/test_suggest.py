@@ -0,0 +1,51 @@
+# catalog/tests/test_suggest.py
+import pytest
+from decimal import Decimal
+from rest_framework.test import APIClient
+
+from catalog import search
+from catalog.models import Category, Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def catalog(django_capture_on_commit_callbacks):
+    cat = Category.objects.create(name="Suggest")
+    rows = [("Lamp shade", "LS-1", True), ("Lamp", "LMP-9", True), ("Lampstand", "LS-2", False), ("Ladder", "LAD-1", True)]
+    with django_capture_on_commit_callbacks(execute=True):
+        for title, sku, active in rows:
+            Product.objects.create(title=title, sku=sku, price=Decimal("3.00"), category=cat, is_active=active)
+
+
+def test_suggest_returns_compact_active_matches_shortest_first(catalog):
+    res = APIClient().get("/api/products/suggest/?q=lam")
+    assert res.status_code == 200
+    assert [row["title"] for row in res.data] == ["Lamp", "Lamp shade"]
+    assert set(res.data[0]) == {"public_id", "title", "sku"}
+    assert "max-age" in res["Cache-Control"]
+
+
+def test_suggest_matches_sku_prefix_and_honours_limit(catalog):
+    client = APIClient()
+    assert [row["sku"] for row in client.get("/api/products/suggest/?q=ls-").data] == ["LS-1"]
+    assert len(client.get("/api/products/suggest/?q=la&limit=1").data) == 1
+
+
+def test_suggest_ignores_short_prefix_and_is_cached(catalog, django_assert_num_queries):
+    client = APIClient()
+    assert client.get("/api/products/suggest/?q=l").data == []
+    client.get("/api/products/suggest/?q=lad")
+    with django_assert_num_queries(0):
+        assert client.get("/api/products/suggest/?q=LAD").data[0]["title"] == "Ladder"
+
+
+
+def test_suggest_ranks_a_bounded_candidate_window(catalog, django_capture_on_commit_callbacks, monkeypatch):
+    monkeypatch.setattr(search, "SUGGEST_CANDIDATES", 2)
+    cat = Category.objects.get(name="Suggest")
+    with django_capture_on_commit_callbacks(execute=True):
+        Product.objects.create(title="Laboratory", sku="LB-1", price=Decimal("3.00"), category=cat)
+    # laboratory, ladder, lamp, lamp shade in key order: only the first 2 per suggestion compete
+    assert [row["title"] for row in search.suggest("la", limit=1)] == ["Ladder"]
+    assert [row["title"] for row in search.suggest("la", limit=2)] == ["Lamp", "Ladder"]
@@ -1,12 +1,19 @@
 # ecommerce_nexus/catalog/urls.py
+from django.conf import settings
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, ProductViewSet, OrderViewSet
+
+from . import async_views
+from .views import AuditTrailViewSet, CategoryViewSet, ProductViewSet, OrderViewSet
 
 
 router = DefaultRouter()
 router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"products", ProductViewSet, basename="product")
 router.register(r"orders", OrderViewSet, basename="order")
+router.register(r"audit", AuditTrailViewSet, basename="audit")
 
 urlpatterns = router.urls
+if settings.ASYNC_READ_VIEWS:
+    # anonymous product/category reads as async views (ASGI deployments)
+    urlpatterns = async_views.wrap(urlpatterns)
 
@@ -1,12 +1,21 @@
 # ecommerce_nexus/catalog/views.py
-from rest_framework import viewsets, permissions, filters
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import viewsets, permissions
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import LimitOffsetPagination
 from drf_yasg.utils import swagger_auto_schema
 
 from .models import Category, Product
-from .serializers import CategorySerializer, ProductSerializer
-from .filters import ProductFilter
+from .audit_models import AuditTrail
+from .serializers import AuditTrailSerializer, CategorySerializer, ProductRowSerializer, ProductSerializer
+from .filters import AuditTrailFilter, ProductFilter
+from . import search
+from .search import ProductSearchFilter, RankedOrderingFilter
+from .pagination import AuditTrailPagination, ProductPagination
+from . import cache as product_cache
+from . import bulk
+from . import export as exporters
 from drf_yasg import openapi
 
 from rest_framework import status
@@ -15,19 +24,60 @@ from rest_framework.response import Response
 from .serializers import OrderSerializer
 from .models import Order
 from rest_framework.permissions import IsAuthenticated
-from idempotency_key.decorators import idempotency_key
-
-class StandardResultsSetPagination(LimitOffsetPagination):
-    default_limit = 20
-    max_limit = 100
+from .idempotency import idempotent
+from .replicas import ReplicaReadMixin
+from . import replicas
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = None  # do not paginate categories by default
     # use default lookup (pk) for categories unless you add public_id to model
 
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        data, _ = product_cache.fetch(
+            product_cache.category_list_key(), lambda: super(CategoryViewSet, self).list(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        data, _ = product_cache.fetch(
+            product_cache.category_key(kwargs[self.lookup_field]),
+            lambda: super(CategoryViewSet, self).retrieve(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
+    @swagger_auto_schema(operation_description="The whole category hierarchy as nested `children` lists.")
+    @action(detail=False, methods=["get"])
+    def tree(self, request):
+        # one query ordered by materialized path, assembled here, cached per category generation
+        roots, _ = product_cache.fetch(
+            product_cache.category_tree_key(),
+            lambda: self._build_tree(Category.objects.order_by("path").values("id", "name", "slug", "parent_id")),
+        )
+        return Response(roots)
+
+    @staticmethod
+    def _build_tree(rows):
+        nodes, roots = {}, []
+        for row in rows:
+            node = nodes[row["id"]] = {"id": row["id"], "name": row["name"], "slug": row["slug"], "children": []}
+            # path order puts every parent before its children
+            siblings = nodes[row["parent_id"]]["children"] if row["parent_id"] in nodes else roots
+            siblings.append(node)
+        for siblings in [roots] + [node["children"] for node in nodes.values()]:
+            siblings.sort(key=lambda node: node["name"].lower())
+        return roots
+
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 20
+SUGGEST_MAX_AGE = 60  # seconds clients/CDNs may reuse a suggestion list
+EXPORT_CHUNK_SIZE = 2000  # rows fetched per round trip from the server-side cursor
+
 # Example payload for docs
 product_create_example = {
     "title": "Example Shirt",
@@ -39,12 +89,12 @@ product_create_example = {
     "is_active": True
 }
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Product.objects.filter(is_active=True).select_related("category")
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = ProductPagination
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, RankedOrderingFilter]
     filterset_class = ProductFilter
     search_fields = ["title", "sku", "description"]
     ordering_fields = ["price", "created_at"]
@@ -58,6 +108,157 @@ class ProductViewSet(viewsets.ModelViewSet):
             return Product.objects.all().select_related("category")
         return qs
 
+    @swagger_auto_schema(
+        operation_description=(
+            "List products. Limit/offset by default; pass `pagination=cursor` for keyset "
+            "pagination (flat cost at any depth), then follow the `next`/`previous` links."
+        ),
+        manual_parameters=[
+            openapi.Parameter("pagination", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["cursor"],
+                              description="Set to `cursor` to switch to keyset pagination."),
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Opaque cursor taken from a `next`/`previous` link."),
+            openapi.Parameter("count", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                              description="Keyset mode only: include the total `count` (runs COUNT(*))."),
+            openapi.Parameter("fields", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Comma-separated subset of product fields to return."),
+        ],
+    )
+    def list(self, request, *args, **kwargs):
+        if not self._cacheable(request):
+            return self._list_rows(request)
+        key = product_cache.list_key(request)
+        return self._cached_response(key, lambda: self._list_rows(request))
+
+    def _list_rows(self, request):
+        # .values() rows + precomputed converters instead of ProductSerializer per instance
+        rows = ProductRowSerializer(fields=request.query_params.get("fields"))
+        queryset = self.filter_queryset(self.get_queryset()).values(*rows.columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.many(page))
+        return Response(rows.many(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self._cacheable(request):
+            return super().retrieve(request, *args, **kwargs)
+        # single-flight: a burst of misses on one product runs one query
+        key = product_cache.detail_key(kwargs[self.lookup_field])
+        data, hit = product_cache.fetch(key, lambda: super(ProductViewSet, self).retrieve(request, *args, **kwargs).data)
+        return Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+    @swagger_auto_schema(
+        operation_description="Typeahead: up to `limit` active products whose title or SKU starts with `q`.",
+        manual_parameters=[
+            openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description=f"Prefix, at least {SUGGEST_MIN_LENGTH} characters."),
+            openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f"Default {SUGGEST_DEFAULT_LIMIT}, max {SUGGEST_MAX_LIMIT}."),
+        ],
+    )
+    @action(detail=False, methods=["get"], authentication_classes=[], permission_classes=[permissions.AllowAny])
+    def suggest(self, request):
+        # no auth, filters, pagination or COUNT: a single indexed prefix lookup behind the cache
+        prefix = request.query_params.get("q", "").strip()
+        if len(prefix) < SUGGEST_MIN_LENGTH:
+            return Response([])
+        try:
+            limit = min(int(request.query_params.get("limit", SUGGEST_DEFAULT_LIMIT)), SUGGEST_MAX_LIMIT)
+        except ValueError:
+            limit = SUGGEST_DEFAULT_LIMIT
+        key = product_cache.suggest_key(prefix, limit)
+        results = product_cache.lookup(key)
+        if results is None:
+            results = search.suggest(prefix, max(limit, 1))
+            product_cache.store(key, results)
+        return Response(results, headers={"Cache-Control": f"public, max-age={SUGGEST_MAX_AGE}"})
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Stream the filtered catalog (same filters as the list) as NDJSON or CSV. Staff only. "
+            "Rows are read through a server-side cursor, so memory stays flat for any catalog size."
+        ),
+        manual_parameters=[
+            openapi.Parameter("output", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["ndjson", "csv"],
+                              description="`ndjson` (default) or `csv`."),
+            openapi.Parameter("compress", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["gzip"],
+                              description="Set to `gzip` for a gzip-compressed download."),
+            openapi.Parameter("fields", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Comma-separated subset of product fields to export."),
+        ],
+    )
+    @action(detail=False, methods=["get"], permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        rows = ProductRowSerializer(fields=request.query_params.get("fields"))
+
+        def records(output):
+            queryset = self.filter_queryset(self.get_queryset()).values(*rows.columns)
+            return (rows.to_representation(row) for row in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+
+        return exporters.download(request, "products", records)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Create or update many products matched on `sku`. Body: a list of product objects, "
+            "`{\"rows\": [...], \"dry_run\": true}`, or a multipart `file` (.csv, .ndjson or .json). "
+            "Valid rows are written in chunks; the response "
+            "reports created/updated/unchanged counts and the errors of every rejected row."
+        ),
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-upsert", permission_classes=[permissions.IsAdminUser])
+    def bulk_upsert(self, request):
+        payload = request.data
+        dry_run = str(request.query_params.get("dry_run", "")).lower() in ("1", "true", "yes")
+        upload = request.FILES.get("file")
+        if upload is not None:
+            # multipart upload of the ERP file itself; format from the extension
+            try:
+                payload = bulk.read_bytes(upload.read(), upload.name.rsplit(".", 1)[-1].lower())
+            except ValueError as exc:
+                return Response({"file": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        elif isinstance(payload, dict):
+            dry_run = dry_run or bool(payload.get("dry_run"))
+            payload = payload.get("rows")
+        if not isinstance(payload, list):
+            return Response({"rows": "Expected a list of products."}, status=status.HTTP_400_BAD_REQUEST)
+        report = bulk.upsert(payload, actor=request.user.username, dry_run=dry_run)
+        return Response(report.as_dict())
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Reprice / resync stock for many products at once. Body: a list of "
+            "`{\"public_id\" or \"sku\", \"price\"?, \"stock\"?}`. Changed rows are written with one "
+            "set-based UPDATE per chunk; stock changes are booked as adjustment movements."
+        ),
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-update", permission_classes=[permissions.IsAdminUser])
+    def bulk_update(self, request):
+        payload = request.data.get("rows") if isinstance(request.data, dict) else request.data
+        if not isinstance(payload, list):
+            return Response({"rows": "Expected a list of updates."}, status=status.HTTP_400_BAD_REQUEST)
+        report = bulk.update_price_stock(payload, actor=request.user.username).as_dict()
+        report.pop("created")
+        report.pop("dry_run")
+        return Response(report)
+
+    @action(detail=False, methods=["get"], url_path="cache-stats", permission_classes=[permissions.IsAdminUser])
+    def cache_stats(self, request):
+        """Hit/miss counters of the product response cache."""
+        return Response(product_cache.stats())
+
+    def _cacheable(self, request):
+        # staff see inactive products, so only the public view is shared through the cache
+        return not (request.user and request.user.is_staff)
+
+    def _cached_response(self, key, render):
+        data = product_cache.lookup(key)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+        response = render()
+        product_cache.store(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
     @swagger_auto_schema(
         request_body=ProductSerializer,
         operation_description="Create a product",
@@ -73,7 +274,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
     
-    @idempotency_key()
+    @idempotent()
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
@@ -92,12 +293,53 @@ class OrderViewSet(viewsets.ModelViewSet):
         return self.queryset.filter(user=user)
         
     def perform_create(self, serializer):
-        order = serializer.save(user=self.request.user)
-        order._changed_by = self.request.user.username
-        order.save()
+        # OrderSerializer.create stamps _changed_by before the single INSERT,
+        # so no follow-up save is needed for the audit trail
+        serializer.save(user=self.request.user)
+        # stock and the new order must not be read back from a lagging replica
+        replicas.pin(self.request.user)
 
     def perform_update(self, serializer):
-        order = serializer.save()
-        order._changed_by = self.request.user.username
-        order.save()
+        # stamp the actor before the save so the audit row is written once
+        serializer.instance._changed_by = self.request.user.username
+        serializer.save()
+
+
+class AuditTrailViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Staff-only read access to the audit trail. Filter on ``model_name`` +
+    ``object_pk`` or ``actor`` (plus ``since``/``until``) to stay on the
+    composite indexes; pages are keyset-paginated on ``created_at``.
+    """
+
+    queryset = AuditTrail.objects.all()
+    serializer_class = AuditTrailSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = AuditTrailPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = AuditTrailFilter
+    ordering_fields = ["created_at"]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Stream the filtered audit trail (same filters as the list, oldest first) as NDJSON or CSV."
+        ),
+        manual_parameters=[
+            openapi.Parameter("output", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["ndjson", "csv"],
+                              description="`ndjson` (default) or `csv`; CSV carries `changes` as a JSON string."),
+            openapi.Parameter("compress", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["gzip"],
+                              description="Set to `gzip` for a gzip-compressed download."),
+        ],
+    )
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        def records(output):
+            columns = AuditTrailSerializer.Meta.fields
+            queryset = self.filter_queryset(self.get_queryset()).order_by("created_at", "id").values(*columns)
+            rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+            if output == "csv":
+                # keep one column per field instead of flattening each row's changes
+                rows = ({**row, "changes": json.dumps(row["changes"], cls=DjangoJSONEncoder)} for row in rows)
+            return rows
 
+        return exporters.download(request, "audit", records)
@@ -14,6 +14,7 @@ import environ
 from pathlib import Path
 from datetime import timedelta
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 
 
@@ -57,7 +58,6 @@ INSTALLED_APPS = [
     "django.contrib.postgres",
     "accounts",  
     "rest_framework_simplejwt.token_blacklist",  # <- required for logout/blacklist
-    "idempotency_key",
 ]
 
 MIDDLEWARE = [
@@ -108,7 +108,6 @@ if DATABASE_URL:
     DATABASES = {
         "default": dj_database_url.parse(
             DATABASE_URL,
-            conn_max_age=600,
             ssl_require=False,
         )
     }
@@ -135,6 +134,38 @@ else:
         }
     }
 
+# Read replicas (comma-separated URLs) become "replica_0", "replica_1", ...;
+# catalog.replicas.ReplicaRouter sends product/category/audit reads to them.
+# Tests run them as mirrors of the default database.
+DATABASE_REPLICA_URLS = env.list("DATABASE_REPLICA_URLS", default=[])
+for index, url in enumerate(DATABASE_REPLICA_URLS):
+    DATABASES[f"replica_{index}"] = {**dj_database_url.parse(url, ssl_require=False), "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["catalog.replicas.ReplicaRouter"]
+# Seconds a user reads from the primary after a write (and everyone after a
+# catalog change) so replica lag is never visible.
+READ_YOUR_WRITES_SECONDS = env.int("READ_YOUR_WRITES_SECONDS", default=10)
+
+# Serve anonymous product/category reads from async views (catalog.async_views);
+# for ASGI deployments under uvicorn workers, see the README.
+ASYNC_READ_VIEWS = env.bool("ASYNC_READ_VIEWS", default=False)
+
+# Persistent connections, checked before reuse so a dropped connection is
+# replaced instead of failing the request. Under ASGI connections belong to
+# each sync_to_async thread and are never reused, so they stay closed there
+# (put PgBouncer in front instead); in its transaction mode also set
+# DB_DISABLE_SERVER_SIDE_CURSORS.
+DB_CONN_MAX_AGE = env.int("DB_CONN_MAX_AGE", default=0 if ASYNC_READ_VIEWS else 600)
+if ASYNC_READ_VIEWS and DB_CONN_MAX_AGE:
+    raise ImproperlyConfigured("DB_CONN_MAX_AGE must be 0 with ASYNC_READ_VIEWS; persistent connections leak per thread under ASGI.")
+DB_CONN_HEALTH_CHECKS = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+DB_DISABLE_SERVER_SIDE_CURSORS = env.bool("DB_DISABLE_SERVER_SIDE_CURSORS", default=False)
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+    database["CONN_HEALTH_CHECKS"] = DB_CONN_HEALTH_CHECKS
+    if DB_DISABLE_SERVER_SIDE_CURSORS:
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -154,11 +185,31 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing: PBKDF2 cost (existing hashes are upgraded on login), and
+# the per-process pool it runs on (accounts.hashing). Requests beyond
+# WORKERS + QUEUE concurrent hashes get a 503; the two are capped at
+# WEB_THREADS - 1 together so logins can never hold every request thread.
+PASSWORD_HASHERS = [
+    "accounts.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_PBKDF2_ITERATIONS = env.int("PASSWORD_PBKDF2_ITERATIONS", default=600_000)
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", default=2)
+PASSWORD_HASH_QUEUE = env.int("PASSWORD_HASH_QUEUE", default=1)
+PASSWORD_HASH_TIMEOUT = env.int("PASSWORD_HASH_TIMEOUT", default=10)
+AUTHENTICATION_BACKENDS = ["accounts.backends.PooledModelBackend"]
+WEB_THREADS = env.int("WEB_THREADS", default=4)  # gunicorn --threads per process (the Procfile reads it too)
+
+
 # REST Framework Configuration
 # https://www.django-rest-framework.org/api-guide/settings/
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # SimpleJWT tokens; the user comes from a cached principal, not a query
+        "accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -168,6 +219,14 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ),
+    # per-IP limit for login/registration (accounts.throttles.PasswordRateThrottle)
+    "DEFAULT_THROTTLE_RATES": {
+        "password": env("PASSWORD_THROTTLE_RATE", default="30/min"),
+    },
+    # trusted proxies in front of the app (1 behind the Heroku router); the
+    # client IP is the entry that many hops from the end of X-Forwarded-For.
+    # 0 ignores the header, which any client can set, and uses REMOTE_ADDR.
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 20,
     
@@ -182,7 +241,14 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    # cache-first blacklist check/write on rotation (accounts.blacklist)
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.CachedTokenRefreshSerializer",
 }
+# Seconds an authenticated user's principal (id, username, flags) stays cached;
+# saves and deletes of the user drop it immediately.
+AUTH_PRINCIPAL_CACHE_TIMEOUT = env.int("AUTH_PRINCIPAL_CACHE_TIMEOUT", default=300)
+# Validated access tokens kept per process (LRU) until they expire.
+AUTH_TOKEN_CACHE_SIZE = env.int("AUTH_TOKEN_CACHE_SIZE", default=10_000)
 
 
 # Caching Configuration
@@ -208,6 +274,30 @@ else:
             "LOCATION": "unique-dev-cache",
         }
     }
+
+# Idempotency-Key handling (catalog.idempotency): keys are reserved with
+# cache.add (SET NX on Redis); "db" keeps them in IdempotencyKey rows instead,
+# the default when the cache is per-process.
+IDEMPOTENCY_STORE = env(
+    "IDEMPOTENCY_STORE", default="cache" if "Redis" in CACHES["default"]["BACKEND"] else "db"
+)
+IDEMPOTENCY_TTL = env.int("IDEMPOTENCY_TTL", default=24 * 3600)  # seconds a response is replayed
+IDEMPOTENCY_LOCK_TTL = env.int("IDEMPOTENCY_LOCK_TTL", default=60)  # max seconds a key stays reserved
+
+# Refresh token blacklist: cache misses are only trusted with a shared cache
+# (Redis with maxmemory-policy noeviction, checked at runtime) that
+# accounts.tasks.purge_expired_tokens has warmed within the timeout;
+# otherwise the token_blacklist tables are checked.
+TOKEN_BLACKLIST_TRUST_CACHE = env.bool(
+    "TOKEN_BLACKLIST_TRUST_CACHE", default="Redis" in CACHES["default"]["BACKEND"]
+)
+TOKEN_BLACKLIST_WARM_TIMEOUT = env.int("TOKEN_BLACKLIST_WARM_TIMEOUT", default=2 * 3600)
+
+# Product list/detail response cache TTL (seconds); entries are also
+# invalidated through generation counters when products/categories change.
+CATALOG_CACHE_TIMEOUT = env.int("CATALOG_CACHE_TIMEOUT", default=300)
+# Seconds one worker may hold the fill lock of a hot key while the others wait.
+CATALOG_CACHE_LOCK_TIMEOUT = env.int("CATALOG_CACHE_LOCK_TIMEOUT", default=5)
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -259,6 +349,53 @@ else:
     CELERY_RESULT_BACKEND = "django-db"  # safe default; requires django-celery-results if you want DB results
 # -------------------------------------------------------------------
 
+# Stock ledger: movements younger than this (seconds) are left out of a snapshot,
+# so transactions still in flight cannot commit below the watermark.
+STOCK_SNAPSHOT_LAG = env.int("STOCK_SNAPSHOT_LAG", default=300)
+
+CELERY_BEAT_SCHEDULE = {
+    "take-stock-snapshots": {
+        "task": "catalog.tasks.take_stock_snapshots",
+        "schedule": timedelta(minutes=env.int("STOCK_SNAPSHOT_MINUTES", default=60)),
+    },
+    "reconcile-stock": {
+        "task": "catalog.tasks.reconcile_stock",
+        "schedule": timedelta(hours=24),
+    },
+    "send-pending-confirmations": {
+        "task": "catalog.tasks.send_pending_confirmations",
+        "schedule": timedelta(minutes=5),
+    },
+    "purge-expired-tokens": {
+        "task": "accounts.tasks.purge_expired_tokens",
+        "schedule": timedelta(hours=1),
+    },
+    "purge-idempotency-keys": {
+        "task": "catalog.tasks.purge_idempotency_keys",
+        "schedule": timedelta(hours=1),
+    },
+    "archive-history": {
+        "task": "catalog.tasks.archive_history",
+        "schedule": timedelta(hours=24),
+    },
+}
+
+# History retention: older InventoryMovement / AuditTrail months are written to
+# gzip NDJSON under ARCHIVE_DIR and removed (see catalog.archive).
+ARCHIVE_DIR = env("ARCHIVE_DIR", default=str(BASE_DIR / "archive"))
+MOVEMENT_RETENTION_DAYS = env.int("MOVEMENT_RETENTION_DAYS", default=730)
+AUDIT_RETENTION_DAYS = env.int("AUDIT_RETENTION_DAYS", default=365)
+
+# Audit trail: rows are buffered per transaction and bulk-inserted on commit.
+# Set AUDIT_TRAIL_ASYNC=True to hand each batch to a Celery task instead.
+AUDIT_TRAIL_ASYNC = env.bool("AUDIT_TRAIL_ASYNC", default=False)
+
 # Email
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "noreply@example.com"
+# Order confirmations are sent in batches: one flush per window (seconds),
+# unsent orders older than the max age are dropped from the queue, and a
+# claimed batch is retried by another flush once its lease (seconds) expires.
+ORDER_CONFIRMATION_BATCH_SECONDS = env.int("ORDER_CONFIRMATION_BATCH_SECONDS", default=10)
+ORDER_CONFIRMATION_CLAIM_SECONDS = env.int("ORDER_CONFIRMATION_CLAIM_SECONDS", default=600)
+ORDER_CONFIRMATION_MAX_AGE_HOURS = env.int("ORDER_CONFIRMATION_MAX_AGE_HOURS", default=24)